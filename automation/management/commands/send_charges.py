@@ -6,7 +6,22 @@ from automation.tasks import send_charge_messages
 class Command(BaseCommand):
     help = "Envia mensagens de cobrança para clientes (dia 10)."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="enqueue",
+            help="Distribui os lotes para os workers do Celery em vez de enviar neste processo.",
+        )
+
     def handle(self, *args, **options):
-        processed = send_charge_messages()
-        self.stdout.write(self.style.SUCCESS(f"Cobranças enviadas: {processed}"))
+        result = send_charge_messages(eager=not options["enqueue"])
+        if options["enqueue"]:
+            self.stdout.write(
+                self.style.SUCCESS(f"Cobranças enfileiradas: {result['clients']} clientes em {result['batches']} lotes")
+            )
+            return
+        self.stdout.write(
+            self.style.SUCCESS(f"Cobranças enviadas: {result.get('sent', 0)} (falhas: {result.get('failed', 0)})")
+        )
 
@@ -6,7 +6,22 @@ from automation.tasks import send_reminder_messages
 class Command(BaseCommand):
     help = "Envia mensagens de lembrete para clientes (dia 05)."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="enqueue",
+            help="Distribui os lotes para os workers do Celery em vez de enviar neste processo.",
+        )
+
     def handle(self, *args, **options):
-        processed = send_reminder_messages()
-        self.stdout.write(self.style.SUCCESS(f"Lembretes enviados: {processed}"))
+        result = send_reminder_messages(eager=not options["enqueue"])
+        if options["enqueue"]:
+            self.stdout.write(
+                self.style.SUCCESS(f"Lembretes enfileirados: {result['clients']} clientes em {result['batches']} lotes")
+            )
+            return
+        self.stdout.write(
+            self.style.SUCCESS(f"Lembretes enviados: {result.get('sent', 0)} (falhas: {result.get('failed', 0)})")
+        )
 
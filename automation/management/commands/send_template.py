@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from automation.tasks import _dispatch
+from clients.models import Client
+from messaging.models import MessageLog
+from messaging.templating import template_registry
+
+
+class Command(BaseCommand):
+    help = (
+        "Envia um template para os clientes informados (ou filtrados por status) usando o "
+        "motor de envio concorrente, nos mesmos lotes dos envios agendados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("template", help="Código do template ativo.")
+        parser.add_argument("--client", type=int, action="append", dest="client_ids", help="ID do cliente (repetível).")
+        parser.add_argument("--status", action="append", choices=Client.Status.values, help="Filtrar por status (repetível).")
+        parser.add_argument(
+            "--message-type",
+            default=MessageLog.Type.CHARGE,
+            choices=[MessageLog.Type.REMINDER, MessageLog.Type.CHARGE],
+            help="Tipo registrado nos logs (padrão: charge).",
+        )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="enqueue",
+            help="Distribui os lotes para os workers do Celery em vez de enviar neste processo.",
+        )
+
+    def handle(self, *args, **options):
+        template_code = options["template"]
+        if template_registry.get(template_code) is None:
+            raise CommandError(f"Template não encontrado ou inativo: {template_code}")
+
+        queryset = Client.objects.all()
+        if options["client_ids"]:
+            queryset = queryset.filter(id__in=options["client_ids"])
+        if options["status"]:
+            queryset = queryset.filter(status__in=options["status"])
+        elif not options["client_ids"]:
+            raise CommandError("Informe --client e/ou --status para escolher os destinatários.")
+
+        client_ids = list(queryset.order_by("id").values_list("id", flat=True))
+        result = _dispatch(client_ids, template_code, options["message_type"], template_code, eager=not options["enqueue"])
+        if options["enqueue"]:
+            self.stdout.write(
+                self.style.SUCCESS(f"Envios enfileirados: {result['clients']} clientes em {result['batches']} lotes")
+            )
+            return
+        self.stdout.write(
+            self.style.SUCCESS(f"Mensagens enviadas: {result.get('sent', 0)} (falhas: {result.get('failed', 0)})")
+        )
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
 import logging
-from typing import Iterable, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
-from celery import shared_task
-from django.db.models import Q
+from celery import chain, chord, group, shared_task
+from django.conf import settings
+from django.db.models import Q, QuerySet
 from django.utils import timezone
 
-from clients.models import Client
-from messaging.models import MessageLog, MessageTemplate
-from messaging.services import send_message_to_client
+from clients.models import Client, due_on
+from clients.rollover import roll_over_due_dates
+from messaging.models import MessageLog
+from messaging.services import fail_stale_pending_logs, pending_cutoff, send_messages_to_clients
+from messaging.templating import template_registry
 
 logger = logging.getLogger(__name__)
 
@@ -17,61 +20,166 @@ REMINDER_TEMPLATE_CODE = "reminder"
 CHARGE_TEMPLATE_CODE = "charge"
 
 
-def _eligible_clients(due_day: int, statuses: Optional[Iterable[str]] = None) -> Iterable[Client]:
+def _eligible_clients(due_day: int, statuses: Optional[Iterable[str]] = None) -> QuerySet[Client]:
     today = timezone.localdate()
     if today.day != due_day:
         logger.info("Dia atual %s diferente do dia configurado %s. Nenhum envio automático.", today.day, due_day)
-        return []
+        return Client.objects.none()
 
     queryset = Client.objects.all()
     if statuses:
         queryset = queryset.filter(status__in=list(statuses))
-    date_filter = Q(
-        due_date__year=today.year,
-        due_date__month=today.month,
-        due_date__day=due_day,
-    ) | Q(due_date__isnull=True, due_day=due_day)
-    return queryset.filter(date_filter)
+    return queryset.filter(due_on(today))
+
+
+def _chunked(items: Sequence[int], size: int) -> List[List[int]]:
+    return [list(items[start:start + size]) for start in range(0, len(items), size)]
+
+
+def _empty_totals() -> Dict[str, int]:
+    return {"sent": 0, "failed": 0}
+
+
+def _already_sent_ids(client_ids: Iterable[int], template_code: str, message_type: str) -> set[int]:
+    """
+    Clientes do lote que já receberam (ou estão recebendo) a mensagem hoje,
+    para que a reentrega após a queda de um worker não duplique envios. Logs
+    pendentes só contam enquanto não expiram (``MESSAGE_LOG_PENDING_TIMEOUT``):
+    depois disso o envio que os criou não está mais em andamento.
+    """
+    return set(
+        MessageLog.objects.filter(
+            Q(status=MessageLog.Status.SUCCESS)
+            | Q(status=MessageLog.Status.PENDING, sent_at__gte=pending_cutoff()),
+            client_id__in=list(client_ids),
+            template__code=template_code,
+            message_type=message_type,
+            sent_at__date=timezone.localdate(),
+        ).values_list("client_id", flat=True)
+    )
+
+
+@shared_task(acks_late=True)
+def send_client_batch(
+    previous: Optional[Dict[str, int]],
+    client_ids: List[int],
+    template_code: str,
+    message_type: str,
+) -> Dict[str, int]:
+    """
+    Envia a mensagem para um lote de clientes.
+
+    Os lotes de uma mesma "faixa" são encadeados; ``previous`` traz os totais
+    acumulados pelo lote anterior da cadeia.
+    """
+    totals = dict(previous) if previous else _empty_totals()
+    # Pendentes de uma execução interrompida deste lote: finalizar como falha e reenviar
+    fail_stale_pending_logs(client_ids)
+    skip_ids = _already_sent_ids(client_ids, template_code, message_type)
+    if skip_ids:
+        logger.info("Lote %s: %s clientes já atendidos hoje, ignorando.", template_code, len(skip_ids))
+
+    clients = Client.objects.filter(id__in=client_ids).exclude(id__in=skip_ids).order_by("id")
+    try:
+        message_logs = send_messages_to_clients(
+            clients=clients,
+            template_code=template_code,
+            message_type=message_type,
+        )
+    except Exception:  # noqa: BLE001
+        logger.exception("Falha ao processar lote de %s com %s clientes", template_code, len(client_ids))
+        totals["failed"] += len(client_ids) - len(skip_ids)
+        return totals
+
+    for message_log in message_logs:
+        if message_log.status == MessageLog.Status.SUCCESS:
+            totals["sent"] += 1
+        else:
+            totals["failed"] += 1
+    return totals
 
 
 @shared_task
-def send_reminder_messages() -> int:
+def aggregate_batch_results(results: List[Dict[str, int]], label: str) -> Dict[str, int]:
+    totals = _empty_totals()
+    for partial in results:
+        if not partial:
+            continue
+        totals["sent"] += partial.get("sent", 0)
+        totals["failed"] += partial.get("failed", 0)
+    logger.info("Envio de %s concluído. Enviados: %s, falhas: %s", label, totals["sent"], totals["failed"])
+    return totals
+
+
+def _dispatch(
+    client_ids: List[int],
+    template_code: str,
+    message_type: str,
+    label: str,
+    eager: bool = False,
+) -> Dict[str, Any]:
+    """
+    Divide os clientes em lotes de ``AUTOMATION_BATCH_SIZE`` e os distribui em
+    no máximo ``AUTOMATION_MAX_CONCURRENCY`` cadeias paralelas (chord), cujo
+    callback agrega os totais. Com ``eager`` os lotes rodam no próprio processo.
+    """
+    batch_size = max(1, int(getattr(settings, "AUTOMATION_BATCH_SIZE", 200)))
+    concurrency = max(1, int(getattr(settings, "AUTOMATION_MAX_CONCURRENCY", 4)))
+    batches = _chunked(client_ids, batch_size)
+    result: Dict[str, Any] = {"clients": len(client_ids), "batches": len(batches)}
+
+    if not batches:
+        logger.info("Nenhum cliente elegível para %s.", label)
+        return result
+
+    if eager:
+        totals = _empty_totals()
+        for batch in batches:
+            totals = send_client_batch(totals, batch, template_code, message_type)
+        logger.info("Envio de %s concluído. Enviados: %s, falhas: %s", label, totals["sent"], totals["failed"])
+        result.update(totals)
+        return result
+
+    lanes = [batches[index::concurrency] for index in range(min(concurrency, len(batches)))]
+    header = group(
+        chain(
+            send_client_batch.s(None, lane[0], template_code, message_type),
+            *(send_client_batch.s(batch, template_code, message_type) for batch in lane[1:]),
+        )
+        for lane in lanes
+    )
+    chord(header)(aggregate_batch_results.s(label))
+    logger.info(
+        "Envio de %s distribuído: %s clientes em %s lotes (%s em paralelo).",
+        label,
+        len(client_ids),
+        len(batches),
+        len(lanes),
+    )
+    return result
+
+
+@shared_task
+def send_reminder_messages(eager: bool = False) -> Dict[str, Any]:
     logger.info("Iniciando envio de lembretes (dia 05).")
-    template_exists = MessageTemplate.objects.filter(code=REMINDER_TEMPLATE_CODE, is_active=True).exists()
-    if not template_exists:
+    if not template_registry.get(REMINDER_TEMPLATE_CODE):
         logger.warning("Template de lembrete não encontrado. Abortando envio.")
-        return 0
+        return {"clients": 0, "batches": 0}
 
+    roll_over_due_dates()
     clients = _eligible_clients(5, statuses=[Client.Status.ACTIVE, Client.Status.DELINQUENT])
-    sent_count = 0
-    for client in clients:
-        send_message_to_client(
-            client=client,
-            template_code=REMINDER_TEMPLATE_CODE,
-            message_type=MessageLog.Type.REMINDER,
-        )
-        sent_count += 1
-    logger.info("Envio de lembretes concluído. Total: %s", sent_count)
-    return sent_count
+    client_ids = list(clients.order_by("id").values_list("id", flat=True))
+    return _dispatch(client_ids, REMINDER_TEMPLATE_CODE, MessageLog.Type.REMINDER, "lembretes", eager=eager)
 
 
 @shared_task
-def send_charge_messages() -> int:
+def send_charge_messages(eager: bool = False) -> Dict[str, Any]:
     logger.info("Iniciando envio de cobranças (dia 10).")
-    template_exists = MessageTemplate.objects.filter(code=CHARGE_TEMPLATE_CODE, is_active=True).exists()
-    if not template_exists:
+    if not template_registry.get(CHARGE_TEMPLATE_CODE):
         logger.warning("Template de cobrança não encontrado. Abortando envio.")
-        return 0
+        return {"clients": 0, "batches": 0}
 
+    roll_over_due_dates()
     clients = _eligible_clients(10, statuses=[Client.Status.ACTIVE, Client.Status.DELINQUENT])
-    sent_count = 0
-    for client in clients:
-        send_message_to_client(
-            client=client,
-            template_code=CHARGE_TEMPLATE_CODE,
-            message_type=MessageLog.Type.CHARGE,
-        )
-        sent_count += 1
-    logger.info("Envio de cobranças concluído. Total: %s", sent_count)
-    return sent_count
-
+    client_ids = list(clients.order_by("id").values_list("id", flat=True))
+    return _dispatch(client_ids, CHARGE_TEMPLATE_CODE, MessageLog.Type.CHARGE, "cobranças", eager=eager)
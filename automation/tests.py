@@ -1,3 +1,26 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
 from django.test import TestCase
 
-# Create your tests here.
+from clients.models import Client
+from dashboard.stats import _compute_home_stats
+
+from .tasks import _eligible_clients
+
+TODAY = date(2026, 3, 10)
+
+
+@mock.patch("django.utils.timezone.localdate", return_value=TODAY)
+class EligibleClientsTests(TestCase):
+    def test_past_due_date_is_not_charged_again(self, _localdate):
+        due_today = Client.objects.create(name="Hoje", phone="5511999990001", monthly_fee=Decimal("49.99"), due_date=TODAY)
+        overdue = Client.objects.create(
+            name="Vencido", phone="5511999990002", monthly_fee=Decimal("49.99"), due_date=date(2026, 2, 10)
+        )
+
+        self.assertEqual(overdue.next_due_date, TODAY)
+        self.assertEqual(list(_eligible_clients(TODAY.day)), [due_today])
+        # O "vencendo hoje" do painel conta os mesmos clientes que recebem a cobrança
+        self.assertEqual(_compute_home_stats()["due_today"], 1)
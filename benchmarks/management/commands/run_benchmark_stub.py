@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks.stub import ProviderStub
+
+
+class Command(BaseCommand):
+    help = (
+        "Sobe o simulador local do bot e dos provedores de WhatsApp (para testes manuais "
+        "ou com o bot/Django apontados para ele via WPPCONNECT_BOT_URL, WHATSAPP_API_URL etc.)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=3999)
+        parser.add_argument("--latency", type=float, default=20.0, help="Latência simulada por requisição (ms).")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas HTTP 500 (0 a 1).")
+        parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fração de respostas HTTP 429 (0 a 1).")
+        parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After das respostas 429 (s).")
+
+    def handle(self, *args, **options):
+        stub = ProviderStub(
+            latency=options["latency"] / 1000,
+            error_rate=options["error_rate"],
+            throttle_rate=options["throttle_rate"],
+            retry_after=options["retry_after"],
+            host=options["host"],
+            port=options["port"],
+        )
+        self.stdout.write(f"Simulador em http://{options['host']}:{options['port']} (Ctrl+C para encerrar)")
+        try:
+            stub.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"Requisições recebidas: {stub.counts()}")
@@ -0,0 +1,63 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.scenarios import SCENARIOS, run_scenarios
+from benchmarks.seed import benchmark_clients
+from benchmarks.stub import ProviderStub
+from messaging.providers import PROVIDERS
+
+
+class Command(BaseCommand):
+    help = (
+        "Executa os cenários de carga ponta a ponta (envio agendado, envio em massa, rajada de "
+        "webhooks, importação de CSV e páginas do dashboard) contra o simulador local, sem acesso "
+        "à rede. Gere os dados antes com seed_benchmark_data, num banco separado."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "scenarios",
+            nargs="*",
+            help=f"Cenários a executar (padrão: todos). Opções: {', '.join(SCENARIOS)}.",
+        )
+        parser.add_argument("--size", type=int, default=200, help="Clientes/requisições/linhas por iteração.")
+        parser.add_argument("--iterations", type=int, default=3, help="Repetições de cada cenário.")
+        parser.add_argument("--provider", default="meta", choices=PROVIDERS, help="Provedor de WhatsApp simulado.")
+        parser.add_argument("--latency", type=float, default=20.0, help="Latência do simulador (ms).")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas HTTP 500 (0 a 1).")
+        parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fração de respostas HTTP 429 (0 a 1).")
+        parser.add_argument("--seed", type=int, default=None, help="Semente do simulador e dos dados gerados.")
+        parser.add_argument("--json", dest="json_path", help="Gravar os resultados em JSON neste arquivo.")
+
+    def handle(self, *args, **options):
+        if not benchmark_clients().exists():
+            raise CommandError("Nenhum cliente de benchmark encontrado. Rode seed_benchmark_data antes.")
+
+        names = options["scenarios"] or list(SCENARIOS)
+        unknown = [name for name in names if name not in SCENARIOS]
+        if unknown:
+            raise CommandError(f"Cenário(s) desconhecido(s): {', '.join(unknown)}. Opções: {', '.join(SCENARIOS)}.")
+        stub = ProviderStub(
+            latency=options["latency"] / 1000,
+            error_rate=options["error_rate"],
+            throttle_rate=options["throttle_rate"],
+            seed=options["seed"],
+        )
+        with stub:
+            results = run_scenarios(
+                names,
+                stub,
+                size=max(1, options["size"]),
+                iterations=max(1, options["iterations"]),
+                provider=options["provider"],
+                seed=options["seed"],
+            )
+
+        for result in results:
+            self.stdout.write(result.summary())
+
+        if options["json_path"]:
+            with open(options["json_path"], "w", encoding="utf-8") as output:
+                json.dump([result.as_dict() for result in results], output, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Resultados gravados em {options['json_path']}")
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from benchmarks.seed import clear_benchmark_data, seed_benchmark_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera clientes, logs de envio e interações sintéticos para os benchmarks "
+        "(use um banco separado, ex.: DATABASE_PATH=/tmp/benchmark.sqlite3)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=1000, help="Quantidade de clientes a gerar.")
+        parser.add_argument("--logs-per-client", type=int, default=5, help="Logs de envio por cliente.")
+        parser.add_argument("--interactions-per-client", type=int, default=2, help="Interações recebidas por cliente.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Registros por bulk_create.")
+        parser.add_argument("--seed", type=int, default=None, help="Semente dos dados aleatórios.")
+        parser.add_argument("--clear", action="store_true", help="Remover os dados de benchmark existentes antes.")
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            removed = clear_benchmark_data()
+            self.stdout.write(f"Removidos {removed['clients']} clientes e {removed['jobs']} jobs de benchmark.")
+
+        totals = seed_benchmark_data(
+            clients=options["clients"],
+            logs_per_client=options["logs_per_client"],
+            interactions_per_client=options["interactions_per_client"],
+            batch_size=max(1, options["batch_size"]),
+            seed=options["seed"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Gerados {totals['clients']} clientes, {totals['message_logs']} logs de envio "
+                f"e {totals['interactions']} interações."
+            )
+        )
@@ -0,0 +1,103 @@
+"""
+Medições dos cenários de benchmark: tempo por operação, vazão e consultas SQL.
+"""
+from __future__ import annotations
+
+import math
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Sequence
+
+from django.db import connection
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """Percentil pelo método nearest-rank (0 sem amostras)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class QueryCounter:
+    """``execute_wrapper`` que conta as consultas da conexão padrão (sem guardar o SQL)."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@dataclass
+class ScenarioResult:
+    """
+    Resultado de um cenário. ``operations`` são as unidades cronometradas (um
+    lote, um job, uma requisição) e ``items`` o trabalho realizado (mensagens,
+    linhas, páginas), base da vazão.
+    """
+
+    name: str
+    item_label: str
+    items: int = 0
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    queries: int = 0
+    failures: int = 0
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def operations(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def throughput(self) -> float:
+        return self.items / self.elapsed if self.elapsed else 0.0
+
+    @contextmanager
+    def operation(self) -> Iterator[None]:
+        """Cronometra uma operação e conta as consultas feitas nela."""
+        counter = QueryCounter()
+        started = time.perf_counter()
+        try:
+            with connection.execute_wrapper(counter):
+                yield
+        finally:
+            spent = time.perf_counter() - started
+            self.latencies.append(spent * 1000)
+            self.elapsed += spent
+            self.queries += counter.count
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "items": self.items,
+            "item_label": self.item_label,
+            "operations": self.operations,
+            "elapsed": round(self.elapsed, 4),
+            "throughput": round(self.throughput, 2),
+            "p50_ms": round(percentile(self.latencies, 50), 3),
+            "p95_ms": round(percentile(self.latencies, 95), 3),
+            "p99_ms": round(percentile(self.latencies, 99), 3),
+            "queries": self.queries,
+            "queries_per_item": round(self.queries / self.items, 3) if self.items else None,
+            "failures": self.failures,
+            "details": self.details,
+        }
+
+    def summary(self) -> str:
+        data = self.as_dict()
+        per_item = f"{data['queries_per_item']:.2f}" if data["queries_per_item"] is not None else "-"
+        line = (
+            f"{self.name}: {self.items} {self.item_label} em {self.elapsed:.2f} s "
+            f"({self.throughput:.1f} {self.item_label}/s) | {self.operations} operações | "
+            f"p50 {data['p50_ms']:.2f} ms | p95 {data['p95_ms']:.2f} ms | p99 {data['p99_ms']:.2f} ms | "
+            f"consultas {self.queries} ({per_item} por item) | "
+            f"falhas {self.failures}"
+        )
+        if self.details:
+            line += " | " + ", ".join(f"{key}={value}" for key, value in self.details.items())
+        return line
@@ -0,0 +1,310 @@
+"""
+Cenários de carga ponta a ponta, executados sem acesso à rede.
+
+``offline_environment`` aponta o bot e os provedores para o ``ProviderStub``
+(com os limites de taxa desligados), troca o cache por um local e intercepta a
+publicação de tasks do Celery: ``apply_async`` só registra a chamada e qualquer
+tentativa de abrir conexão com o broker interrompe o benchmark. Os cenários
+chamam diretamente o código que o worker executaria (``send_client_batch``,
+``run_bulk_send_job``, ``drain_inbound_events``, ``run_import_job``), então o
+tempo medido é o do processamento e não o da fila.
+
+Os cenários só tocam nos clientes gerados por ``seed_benchmark_data`` e gravam
+logs, jobs e interações no banco configurado; rode-os num banco separado
+(``DATABASE_PATH``/``DATABASE_URL``).
+"""
+from __future__ import annotations
+
+import csv
+import io
+import random
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List
+from unittest import mock
+
+from celery.app.task import Task
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.test import Client as HttpClient
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from automation.tasks import CHARGE_TEMPLATE_CODE, _chunked, send_client_batch
+from clients.importer import run_import_job
+from clients.models import ImportJob
+from cobranca_chatbot.celery import app as celery_app
+from messaging.bulk_send import run_bulk_send_job
+from messaging.http_client import close_sessions
+from messaging.inbound import drain_inbound_events
+from messaging.models import BulkSendJob, MessageLog
+from messaging.templating import template_registry
+
+from .report import ScenarioResult
+from .seed import BENCHMARK_NAME_PREFIX, benchmark_clients, benchmark_phone, benchmark_user, next_benchmark_index
+from .stub import ProviderStub
+
+BULK_MESSAGE = "Olá {{nome}}, sua mensalidade de R$ {{valor}} vence hoje. Benchmark."
+WEBHOOK_OPTIONS = ("1", "2", "3", "Oi", "Quero falar com um atendente")
+DASHBOARD_REQUESTS_PER_ITERATION = 20
+
+
+class BrokerAccessError(RuntimeError):
+    """Um cenário tentou conectar ao broker do Celery (os tempos incluiriam a rede)."""
+
+
+@dataclass
+class BenchmarkContext:
+    stub: ProviderStub
+    size: int
+    iterations: int
+    user: Any
+    rng: random.Random
+
+
+SCENARIOS: Dict[str, Callable[[BenchmarkContext], List[ScenarioResult]]] = {}
+
+
+def scenario(name: str):
+    def register(function: Callable[[BenchmarkContext], List[ScenarioResult]]):
+        SCENARIOS[name] = function
+        return function
+
+    return register
+
+
+def _refuse_broker_connection(*args, **kwargs):
+    raise BrokerAccessError("Benchmark tentou conectar ao broker do Celery.")
+
+
+@contextmanager
+def offline_environment(stub: ProviderStub, provider: str = "meta") -> Iterator[List[str]]:
+    """Ambiente sem rede; devolve a lista dos nomes das tasks que seriam publicadas."""
+    published: List[str] = []
+
+    def record_publish(task, *args, **kwargs):
+        published.append(task.name)
+
+    local_cache = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "benchmarks"}}
+    with ExitStack() as stack:
+        # O agendamento segue o caminho de produção (debounce), mas nada chega ao broker
+        stack.enter_context(mock.patch.object(Task, "apply_async", autospec=True, side_effect=record_publish))
+        stack.enter_context(mock.patch.object(celery_app, "connection_for_write", _refuse_broker_connection))
+        stack.enter_context(mock.patch.object(celery_app, "connection_for_read", _refuse_broker_connection))
+        stack.enter_context(override_settings(CACHES=local_cache, TASK_QUEUE_ENABLED=True, **stub.settings_overrides(provider)))
+        close_sessions()
+        try:
+            yield published
+        finally:
+            close_sessions()
+
+
+@scenario("scheduled")
+def scheduled_run(context: BenchmarkContext) -> List[ScenarioResult]:
+    """Envio agendado de cobranças em lotes de ``AUTOMATION_BATCH_SIZE`` (um lote por operação)."""
+    result = ScenarioResult("scheduled", "mensagens")
+    if not template_registry.get(CHARGE_TEMPLATE_CODE):
+        result.details["erro"] = "template de cobrança não encontrado"
+        return [result]
+
+    # Clientes que ainda não receberam a cobrança hoje (os demais seriam ignorados pelo lote)
+    sent_today = MessageLog.objects.filter(
+        template__code=CHARGE_TEMPLATE_CODE,
+        message_type=MessageLog.Type.CHARGE,
+        status__in=[MessageLog.Status.SUCCESS, MessageLog.Status.PENDING],
+        sent_at__date=timezone.localdate(),
+    ).values("client_id")
+    wanted = context.size * context.iterations
+    client_ids = list(
+        benchmark_clients().exclude(id__in=sent_today).order_by("id").values_list("id", flat=True)[:wanted]
+    )
+    if len(client_ids) < wanted:
+        result.details["clientes_disponiveis"] = len(client_ids)
+
+    batch_size = max(1, int(getattr(settings, "AUTOMATION_BATCH_SIZE", 200)))
+    result.details["lote"] = batch_size
+    for batch in _chunked(client_ids, batch_size):
+        with result.operation():
+            totals = send_client_batch(None, batch, CHARGE_TEMPLATE_CODE, MessageLog.Type.CHARGE)
+        result.items += totals["sent"] + totals["failed"]
+        result.failures += totals["failed"]
+    return [result]
+
+
+@scenario("bulk")
+def bulk_send(context: BenchmarkContext) -> List[ScenarioResult]:
+    """Envio em massa pelo bot: um ``BulkSendJob`` de ``size`` clientes por operação."""
+    result = ScenarioResult("bulk", "mensagens")
+    client_ids = list(benchmark_clients().order_by("id").values_list("id", flat=True)[: context.size])
+    for _ in range(context.iterations):
+        job = BulkSendJob.objects.create(
+            message=BULK_MESSAGE,
+            client_ids=client_ids,
+            total=len(client_ids),
+            created_by=context.user,
+        )
+        with result.operation():
+            outcome = run_bulk_send_job(job.pk)
+        result.items += outcome.get("sent", 0) + outcome.get("failed", 0)
+        result.failures += outcome.get("failed", 0)
+    return [result]
+
+
+def _webhook_payloads(context: BenchmarkContext, total: int) -> List[Dict[str, str]]:
+    """Mistura de respostas de clientes, comprovantes e mensagens de números sem cadastro."""
+    rng = context.rng
+    phones = list(benchmark_clients().order_by("id").values_list("phone", flat=True)[: max(context.size, 1)])
+    payloads = []
+    for _ in range(total):
+        draw = rng.random()
+        if not phones or draw < 0.15:
+            payloads.append({"phone": f"5599{rng.randint(900000000, 999999999)}", "message": "Oi", "message_type": "chat"})
+        elif draw < 0.3:
+            payloads.append({"phone": rng.choice(phones), "message": "", "message_type": "image"})
+        else:
+            payloads.append({"phone": rng.choice(phones), "message": rng.choice(WEBHOOK_OPTIONS), "message_type": "chat"})
+    return payloads
+
+
+@scenario("webhooks")
+def webhook_storm(context: BenchmarkContext) -> List[ScenarioResult]:
+    """
+    Rajada de ``size`` x ``iterations`` mensagens no webhook do bot, nos modos
+    ``sync`` e ``queued``; no ``queued`` mede também o processamento da fila.
+    """
+    url = reverse("wppconnect-webhook")
+    http = HttpClient(raise_request_exception=False, HTTP_HOST="localhost")
+    payloads = _webhook_payloads(context, context.size * context.iterations)
+
+    results = []
+    for mode in ("sync", "queued"):
+        result = ScenarioResult(f"webhooks-{mode}", "requisições")
+        with override_settings(WEBHOOK_INGESTION_MODE=mode):
+            for payload in payloads:
+                with result.operation():
+                    response = http.post(url, payload, content_type="application/json")
+                result.items += 1
+                if response.status_code >= 500:
+                    result.failures += 1
+        results.append(result)
+
+        if mode == "queued":
+            drain = ScenarioResult("webhooks-queued-drain", "eventos")
+            with drain.operation():
+                totals = drain_inbound_events()
+            drain.items = totals["processed"]
+            drain.failures = totals["failed"] + totals["reply_failures"]
+            drain.details.update(lotes=totals["batches"], respostas=totals["replies"])
+            results.append(drain)
+    return results
+
+
+def _import_csv(context: BenchmarkContext) -> bytes:
+    """CSV com metade de atualizações de clientes existentes e metade de clientes novos."""
+    rng = context.rng
+    today = timezone.localdate()
+    existing = list(benchmark_clients().values_list("name", "phone")[: context.size * 4])
+    updates = rng.sample(existing, min(len(existing), context.size // 2))
+    start = next_benchmark_index()
+    new_rows = [
+        (f"{BENCHMARK_NAME_PREFIX} {index:07d}", benchmark_phone(index)) for index in range(start, start + context.size - len(updates))
+    ]
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["name", "phone", "email", "monthly_fee", "due_date", "status"])
+    for name, phone in updates + new_rows:
+        writer.writerow(
+            [
+                name,
+                phone,
+                f"{phone}@example.com",
+                rng.choice(["49,99", "59,99"]),
+                today.replace(day=rng.randint(1, 28)).strftime("%d/%m/%Y"),
+                rng.choice(["active", "delinquent"]),
+            ]
+        )
+    return output.getvalue().encode()
+
+
+@scenario("import")
+def csv_import(context: BenchmarkContext) -> List[ScenarioResult]:
+    """Importação de um CSV de ``size`` linhas por operação (arquivo, parse e gravação em lote)."""
+    result = ScenarioResult("import", "linhas")
+    created = updated = 0
+    for _ in range(context.iterations):
+        content = _import_csv(context)
+        job = ImportJob.objects.create(
+            file=ContentFile(content, name="benchmark.csv"),
+            original_name="benchmark.csv",
+            file_size=len(content),
+            created_by=context.user,
+        )
+        with result.operation():
+            outcome = run_import_job(job.pk)
+        job.refresh_from_db(fields=["processed_rows"])
+        result.items += job.processed_rows
+        result.failures += outcome.get("failed", 0)
+        created += outcome.get("created", 0)
+        updated += outcome.get("updated", 0)
+    result.details.update(criados=created, atualizados=updated)
+    return [result]
+
+
+@scenario("dashboard")
+def dashboard_pages(context: BenchmarkContext) -> List[ScenarioResult]:
+    """Páginas do dashboard e da API com o usuário logado (um resultado por página)."""
+    http = HttpClient(raise_request_exception=False, HTTP_HOST="localhost")
+    http.force_login(context.user)
+    pages = {
+        "dashboard-home": reverse("dashboard:home"),
+        "dashboard-clients": reverse("dashboard:clients"),
+        "dashboard-clients-busca": f"{reverse('dashboard:clients')}?q=Benchmark&page=5",
+        "dashboard-bot": reverse("dashboard:bot-control"),
+        "api-message-logs": reverse("message-log-list"),
+        "api-clients": reverse("client-list"),
+    }
+
+    results = []
+    for name, url in pages.items():
+        result = ScenarioResult(name, "páginas")
+        for _ in range(context.iterations * DASHBOARD_REQUESTS_PER_ITERATION):
+            with result.operation():
+                response = http.get(url)
+            result.items += 1
+            if response.status_code >= 400:
+                result.failures += 1
+                result.details["status"] = response.status_code
+        results.append(result)
+    return results
+
+
+def run_scenarios(
+    names: List[str],
+    stub: ProviderStub,
+    size: int = 200,
+    iterations: int = 3,
+    provider: str = "meta",
+    seed: int | None = None,
+) -> List[ScenarioResult]:
+    results: List[ScenarioResult] = []
+    with offline_environment(stub, provider) as published:
+        context = BenchmarkContext(
+            stub=stub,
+            size=size,
+            iterations=iterations,
+            user=benchmark_user(),
+            rng=random.Random(seed),
+        )
+        for name in names:
+            stub.reset_counts()
+            published.clear()
+            scenario_results = SCENARIOS[name](context)
+            counts = stub.counts()
+            if counts:
+                scenario_results[-1].details["simulador"] = counts
+            if published:
+                scenario_results[-1].details["tasks_agendadas"] = len(published)
+            results.extend(scenario_results)
+    return results
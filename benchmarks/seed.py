@@ -0,0 +1,155 @@
+"""
+Dados sintéticos para os benchmarks.
+
+Os clientes gerados têm o nome iniciado por ``BENCHMARK_NAME_PREFIX`` e
+telefones numa faixa própria (``BENCHMARK_PHONE_PREFIX``), de modo que os
+cenários só tocam nesses registros e ``clear_benchmark_data`` os remove junto
+com os logs e interações (``on_delete=CASCADE``). Os logs são gravados pelo
+``MessageLogWriter``, então os agregados diários acompanham; como ``sent_at`` e
+``received_at`` são ``auto_now_add``, todos ficam com a data da geração.
+"""
+from __future__ import annotations
+
+import logging
+import random
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from clients.models import Client, ImportJob, prepare_for_bulk
+from messaging.log_writer import MessageLogWriter
+from messaging.models import BulkSendJob, ClientInteraction, MessageLog, MessageTemplate
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_NAME_PREFIX = "Benchmark"
+# 55 + DDD 21 + 9 dígitos: nove dígitos finais distintos por cliente (phone_key)
+BENCHMARK_PHONE_PREFIX = "5521"
+BENCHMARK_USERNAME = "benchmark"
+
+STATUS_WEIGHTS = (
+    (Client.Status.ACTIVE, 70),
+    (Client.Status.DELINQUENT, 20),
+    (Client.Status.SETTLED, 10),
+)
+INTERACTION_OPTIONS = (("1", "1"), ("2", "2"), ("3", "3"), ("Oi, tudo bem?", ""), ("Comprovante enviado", "comprovante"))
+
+
+def benchmark_phone(index: int) -> str:
+    return f"{BENCHMARK_PHONE_PREFIX}{900000000 + index}"
+
+
+def benchmark_clients():
+    return Client.objects.filter(name__startswith=BENCHMARK_NAME_PREFIX)
+
+
+def next_benchmark_index() -> int:
+    """Próximo índice livre na faixa de telefones dos benchmarks."""
+    return benchmark_clients().count()
+
+
+def benchmark_user():
+    """Usuário usado nos cenários (login no dashboard e autor dos jobs)."""
+    User = get_user_model()
+    user, created = User.objects.get_or_create(username=BENCHMARK_USERNAME, defaults={"is_staff": True})
+    if created:
+        user.set_unusable_password()
+        user.save(update_fields=["password"])
+    return user
+
+
+def build_clients(start: int, total: int, rng: random.Random) -> List[Client]:
+    today = timezone.localdate()
+    statuses = [status for status, _ in STATUS_WEIGHTS]
+    weights = [weight for _, weight in STATUS_WEIGHTS]
+    clients = []
+    for index in range(start, start + total):
+        phone = benchmark_phone(index)
+        clients.append(
+            Client(
+                name=f"{BENCHMARK_NAME_PREFIX} {index:07d}",
+                phone=phone,
+                email=f"benchmark{index}@example.com" if index % 2 == 0 else "",
+                vehicle_type=Client.VehicleType.CARRO if index % 3 == 0 else Client.VehicleType.MOTO,
+                monthly_fee=Decimal("0"),
+                due_date=today + timedelta(days=index % 30),
+                status=rng.choices(statuses, weights)[0],
+                # Já sincronizados: a geração não deve criar uma fila de /sync-contacts
+                contact_synced_phone=phone,
+            )
+        )
+    prepare_for_bulk(clients)
+    return clients
+
+
+def seed_benchmark_data(
+    clients: int = 1000,
+    logs_per_client: int = 5,
+    interactions_per_client: int = 2,
+    batch_size: int = 1000,
+    seed: Optional[int] = None,
+) -> Dict[str, int]:
+    """Gera clientes, logs de envio e interações sintéticos. Retorna as quantidades criadas."""
+    rng = random.Random(seed)
+    templates = list(MessageTemplate.objects.filter(code__in=["reminder", "charge"]))
+    start = next_benchmark_index()
+    totals = {"clients": 0, "message_logs": 0, "interactions": 0}
+
+    for offset in range(0, clients, batch_size):
+        batch = build_clients(start + offset, min(batch_size, clients - offset), rng)
+        with transaction.atomic():
+            Client.objects.bulk_create(batch, batch_size=batch_size)
+        if any(client.pk is None for client in batch):
+            # Bancos sem RETURNING no bulk_create: recuperar os ids pelo telefone
+            ids = dict(benchmark_clients().filter(phone__in=[client.phone for client in batch]).values_list("phone", "id"))
+            for client in batch:
+                client.pk = client.id = ids[client.phone]
+
+        with MessageLogWriter(batch_size=batch_size) as writer:
+            for client in batch:
+                for _ in range(logs_per_client):
+                    template = rng.choice(templates) if templates else None
+                    success = rng.random() < 0.85
+                    writer.add(
+                        MessageLog(
+                            client=client,
+                            template=template,
+                            message_type=template.code if template else MessageLog.Type.CHARGE,
+                            channel=MessageLog.Channel.WHATSAPP,
+                            status=MessageLog.Status.SUCCESS if success else MessageLog.Status.FAILED,
+                            payload={"message": "benchmark"},
+                            response={"success": success},
+                            error_message="" if success else "Falha simulada",
+                        )
+                    )
+        totals["message_logs"] += len(batch) * logs_per_client
+
+        interactions = []
+        for client in batch:
+            for _ in range(interactions_per_client):
+                raw_message, option = rng.choice(INTERACTION_OPTIONS)
+                interactions.append(ClientInteraction(client=client, raw_message=raw_message, normalized_option=option))
+        ClientInteraction.objects.bulk_create(interactions, batch_size=batch_size)
+        totals["interactions"] += len(interactions)
+        totals["clients"] += len(batch)
+        logger.info("Benchmark: %s/%s clientes gerados", totals["clients"], clients)
+    return totals
+
+
+def clear_benchmark_data() -> Dict[str, int]:
+    """Remove os clientes dos benchmarks (com logs e interações), os jobs e o usuário dos cenários."""
+    User = get_user_model()
+    user = User.objects.filter(username=BENCHMARK_USERNAME).first()
+    removed = {"clients": 0, "jobs": 0}
+    with transaction.atomic():
+        _, deleted = benchmark_clients().delete()
+        removed["clients"] = deleted.get(Client._meta.label, 0)
+        if user:
+            removed["jobs"] += BulkSendJob.objects.filter(created_by=user).delete()[0]
+            removed["jobs"] += ImportJob.objects.filter(created_by=user).delete()[0]
+            user.delete()
+    return removed
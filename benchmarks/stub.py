@@ -0,0 +1,242 @@
+"""
+Servidor HTTP local que simula o bot WPPConnect e as APIs de WhatsApp (Meta,
+WHAPI e Infobip) para os benchmarks, sem acesso à rede.
+
+Rotas atendidas:
+
+- bot: ``POST /send``, ``POST /send-bulk``, ``POST /sync-contacts`` e ``GET /status``;
+- Meta: ``POST /<phone_id>/messages``;
+- WHAPI: ``POST /messages/text``;
+- Infobip: ``POST /whatsapp/1/message/text`` e ``/whatsapp/1/message/template``
+  (lote, com um status por ``messageId``).
+
+A latência e as taxas de falha valem para todas as rotas ``POST``: ``error_rate``
+responde HTTP 500 e ``throttle_rate`` responde HTTP 429 com ``Retry-After``. O
+``/status`` sempre responde conectado. Cada rota conta as requisições recebidas.
+"""
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+from messaging.ratelimit import RATE_SETTINGS
+
+BOT_ROUTES = {"/send": "bot-send", "/send-bulk": "bot-send-bulk", "/sync-contacts": "bot-sync-contacts"}
+
+
+def _route_for(path: str) -> Optional[str]:
+    path = path.split("?", 1)[0].rstrip("/")
+    if path in BOT_ROUTES:
+        return BOT_ROUTES[path]
+    if path == "/messages/text":
+        return "whapi"
+    if path == "/whatsapp/1/message/text":
+        return "infobip"
+    if path == "/whatsapp/1/message/template":
+        return "infobip-batch"
+    if path.endswith("/messages"):
+        return "meta"
+    return None
+
+
+def _success_body(route: str, request: Dict[str, Any]) -> Dict[str, Any]:
+    if route == "bot-send":
+        return {"success": True, "messageId": uuid.uuid4().hex}
+    if route == "bot-send-bulk":
+        return {"success": True, "queued": len(request.get("messages") or [])}
+    if route == "bot-sync-contacts":
+        return {"success": True, "verified": len(request.get("contacts") or []), "not_found": 0}
+    if route == "whapi":
+        return {"sent": True, "message": {"id": uuid.uuid4().hex}}
+    if route == "infobip":
+        return {
+            "to": request.get("to"),
+            "messageId": uuid.uuid4().hex,
+            "status": {"groupName": "PENDING", "name": "PENDING_ENROUTE"},
+        }
+    if route == "infobip-batch":
+        return {
+            "bulkId": uuid.uuid4().hex,
+            "messages": [
+                {
+                    "to": message.get("to"),
+                    "messageId": message.get("messageId"),
+                    "status": {"groupName": "PENDING", "name": "PENDING_ENROUTE"},
+                }
+                for message in request.get("messages") or []
+            ],
+        }
+    return {"messaging_product": "whatsapp", "messages": [{"id": f"wamid.{uuid.uuid4().hex}"}]}
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "_StubServer"
+
+    def _respond(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):  # noqa: N802
+        if self.path.split("?", 1)[0].rstrip("/") != "/status":
+            self._respond(404, {"error": "Rota não simulada"})
+            return
+        self.server.stub.count("bot-status")
+        self._respond(200, {"status": "connected", "isConnected": True, "qrCode": None, "error": None})
+
+    def do_POST(self):  # noqa: N802
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length) if length else b""
+        route = _route_for(self.path)
+        if route is None:
+            self._respond(404, {"error": "Rota não simulada"})
+            return
+        try:
+            request = json.loads(raw or b"{}")
+        except ValueError:
+            self._respond(400, {"error": "JSON inválido"})
+            return
+
+        stub = self.server.stub
+        stub.count(route)
+        if stub.latency:
+            time.sleep(stub.latency)
+        failure = stub.pick_failure()
+        if failure == 429:
+            stub.count("throttled")
+            self._respond(
+                429,
+                {"success": False, "error": "Too Many Requests"},
+                {"Retry-After": f"{stub.retry_after:g}"},
+            )
+        elif failure == 500:
+            stub.count("errors")
+            self._respond(500, {"success": False, "error": "Falha simulada"})
+        else:
+            self._respond(200, _success_body(route, request if isinstance(request, dict) else {}))
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    stub: "ProviderStub"
+
+
+class ProviderStub:
+    """
+    Simulador dos provedores em uma thread própria. ``latency`` e
+    ``retry_after`` em segundos; ``error_rate`` e ``throttle_rate`` entre 0 e 1.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.address: Tuple[str, int] = (host, port)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        self._server: Optional[_StubServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2] if self._server else self.address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ProviderStub":
+        self._server = _StubServer(self.address, _StubRequestHandler)
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "ProviderStub":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def serve_forever(self) -> None:
+        """Atende em primeiro plano (comando ``run_benchmark_stub``)."""
+        self._server = _StubServer(self.address, _StubRequestHandler)
+        self._server.stub = self
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def count(self, route: str) -> None:
+        with self._lock:
+            self._counts[route] += 1
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+    def pick_failure(self) -> Optional[int]:
+        with self._lock:
+            draw = self._random.random()
+        if draw < self.throttle_rate:
+            return 429
+        if draw < self.throttle_rate + self.error_rate:
+            return 500
+        return None
+
+    def settings_overrides(self, provider: str = "meta") -> Dict[str, Any]:
+        """
+        Settings que apontam o bot e todos os provedores para o simulador, com
+        ``provider`` como provedor de WhatsApp e os limites de taxa desligados.
+        """
+        overrides: Dict[str, Any] = {
+            "WHATSAPP_PROVIDER": provider,
+            "WPPCONNECT_BOT_URL": self.url,
+            "WHATSAPP_API_URL": self.url,
+            "WHATSAPP_ACCESS_TOKEN": "benchmark",
+            "WHATSAPP_PHONE_NUMBER_ID": "benchmark",
+            "WHAPI_BASE_URL": self.url,
+            "WHAPI_TOKEN": "benchmark",
+            "INFOBIP_BASE_URL": self.url,
+            "INFOBIP_API_KEY": "benchmark",
+            "INFOBIP_SENDER": "5511900000000",
+            "INFOBIP_BULK_TEMPLATE": "benchmark",
+        }
+        for rate_setting, _ in RATE_SETTINGS.values():
+            overrides[rate_setting] = 0
+        return overrides
@@ -1,11 +1,18 @@
 from django.contrib import admin
 
-from .models import Client
+from .models import Client, ImportJob
 
 
 @admin.register(Client)
 class ClientAdmin(admin.ModelAdmin):
-    list_display = ("name", "phone", "monthly_fee", "due_date", "due_day", "status", "auto_messaging_enabled", "created_at")
+    list_display = ("name", "phone", "monthly_fee", "due_date", "next_due_date", "due_day", "status", "auto_messaging_enabled", "created_at")
     list_filter = ("status", "auto_messaging_enabled", "due_day", "due_date", "created_at")
     search_fields = ("name", "phone", "email")
     ordering = ("name",)
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "original_name", "status", "processed_rows", "created", "updated", "failed", "created_by", "created_at")
+    list_filter = ("status", "created_at")
+    readonly_fields = ("errors", "error_message", "created_at", "started_at", "finished_at")
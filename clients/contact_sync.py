@@ -0,0 +1,76 @@
+"""
+Sincronização dos contatos com o bot WPPConnect fora do ciclo de gravação.
+
+Salvar um cliente apenas marca ``contact_sync_pending`` quando o telefone difere
+do último sincronizado (``Client.apply_derived_fields``). ``schedule_contact_sync``
+agenda, no máximo uma vez por janela de ``CONTACT_SYNC_DEBOUNCE`` segundos, a
+task que envia os pendentes em lotes pelo ``/sync-contacts`` do bot. Sem
+worker Celery (``TASK_QUEUE_ENABLED`` desligado), os pendentes são enviados por
+``manage.py sync_pending_contacts --loop`` (iniciado pelo ``start_both.sh``).
+"""
+from __future__ import annotations
+
+import logging
+from typing import Dict, Optional
+
+from django.conf import settings
+
+from messaging.bot_status import is_bot_connected
+from messaging.bulk_send import sync_contacts
+from messaging.scheduling import schedule_debounced
+from .models import Client
+
+logger = logging.getLogger(__name__)
+
+CONTACT_SYNC_SCHEDULED_KEY = "clients:contact-sync-scheduled"
+
+
+def schedule_contact_sync() -> None:
+    """Agenda a sincronização dos contatos pendentes (rajadas de gravações viram um único job)."""
+    from .tasks import sync_pending_contacts  # import local para evitar ciclos
+
+    schedule_debounced(
+        sync_pending_contacts,
+        CONTACT_SYNC_SCHEDULED_KEY,
+        float(getattr(settings, "CONTACT_SYNC_DEBOUNCE", 5)),
+    )
+
+
+def push_pending_contacts(batch_size: Optional[int] = None) -> Dict[str, int]:
+    """Envia ao bot, em lotes, os contatos com sincronização pendente."""
+    pending = Client.objects.filter(contact_sync_pending=True)
+    if not pending.exists():
+        return {"synced": 0}
+    if not is_bot_connected():
+        logger.info("Bot não está conectado; contatos pendentes ficam para a próxima rodada")
+        return {"synced": 0}
+
+    batch_size = max(1, batch_size or int(getattr(settings, "CONTACT_SYNC_BATCH_SIZE", 500)))
+    synced = 0
+    last_id = 0
+    while True:
+        clients = list(
+            pending.filter(id__gt=last_id).order_by("id").only("id", "name", "phone", "contact_synced_phone")[:batch_size]
+        )
+        if not clients:
+            break
+        last_id = clients[-1].id
+        if not sync_contacts(clients):
+            break
+
+        sent_phones = {}
+        for client in clients:
+            client.contact_synced_phone = sent_phones[client.id] = client.formatted_phone
+            client.contact_sync_pending = False
+        Client.objects.bulk_update(clients, ["contact_synced_phone", "contact_sync_pending"])
+
+        # Telefone alterado durante o envio: manter pendente para a próxima rodada
+        changed = [
+            client_id
+            for client_id, phone in Client.objects.filter(id__in=list(sent_phones)).values_list("id", "phone")
+            if "".join(filter(str.isdigit, phone or "")) != sent_phones[client_id]
+        ]
+        if changed:
+            Client.objects.filter(id__in=changed).update(contact_sync_pending=True)
+        synced += len(clients) - len(changed)
+    return {"synced": synced}
@@ -0,0 +1,257 @@
+"""
+Importação de clientes em lote (CSV do dashboard).
+
+O arquivo é lido em fluxo (``iter_csv_rows``) e processado em lotes de
+``CLIENT_IMPORT_BATCH_SIZE`` linhas por ``run_import_job``, de modo que o uso de
+memória não depende do tamanho do arquivo; o andamento e os erros por linha
+ficam registrados no ``ImportJob``.
+
+Os clientes existentes são carregados numa única consulta, indexados pela
+chave do telefone; as linhas são classificadas em novas e atualizações e
+gravadas com ``bulk_create``/``bulk_update``. Como essas operações não disparam
+os signals de ``Client``, o cache de telefones é invalidado aqui; os contatos
+com telefone novo ficam marcados e a sincronização em lote com o WhatsApp
+(``clients.contact_sync``) é agendada a cada lote.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import IO, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .contact_sync import schedule_contact_sync
+from .lookup import client_lookup_cache
+from .models import BULK_DERIVED_FIELDS, Client, ImportJob, phone_key, prepare_for_bulk
+from .signals import clients_bulk_changed
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_HEADERS = {"name", "phone", "monthly_fee", "due_date"}
+DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y")
+
+IMPORT_FIELDS = ("name", "phone", "email", "monthly_fee", "due_date", "payment_link", "status")
+UPDATE_FIELDS = tuple(dict.fromkeys(IMPORT_FIELDS + BULK_DERIVED_FIELDS + ("updated_at",)))
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    client_ids: List[int] = field(default_factory=list)
+
+
+def parse_date(value: str) -> Optional[date]:
+    value = value.strip()
+    for pattern in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, pattern).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_row(row: Mapping[str, Optional[str]], line: int) -> Tuple[Optional[Dict[str, Any]], str]:
+    """Valida uma linha do CSV. Retorna (valores, "") ou (None, mensagem de erro)."""
+    name = (row.get("name") or "").strip()
+    phone = (row.get("phone") or "").strip()
+    monthly_fee = (row.get("monthly_fee") or "").replace(",", ".").strip()
+    due_date_raw = (row.get("due_date") or "").strip()
+
+    if not name or not phone or not monthly_fee or not due_date_raw:
+        return None, f"Linha {line}: name, phone, monthly_fee e due_date são obrigatórios."
+
+    # Sem dígitos não há chave de telefone para localizar ou criar o cliente
+    if not phone_key(phone):
+        return None, f"Linha {line}: phone inválido ({phone})."
+
+    try:
+        fee_value = Decimal(monthly_fee)
+        if fee_value < 0:
+            raise InvalidOperation("Valor negativo")
+    except (InvalidOperation, ValueError):
+        return None, f"Linha {line}: monthly_fee inválido ({monthly_fee})."
+
+    due_date = parse_date(due_date_raw)
+    if not due_date:
+        return None, f"Linha {line}: due_date inválido ({due_date_raw}). Use formato DD/MM/AAAA ou AAAA-MM-DD."
+
+    return {
+        "name": name,
+        "phone": phone,
+        "email": (row.get("email") or "").strip(),
+        "monthly_fee": fee_value,
+        "due_date": due_date,
+        "payment_link": (row.get("payment_link") or "").strip(),
+        "status": (row.get("status") or "").strip() or Client.Status.ACTIVE,
+    }, ""
+
+
+def _normalize_headers(fieldnames: Optional[Iterable[str]]) -> List[str]:
+    return [(header or "").strip().lower() for header in fieldnames or []]
+
+
+def read_headers(uploaded: IO[bytes]) -> List[str]:
+    """Lê apenas o cabeçalho do arquivo enviado, sem carregá-lo inteiro na memória."""
+    wrapper = io.TextIOWrapper(uploaded, encoding="utf-8-sig", newline="")
+    try:
+        headers = _normalize_headers(next(csv.reader(wrapper), []))
+    finally:
+        # Devolve o arquivo original sem fechá-lo
+        wrapper.detach()
+        uploaded.seek(0)
+    return headers
+
+
+def iter_csv_rows(binary_file: IO[bytes]) -> Iterator[Tuple[int, Dict[str, Optional[str]]]]:
+    """Percorre o CSV linha a linha, devolvendo (número da linha, valores)."""
+    text = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    reader.fieldnames = _normalize_headers(reader.fieldnames)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _normalize_row(row: Mapping[str, Any]) -> Dict[str, Any]:
+    values = {name: row[name] for name in IMPORT_FIELDS}
+    if values["status"] not in Client.Status.values:
+        values["status"] = Client.Status.ACTIVE
+    return values
+
+
+def import_clients(rows: Iterable[Mapping[str, Any]], batch_size: int | None = None) -> ImportResult:
+    """
+    Cria ou atualiza clientes a partir de linhas já validadas por ``parse_row``.
+
+    Linhas repetidas para o mesmo telefone são consolidadas (a última vence).
+    """
+    batch_size = max(1, batch_size or int(getattr(settings, "CLIENT_IMPORT_BATCH_SIZE", 500)))
+
+    rows_by_key: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        key = phone_key(row["phone"])
+        if key:
+            rows_by_key[key] = _normalize_row(row)
+
+    existing: Dict[str, Client] = {}
+    for client in Client.objects.filter(phone_key__in=list(rows_by_key)).order_by("id"):
+        existing.setdefault(client.phone_key, client)
+
+    to_create: List[Client] = []
+    to_update: List[Client] = []
+    now = timezone.now()
+    for key, values in rows_by_key.items():
+        client = existing.get(key)
+        if client is None:
+            client = Client(**values)
+            to_create.append(client)
+        else:
+            for name, value in values.items():
+                setattr(client, name, value)
+            client.updated_at = now
+            to_update.append(client)
+    prepare_for_bulk(to_create)
+    prepare_for_bulk(to_update)
+
+    with transaction.atomic():
+        created = Client.objects.bulk_create(to_create, batch_size=batch_size)
+        Client.objects.bulk_update(to_update, UPDATE_FIELDS, batch_size=batch_size)
+
+    # Novos telefones podem estar em cache como "sem cadastro"
+    for key in rows_by_key:
+        client_lookup_cache.invalidate(key)
+    for client in to_update:
+        client_lookup_cache.invalidate_client(client.pk)
+
+    client_ids = [client.pk for client in created if client.pk] + [client.pk for client in to_update]
+    if len(client_ids) < len(created) + len(to_update):
+        # Bancos sem RETURNING no bulk_create: recuperar os ids pela chave do telefone
+        client_ids = list(Client.objects.filter(phone_key__in=list(rows_by_key)).values_list("id", flat=True))
+
+    clients_bulk_changed.send(sender=Client, client_ids=client_ids)
+    logger.info("Importação de clientes: %s criados, %s atualizados.", len(created), len(to_update))
+    return ImportResult(created=len(created), updated=len(to_update), client_ids=client_ids)
+
+
+def _record_errors(job: ImportJob, errors: List[str]) -> None:
+    limit = int(getattr(settings, "CLIENT_IMPORT_MAX_ERRORS", 500))
+    room = limit - len(job.errors)
+    if room > 0:
+        job.errors.extend(errors[:room])
+
+
+def run_import_job(job_id: int) -> Dict[str, int]:
+    job = ImportJob.objects.filter(pk=job_id).first()
+    if not job:
+        logger.warning("Importação %s não encontrada.", job_id)
+        return {}
+    if job.status != ImportJob.Status.QUEUED:
+        logger.info("Importação %s já processada (%s).", job_id, job.status)
+        return {"created": job.created, "updated": job.updated, "failed": job.failed}
+
+    job.status = ImportJob.Status.RUNNING
+    job.started_at = timezone.now()
+    job.save(update_fields=["status", "started_at"])
+
+    batch_size = max(1, int(getattr(settings, "CLIENT_IMPORT_BATCH_SIZE", 500)))
+    progress_fields = ["processed_rows", "created", "updated", "failed", "errors", "bytes_read"]
+
+    def flush(batch: List[Dict[str, Any]], errors: List[str], position: int) -> None:
+        if batch:
+            result = import_clients(batch, batch_size=batch_size)
+            job.created += result.created
+            job.updated += result.updated
+            schedule_contact_sync()
+        job.failed += len(errors)
+        _record_errors(job, errors)
+        job.bytes_read = position
+        job.save(update_fields=progress_fields)
+
+    try:
+        with job.file.open("rb") as binary_file:
+            batch: List[Dict[str, Any]] = []
+            errors: List[str] = []
+            for line, row in iter_csv_rows(binary_file):
+                job.processed_rows += 1
+                values, error = parse_row(row, line)
+                if values is None:
+                    errors.append(error)
+                else:
+                    batch.append(values)
+                if len(batch) + len(errors) >= batch_size:
+                    flush(batch, errors, binary_file.tell())
+                    batch, errors = [], []
+            flush(batch, errors, job.file_size)
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Erro inesperado na importação %s", job.pk)
+        if isinstance(exc, UnicodeDecodeError):
+            message = "Não foi possível ler o arquivo. Utilize codificação UTF-8."
+        else:
+            message = str(exc)
+        job.file.delete(save=False)
+        job.status = ImportJob.Status.FAILED
+        job.error_message = message
+        job.finished_at = timezone.now()
+        job.save(update_fields=progress_fields + ["status", "error_message", "finished_at", "file"])
+        raise
+
+    # O arquivo só é necessário durante o processamento
+    job.file.delete(save=False)
+    job.status = ImportJob.Status.COMPLETED
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "finished_at", "file"])
+    logger.info(
+        "Importação %s concluída. Criados: %s, atualizados: %s, erros: %s",
+        job.pk,
+        job.created,
+        job.updated,
+        job.failed,
+    )
+    return {"created": job.created, "updated": job.updated, "failed": job.failed}
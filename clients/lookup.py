@@ -0,0 +1,139 @@
+"""
+Cache em memória (LRU + TTL) da resolução telefone → cliente usada pelos webhooks.
+
+Cada processo mantém o seu próprio cache; os signals de ``Client`` invalidam as
+entradas no processo que fez a alteração e o TTL limita quanto tempo os demais
+workers podem ficar desatualizados.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+
+from .models import Client, phone_key
+
+
+@dataclass(frozen=True)
+class ClientRef:
+    id: int
+    name: str
+    status: str
+
+
+class PhoneLookupCache:
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Optional[ClientRef]]]" = OrderedDict()
+        self._keys_by_client: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Optional[ClientRef]]:
+        """Retorna (encontrado, cliente). ``None`` em cache significa telefone sem cadastro."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._discard(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key: str, ref: Optional[ClientRef]) -> None:
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + self.ttl, ref)
+            if ref is not None:
+                self._keys_by_client[ref.id] = key
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def invalidate_client(self, client_id: int, key: str = "") -> None:
+        with self._lock:
+            previous_key = self._keys_by_client.get(client_id)
+            if previous_key:
+                self._discard(previous_key)
+            if key:
+                self._discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_client.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0,
+            }
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry and entry[1] is not None and self._keys_by_client.get(entry[1].id) == key:
+            del self._keys_by_client[entry[1].id]
+
+
+client_lookup_cache = PhoneLookupCache(
+    maxsize=int(getattr(settings, "CLIENT_LOOKUP_CACHE_SIZE", 10000)),
+    ttl=float(getattr(settings, "CLIENT_LOOKUP_CACHE_TTL", 60)),
+)
+
+
+def resolve_client(phone: str) -> Optional[ClientRef]:
+    """Resolve o cliente pelo telefone, consultando o banco apenas em cache miss."""
+    key = phone_key(phone)
+    if not key:
+        return None
+
+    found, ref = client_lookup_cache.get(key)
+    if found:
+        return ref
+
+    row = Client.objects.filter(phone_key=key).values("id", "name", "status").first()
+    ref = ClientRef(**row) if row else None
+    client_lookup_cache.set(key, ref)
+    return ref
+
+
+def resolve_clients(phones: Iterable[str]) -> Dict[str, Optional[ClientRef]]:
+    """Versão em lote de ``resolve_client``: uma consulta para todos os cache misses. Chave: ``phone_key``."""
+    refs: Dict[str, Optional[ClientRef]] = {}
+    missing = set()
+    for key in {phone_key(phone) for phone in phones}:
+        if not key:
+            continue
+        found, ref = client_lookup_cache.get(key)
+        if found:
+            refs[key] = ref
+        else:
+            missing.add(key)
+
+    if missing:
+        loaded: Dict[str, ClientRef] = {}
+        for row in Client.objects.filter(phone_key__in=missing).values("id", "name", "status", "phone_key"):
+            key = row.pop("phone_key")
+            loaded.setdefault(key, ClientRef(**row))
+        for key in missing:
+            refs[key] = loaded.get(key)
+            client_lookup_cache.set(key, refs[key])
+    return refs
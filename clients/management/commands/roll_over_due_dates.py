@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from clients.rollover import roll_over_due_dates
+
+
+class Command(BaseCommand):
+    help = "Avança o próximo vencimento dos clientes cuja data já passou (virada diária)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Data de referência (AAAA-MM-DD). Padrão: hoje.")
+
+    def handle(self, *args, **options):
+        today = None
+        if options.get("date"):
+            today = parse_date(options["date"])
+            if not today:
+                raise CommandError(f"Data inválida para --date: {options['date']}. Use AAAA-MM-DD.")
+
+        updated = roll_over_due_dates(today)
+        self.stdout.write(self.style.SUCCESS(f"Vencimentos avançados: {updated} clientes."))
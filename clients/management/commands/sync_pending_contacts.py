@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from clients.contact_sync import push_pending_contacts
+
+
+class Command(BaseCommand):
+    help = (
+        "Envia ao bot (/sync-contacts) os contatos com sincronização pendente. "
+        "Com --loop, continua verificando os pendentes (alternativa ao worker Celery)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Contatos por requisição ao bot.")
+        parser.add_argument("--loop", action="store_true", help="Continuar sincronizando até ser interrompido.")
+        parser.add_argument("--interval", type=float, default=30.0, help="Segundos entre verificações com --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            result = push_pending_contacts(options["batch_size"])
+            if result["synced"] or not options["loop"]:
+                self.stdout.write(self.style.SUCCESS(f"Contatos sincronizados: {result['synced']}."))
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0004_client_vehicle_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='phone_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Últimos 9 dígitos do telefone, usados nas buscas dos webhooks e importações.', max_length=9, verbose_name='Chave do telefone'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def backfill_phone_key(apps, schema_editor):
+    Client = apps.get_model("clients", "Client")
+    batch = []
+    for client in Client.objects.only("id", "phone").iterator(chunk_size=BATCH_SIZE):
+        digits = "".join(filter(str.isdigit, client.phone or ""))
+        client.phone_key = digits[-9:]
+        batch.append(client)
+        if len(batch) >= BATCH_SIZE:
+            Client.objects.bulk_update(batch, ["phone_key"])
+            batch = []
+    if batch:
+        Client.objects.bulk_update(batch, ["phone_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("clients", "0005_client_phone_key"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_phone_key, migrations.RunPython.noop),
+    ]
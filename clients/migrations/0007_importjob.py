@@ -0,0 +1,42 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('clients', '0006_backfill_client_phone_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(blank=True, upload_to='imports/%Y/%m/', verbose_name='Arquivo')),
+                ('original_name', models.CharField(blank=True, max_length=255, verbose_name='Nome do arquivo')),
+                ('file_size', models.PositiveBigIntegerField(default=0, verbose_name='Tamanho (bytes)')),
+                ('bytes_read', models.PositiveBigIntegerField(default=0, verbose_name='Bytes processados')),
+                ('status', models.CharField(choices=[('queued', 'Na fila'), ('running', 'Em andamento'), ('completed', 'Concluído'), ('failed', 'Falha')], default='queued', max_length=20, verbose_name='Status')),
+                ('processed_rows', models.PositiveIntegerField(default=0, verbose_name='Linhas processadas')),
+                ('created', models.PositiveIntegerField(default=0, verbose_name='Criados')),
+                ('updated', models.PositiveIntegerField(default=0, verbose_name='Atualizados')),
+                ('failed', models.PositiveIntegerField(default=0, verbose_name='Linhas com erro')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='Erros')),
+                ('error_message', models.TextField(blank=True, verbose_name='Mensagem de erro')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Início')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Término')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='client_import_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Importação de contatos',
+                'verbose_name_plural': 'Importações de contatos',
+                'ordering': ('-created_at',),
+            },
+        ),
+    ]
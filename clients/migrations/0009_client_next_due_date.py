@@ -0,0 +1,57 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:55
+
+from calendar import monthrange
+from datetime import date
+
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+
+def _occurrence(year, month, day):
+    return date(year, month, min(day, monthrange(year, month)[1]))
+
+
+def backfill_next_due_date(apps, schema_editor):
+    Client = apps.get_model("clients", "Client")
+    today = timezone.localdate()
+    Client.objects.filter(due_date__gte=today).update(next_due_date=F("due_date"))
+    past = Client.objects.filter(due_date__lt=today)
+    for day in set(past.values_list("due_day", flat=True).order_by()):
+        occurrence = _occurrence(today.year, today.month, day)
+        if occurrence < today:
+            year, month = (today.year + 1, 1) if today.month == 12 else (today.year, today.month + 1)
+            occurrence = _occurrence(year, month, day)
+        past.filter(due_day=day).update(next_due_date=occurrence)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0008_client_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='client',
+            name='client_status_due_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='client',
+            name='client_due_date_idx',
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='next_due_date',
+            field=models.DateField(blank=True, editable=False, help_text='Próxima ocorrência do vencimento (avançada diariamente), usada nos envios e filtros.', null=True, verbose_name='Próximo vencimento'),
+        ),
+        migrations.RunPython(backfill_next_due_date, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['status', 'next_due_date'], name='client_status_next_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['next_due_date'], name='client_next_due_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.11 on 2026-10-18 13:00
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_synced_phone(apps, schema_editor):
+    # O hook antigo sincronizava a cada gravação: considerar os contatos atuais já sincronizados
+    Client = apps.get_model("clients", "Client")
+    batch = []
+    queryset = Client.objects.filter(auto_messaging_enabled=True).exclude(phone="").only("id", "phone")
+    for client in queryset.iterator(chunk_size=BATCH_SIZE):
+        client.contact_synced_phone = "".join(filter(str.isdigit, client.phone))
+        batch.append(client)
+        if len(batch) >= BATCH_SIZE:
+            Client.objects.bulk_update(batch, ["contact_synced_phone"])
+            batch = []
+    if batch:
+        Client.objects.bulk_update(batch, ["contact_synced_phone"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0009_client_next_due_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='contact_sync_pending',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Sincronização pendente'),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='contact_synced_phone',
+            field=models.CharField(blank=True, editable=False, help_text='Último telefone enviado ao bot (/sync-contacts).', max_length=20, verbose_name='Telefone sincronizado'),
+        ),
+        migrations.RunPython(backfill_synced_phone, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(condition=models.Q(('contact_sync_pending', True)), fields=['id'], name='client_contact_sync_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.11 on 2026-10-18 13:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0010_client_contact_sync'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='client',
+            name='client_status_next_due_idx',
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['status', 'due_date'], name='client_status_due_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['due_date'], name='client_due_date_idx'),
+        ),
+    ]
@@ -1,6 +1,53 @@
+from __future__ import annotations
+
+from calendar import monthrange
 from datetime import date
+from typing import Iterable, Optional
 
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+PHONE_KEY_LENGTH = 9
+
+
+def phone_key(phone: str) -> str:
+    """Chave de busca do telefone: últimos 9 dígitos (ignora DDI/DDD e máscara)."""
+    digits = "".join(filter(str.isdigit, phone or ""))
+    return digits[-PHONE_KEY_LENGTH:]
+
+
+def month_occurrence(year: int, month: int, day: int) -> date:
+    """Dia ``day`` do mês, limitado ao último dia (ex.: dia 31 em fevereiro vira 28/29)."""
+    return date(year, month, min(day, monthrange(year, month)[1]))
+
+
+def next_due_date_for(due_date: Optional[date], due_day: Optional[int], today: date) -> Optional[date]:
+    """
+    Próxima ocorrência do vencimento a partir de ``today`` (inclusive). Se a data
+    cadastrada já passou, avança para o dia de vencimento no mês atual ou no seguinte.
+    """
+    if due_date and due_date >= today:
+        return due_date
+    day = due_date.day if due_date else due_day
+    if not day:
+        return None
+    occurrence = month_occurrence(today.year, today.month, day)
+    if occurrence < today:
+        if today.month == 12:
+            occurrence = month_occurrence(today.year + 1, 1, day)
+        else:
+            occurrence = month_occurrence(today.year, today.month + 1, day)
+    return occurrence
+
+
+def due_on(day: date) -> models.Q:
+    """
+    Clientes cobrados em ``day`` (envios automáticos e "vencendo hoje/amanhã" do
+    painel): o vencimento cadastrado. Datas já passadas não viram cobrança mensal,
+    mesmo com ``next_due_date`` avançado pela virada diária.
+    """
+    return models.Q(due_date=day)
 
 
 class Client(models.Model):
@@ -15,6 +62,14 @@ class Client(models.Model):
 
     name = models.CharField("Nome", max_length=100)
     phone = models.CharField("Telefone", max_length=20)
+    phone_key = models.CharField(
+        "Chave do telefone",
+        max_length=PHONE_KEY_LENGTH,
+        blank=True,
+        db_index=True,
+        editable=False,
+        help_text="Últimos 9 dígitos do telefone, usados nas buscas dos webhooks e importações.",
+    )
     email = models.EmailField("E-mail", blank=True)
     vehicle_type = models.CharField(
         "Tipo de Veículo",
@@ -30,6 +85,13 @@ class Client(models.Model):
         help_text="Próxima data de cobrança.",
     )
     due_day = models.PositiveSmallIntegerField("Dia de vencimento", default=5, editable=False)
+    next_due_date = models.DateField(
+        "Próximo vencimento",
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Próxima ocorrência do vencimento (avançada diariamente), usada nos envios e filtros.",
+    )
     payment_link = models.URLField("Link de pagamento", blank=True)
     status = models.CharField(
         "Status",
@@ -42,6 +104,14 @@ class Client(models.Model):
         default=True,
         help_text="Quando ativo, o sistema enviará mensagens automáticas nas datas configuradas.",
     )
+    contact_synced_phone = models.CharField(
+        "Telefone sincronizado",
+        max_length=20,
+        blank=True,
+        editable=False,
+        help_text="Último telefone enviado ao bot (/sync-contacts).",
+    )
+    contact_sync_pending = models.BooleanField("Sincronização pendente", default=False, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -49,6 +119,24 @@ class Client(models.Model):
         ordering = ("name",)
         verbose_name = "Cliente"
         verbose_name_plural = "Clientes"
+        indexes = [
+            # Envios automáticos (status + vencimento, due_on) e contagens por status
+            models.Index(fields=["status", "due_date"], name="client_status_due_date_idx"),
+            # Vencendo hoje/amanhã no painel (due_on)
+            models.Index(fields=["due_date"], name="client_due_date_idx"),
+            # Filtro por data no controle do bot e virada diária
+            models.Index(fields=["next_due_date"], name="client_next_due_idx"),
+            # Filtro por dia/veículo no controle do bot
+            models.Index(fields=["auto_messaging_enabled", "due_day", "vehicle_type"], name="client_auto_day_vehicle_idx"),
+            # Ordenação padrão das listagens
+            models.Index(fields=["name"], name="client_name_idx"),
+            # Fila de contatos a sincronizar com o bot (índice parcial, só as pendentes)
+            models.Index(
+                fields=["id"],
+                condition=models.Q(contact_sync_pending=True),
+                name="client_contact_sync_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -57,26 +145,169 @@ class Client(models.Model):
     def formatted_phone(self) -> str:
         return "".join(filter(str.isdigit, self.phone or ""))
 
-    def save(self, *args, **kwargs):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Valores carregados do banco, para detectar alterações sem nova consulta no save()
+        instance._loaded_values = {
+            name: value for name, value in zip(field_names, values) if value is not models.DEFERRED
+        }
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        # Os valores recarregados passam a ser a referência do has_changed()
+        if fields is None:
+            names = [field.attname for field in self._meta.concrete_fields]
+        else:
+            names = [self._meta.get_field(name).attname for name in fields]
+        loaded = getattr(self, "_loaded_values", None) or {}
+        loaded.update({name: getattr(self, name) for name in names if name in self.__dict__})
+        self._loaded_values = loaded
+
+    def _remember_loaded_values(self) -> None:
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+    def has_changed(self, field_name: str) -> bool:
+        """Indica se o campo mudou desde que o cliente foi carregado (ou salvo pela última vez)."""
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is None or field_name not in loaded:
+            # Instância montada manualmente ou campo adiado: consultar o banco
+            original = type(self).objects.filter(pk=self.pk).values_list(field_name, flat=True).first()
+            return original != getattr(self, field_name)
+        return loaded[field_name] != getattr(self, field_name)
+
+    def apply_derived_fields(self) -> None:
+        """Campos calculados a partir de outros (usado também em bulk_create/bulk_update)."""
+        self.phone_key = phone_key(self.phone)
         if self.due_date:
             self.due_day = self.due_date.day
-        
+        self.next_due_date = next_due_date_for(self.due_date, self.due_day, timezone.localdate())
+        # Sincronizar com o bot só quando o telefone difere do último sincronizado
+        self.contact_sync_pending = bool(
+            self.auto_messaging_enabled and self.formatted_phone and self.formatted_phone != self.contact_synced_phone
+        )
+
+    def upcoming_due_date(self, today: Optional[date] = None) -> date:
+        """Vencimento usado nas mensagens; recalcula se a virada diária ainda não passou por este cliente."""
+        today = today or timezone.localdate()
+        if self.next_due_date and self.next_due_date >= today:
+            return self.next_due_date
+        return next_due_date_for(self.due_date, self.due_day, today) or today
+
+    def apply_vehicle_fee(self) -> None:
+        """Define a mensalidade conforme o tipo de veículo."""
+        if self.vehicle_type == self.VehicleType.MOTO:
+            self.monthly_fee = 49.99
+        elif self.vehicle_type == self.VehicleType.CARRO:
+            self.monthly_fee = 59.99
+
+    def apply_pricing_rule(self) -> bool:
+        """
+        Atualiza a mensalidade se o cliente é novo ou se o tipo de veículo mudou.
+        Retorna ``True`` quando a mensalidade foi recalculada.
+        """
+        if not self.pk or self.has_changed("vehicle_type"):
+            self.apply_vehicle_fee()
+            return True
+        return False
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+
+        self.apply_derived_fields()
+
         # Definir valor automaticamente baseado no tipo de veículo
         # Se for novo cliente ou se o tipo de veículo mudou
-        if not self.pk:
-            # Novo cliente - definir valor automaticamente
-            if self.vehicle_type == self.VehicleType.MOTO:
-                self.monthly_fee = 49.99
-            elif self.vehicle_type == self.VehicleType.CARRO:
-                self.monthly_fee = 59.99
-        else:
-            # Cliente existente - verificar se o tipo de veículo mudou
-            old_instance = Client.objects.get(pk=self.pk)
-            if old_instance.vehicle_type != self.vehicle_type:
-                # Tipo mudou - atualizar valor automaticamente
-                if self.vehicle_type == self.VehicleType.MOTO:
-                    self.monthly_fee = 49.99
-                elif self.vehicle_type == self.VehicleType.CARRO:
-                    self.monthly_fee = 59.99
-        
+        if update_fields is None or "vehicle_type" in update_fields:
+            if self.apply_pricing_rule() and update_fields is not None:
+                update_fields.add("monthly_fee")
+
+        if update_fields is not None:
+            # Manter os campos calculados consistentes com os campos gravados
+            if "phone" in update_fields:
+                update_fields.add("phone_key")
+            if {"phone", "auto_messaging_enabled"} & update_fields:
+                update_fields.add("contact_sync_pending")
+            if "due_date" in update_fields:
+                update_fields.update(("due_day", "next_due_date"))
+            kwargs["update_fields"] = update_fields
+
         super().save(*args, **kwargs)
+        self._remember_loaded_values()
+
+
+def prepare_for_bulk(clients: Iterable[Client]) -> None:
+    """
+    Equivalente do ``save()`` para ``bulk_create``/``bulk_update``: recalcula os
+    campos derivados e aplica a regra de preço sem consultas extras para
+    clientes carregados do banco. Inclua ``BULK_DERIVED_FIELDS`` no ``bulk_update``.
+    """
+    for client in clients:
+        client.apply_derived_fields()
+        client.apply_pricing_rule()
+
+
+BULK_DERIVED_FIELDS = ("phone_key", "due_day", "next_due_date", "contact_sync_pending", "monthly_fee")
+
+
+class ImportJob(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Na fila"
+        RUNNING = "running", "Em andamento"
+        COMPLETED = "completed", "Concluído"
+        FAILED = "failed", "Falha"
+
+    file = models.FileField("Arquivo", upload_to="imports/%Y/%m/", blank=True)
+    original_name = models.CharField("Nome do arquivo", max_length=255, blank=True)
+    file_size = models.PositiveBigIntegerField("Tamanho (bytes)", default=0)
+    bytes_read = models.PositiveBigIntegerField("Bytes processados", default=0)
+    status = models.CharField(
+        "Status",
+        max_length=20,
+        choices=Status.choices,
+        default=Status.QUEUED,
+    )
+    processed_rows = models.PositiveIntegerField("Linhas processadas", default=0)
+    created = models.PositiveIntegerField("Criados", default=0)
+    updated = models.PositiveIntegerField("Atualizados", default=0)
+    failed = models.PositiveIntegerField("Linhas com erro", default=0)
+    errors = models.JSONField("Erros", default=list, blank=True)
+    error_message = models.TextField("Mensagem de erro", blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="client_import_jobs",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField("Início", null=True, blank=True)
+    finished_at = models.DateTimeField("Término", null=True, blank=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+        verbose_name = "Importação de contatos"
+        verbose_name_plural = "Importações de contatos"
+
+    def __str__(self) -> str:
+        return f"Importação #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def progress(self) -> int:
+        """Percentual aproximado, pelo volume do arquivo já lido."""
+        if self.status == self.Status.COMPLETED:
+            return 100
+        if not self.file_size:
+            return 0
+        return min(int(self.bytes_read * 100 / self.file_size), 99)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.Status.COMPLETED, self.Status.FAILED)
@@ -0,0 +1,38 @@
+"""
+Virada diária de ``Client.next_due_date``.
+
+Clientes cujo próximo vencimento já passou avançam para a próxima ocorrência
+do dia de vencimento. A atualização é feita em UPDATEs em massa, um por dia de
+vencimento (no máximo 31), filtrando pelo índice de ``next_due_date``.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date
+from typing import Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Client, next_due_date_for
+from .signals import clients_bulk_changed
+
+logger = logging.getLogger(__name__)
+
+
+def roll_over_due_dates(today: Optional[date] = None) -> int:
+    """Avança os vencimentos vencidos. Retorna o número de clientes atualizados."""
+    today = today or timezone.localdate()
+    stale = Client.objects.filter(next_due_date__lt=today)
+    days = sorted(set(stale.values_list("due_day", flat=True).order_by()))
+
+    updated = 0
+    with transaction.atomic():
+        for day in days:
+            updated += stale.filter(due_day=day).update(next_due_date=next_due_date_for(None, day, today))
+
+    if updated:
+        logger.info("Virada de vencimentos: %s clientes avançados", updated)
+        # update() não dispara post_save
+        clients_bulk_changed.send(sender=Client, client_ids=None)
+    return updated
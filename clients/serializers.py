@@ -14,11 +14,12 @@ class ClientSerializer(serializers.ModelSerializer):
             "monthly_fee",
             "due_date",
             "due_day",
+            "next_due_date",
             "payment_link",
             "status",
             "auto_messaging_enabled",
             "created_at",
             "updated_at",
         ]
-        read_only_fields = ["id", "due_day", "created_at", "updated_at"]
+        read_only_fields = ["id", "due_day", "next_due_date", "created_at", "updated_at"]
 
@@ -1,61 +1,27 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-from django.conf import settings
-import requests
-import logging
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
 
+from .contact_sync import schedule_contact_sync
+from .lookup import client_lookup_cache
 from .models import Client
 
-logger = logging.getLogger(__name__)
+# Enviado após gravações em lote de clientes (bulk_create/bulk_update não disparam post_save).
+# Argumento: ``client_ids`` (ids criados ou alterados; ``None`` quando não listados, como na virada de vencimentos).
+clients_bulk_changed = Signal()
 
 
 @receiver(post_save, sender=Client)
-def sync_client_to_whatsapp(sender, instance, created, **kwargs):
+@receiver(post_delete, sender=Client)
+def invalidate_client_lookup(sender, instance, **kwargs):
+    client_lookup_cache.invalidate_client(instance.pk, instance.phone_key)
+
+
+@receiver(post_save, sender=Client)
+def schedule_client_contact_sync(sender, instance, **kwargs):
     """
-    Sincroniza o cliente com o WhatsApp quando criado ou atualizado
+    Telefone novo ou alterado: agendar a sincronização com o WhatsApp após o commit.
+    O envio ao bot é feito em lote por ``clients.contact_sync``.
     """
-    # Só sincronizar se o telefone mudou ou é um novo cliente
-    if not instance.phone or not instance.auto_messaging_enabled:
-        return
-    
-    try:
-        bot_url = getattr(settings, "WPPCONNECT_BOT_URL", "http://localhost:3001")
-        
-        # Verificar se o bot está conectado
-        try:
-            status_response = requests.get(f"{bot_url}/status", timeout=5)
-            if status_response.status_code == 200:
-                bot_status = status_response.json()
-                if bot_status.get("status") != "connected":
-                    logger.info(f"Bot não está conectado, pulando sincronização de {instance.name}")
-                    return
-            else:
-                return
-        except requests.exceptions.RequestException:
-            logger.warning("Não foi possível verificar status do bot, pulando sincronização")
-            return
-        
-        # Adicionar contato ao WhatsApp
-        try:
-            response = requests.post(
-                f"{bot_url}/add-contact",
-                json={
-                    "phone": instance.formatted_phone,
-                    "name": instance.name,
-                },
-                timeout=10,
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("success") and result.get("exists"):
-                    logger.info(f"✅ Cliente {instance.name} ({instance.formatted_phone}) verificado no WhatsApp")
-                else:
-                    logger.warning(f"⚠️ Cliente {instance.name} ({instance.formatted_phone}) não encontrado no WhatsApp")
-            else:
-                logger.warning(f"Erro ao sincronizar cliente {instance.name}: HTTP {response.status_code}")
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Erro ao sincronizar cliente {instance.name} com WhatsApp: {e}")
-    except Exception as e:
-        logger.exception(f"Erro inesperado ao sincronizar cliente {instance.name}: {e}")
-
+    if instance.contact_sync_pending:
+        transaction.on_commit(schedule_contact_sync)
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from celery import shared_task
+from django.core.cache import cache
+
+from .contact_sync import CONTACT_SYNC_SCHEDULED_KEY, push_pending_contacts
+from .importer import run_import_job
+from .rollover import roll_over_due_dates
+
+
+@shared_task
+def sync_pending_contacts() -> Dict[str, int]:
+    # Liberar o agendamento antes de sincronizar: gravações feitas agora agendam a próxima rodada
+    cache.delete(CONTACT_SYNC_SCHEDULED_KEY)
+    return push_pending_contacts()
+
+
+@shared_task
+def execute_import_job(job_id: int) -> Dict[str, Any]:
+    return run_import_job(job_id)
+
+
+@shared_task
+def roll_over_client_due_dates() -> Dict[str, int]:
+    return {"updated": roll_over_due_dates()}
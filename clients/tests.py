@@ -1,3 +1,56 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+
+from .importer import run_import_job
+from .models import Client, ImportJob
+
+
+class ClientChangeTrackingTests(TestCase):
+    def test_refresh_from_db_resets_loaded_values(self):
+        client = Client.objects.create(name="Cliente", phone="5511999990000", monthly_fee=Decimal("49.99"))
+        client = Client.objects.get(pk=client.pk)
+        Client.objects.filter(pk=client.pk).update(vehicle_type=Client.VehicleType.CARRO, monthly_fee=Decimal("70"))
+
+        client.refresh_from_db()
+        self.assertFalse(client.has_changed("vehicle_type"))
+        client.save()
+
+        client.refresh_from_db()
+        self.assertEqual(client.monthly_fee, Decimal("70.00"))
+
+
+class ImportJobTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def test_failed_import_removes_file_and_clears_its_name(self):
+        job = ImportJob.objects.create(file=ContentFile(b"name,phone\n\xff\xfe", name="invalido.csv"))
+        storage, path = job.file.storage, job.file.name
+        self.assertTrue(storage.exists(path))
+
+        with self.assertRaises(UnicodeDecodeError):
+            run_import_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.Status.FAILED)
+        self.assertIn("UTF-8", job.error_message)
+        self.assertEqual(job.file.name, "")
+        self.assertFalse(storage.exists(path))
+
+    def test_phone_without_digits_is_a_row_error(self):
+        content = b"name,phone,monthly_fee,due_date\nCliente Um,5511999990001,49.99,10/03/2026\nSem Telefone,---,49.99,10/03/2026\n"
+        job = ImportJob.objects.create(file=ContentFile(content, name="clientes.csv"))
+
+        self.assertEqual(run_import_job(job.pk), {"created": 1, "updated": 0, "failed": 1})
+
+        job.refresh_from_db()
+        self.assertEqual(job.processed_rows, job.created + job.updated + job.failed)
+        self.assertEqual(job.errors, ["Linha 3: phone inválido (---)."])
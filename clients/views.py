@@ -1,5 +1,9 @@
 from rest_framework import filters, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
+from .lookup import client_lookup_cache
 from .models import Client
 from .serializers import ClientSerializer
 
@@ -10,3 +14,8 @@ class ClientViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["name", "phone", "email"]
     ordering_fields = ["name", "monthly_fee", "due_day", "status", "created_at"]
+
+    @action(detail=False, methods=["get"], url_path="lookup-cache", permission_classes=[IsAuthenticated])
+    def lookup_cache(self, request):
+        """Métricas do cache telefone → cliente deste processo (hits/misses)."""
+        return Response(client_lookup_cache.stats())
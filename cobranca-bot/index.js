@@ -121,13 +121,83 @@ let app = express();
 app.use(cors());
 app.use(express.json());
 
-// Estado do bot
-let botState = {
+// Estado do bot (mudanças de status/QR Code são publicadas no Django, ver scheduleStatusPush)
+let botState = new Proxy({
   status: 'disconnected',
   qrCode: null,
   error: null,
   connectedAt: null,
-};
+}, {
+  set(target, prop, value) {
+    const changed = target[prop] !== value;
+    target[prop] = value;
+    if (changed && (prop === 'status' || prop === 'qrCode')) {
+      scheduleStatusPush();
+    }
+    return true;
+  },
+});
+
+const BOT_WEBHOOK_TOKEN = process.env.BOT_WEBHOOK_TOKEN || '';
+let statusPushTimer = null;
+
+// Limite do /send-bulk (token bucket): mesmas variáveis usadas pelo Django para o bot
+const BULK_SEND_RATE = Number(process.env.BOT_SEND_RATE_PER_SECOND || 0.5);
+const BULK_SEND_BURST = Math.max(1, Number(process.env.BOT_SEND_BURST || 1));
+const bulkBucket = { tokens: BULK_SEND_BURST, updated: Date.now() };
+
+async function acquireBulkSlot() {
+  if (!(BULK_SEND_RATE > 0)) return;
+  for (;;) {
+    const now = Date.now();
+    bulkBucket.tokens = Math.min(
+      BULK_SEND_BURST,
+      bulkBucket.tokens + ((now - bulkBucket.updated) / 1000) * BULK_SEND_RATE
+    );
+    bulkBucket.updated = now;
+    if (bulkBucket.tokens >= 1) {
+      bulkBucket.tokens -= 1;
+      return;
+    }
+    const waitMs = ((1 - bulkBucket.tokens) / BULK_SEND_RATE) * 1000;
+    await new Promise((resolve) => setTimeout(resolve, waitMs));
+  }
+}
+
+// Status no mesmo formato do GET /status
+function currentStatus() {
+  // Garantir que o QR Code está atualizado no estado
+  if (qrCodeBase64 && !botState.qrCode) {
+    botState.qrCode = cleanQRCode(qrCodeBase64);
+  }
+
+  const qrCode = botState.qrCode || qrCodeBase64;
+
+  return {
+    status: botState.status,
+    qrCode: cleanQRCode(qrCode), // Retornar QR Code limpo (sem prefixo)
+    error: botState.error,
+    connectedAt: botState.connectedAt,
+    isConnected: !!whatsappClient,
+  };
+}
+
+// Publica o status no Django (cache compartilhado), agrupando mudanças próximas
+function scheduleStatusPush() {
+  // Sem token o Django recusa o webhook; o status segue disponível pelo GET /status
+  if (!BOT_WEBHOOK_TOKEN || statusPushTimer) return;
+  statusPushTimer = setTimeout(async () => {
+    statusPushTimer = null;
+    try {
+      await axios.post(`${DJANGO_API_URL}/webhooks/bot-status/`, currentStatus(), {
+        headers: { 'X-Bot-Token': BOT_WEBHOOK_TOKEN },
+        timeout: 5000,
+      });
+    } catch (error) {
+      console.error('Erro ao publicar status no Django:', error.message);
+    }
+  }, 200);
+}
 
 // Função para limpar QR Code (remover prefixo data:image se existir)
 function cleanQRCode(qrCode) {
@@ -675,20 +745,7 @@ app.get('/', (req, res) => {
 
 // Status do bot
 app.get('/status', (req, res) => {
-  // Garantir que o QR Code está atualizado no estado
-  if (qrCodeBase64 && !botState.qrCode) {
-    botState.qrCode = cleanQRCode(qrCodeBase64);
-  }
-  
-  const qrCode = botState.qrCode || qrCodeBase64;
-  
-  res.json({
-    status: botState.status,
-    qrCode: cleanQRCode(qrCode), // Retornar QR Code limpo (sem prefixo)
-    error: botState.error,
-    connectedAt: botState.connectedAt,
-    isConnected: !!whatsappClient,
-  });
+  res.json(currentStatus());
 });
 
 // Iniciar bot
@@ -1221,14 +1278,10 @@ app.post('/send-bulk', async (req, res) => {
         continue;
       }
       
+      await acquireBulkSlot();
       const result = await sendMessage(phone, message);
       console.log(`[BULK] [${i + 1}/${clients.length}] ✅ Sucesso para ${formattedPhone}`);
       results.push({ phone: formattedPhone, success: true, result });
-      
-      // Pequeno delay para evitar rate limit (2 segundos entre mensagens)
-      if (i < clients.length - 1) {
-        await new Promise((resolve) => setTimeout(resolve, 2000));
-      }
     } catch (error) {
       const phone = typeof client === 'string' ? client : client.phone;
       const formattedPhone = formatPhone(phone);
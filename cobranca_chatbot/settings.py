@@ -115,6 +115,11 @@ INSTALLED_APPS = [
     'dashboard',
 ]
 
+# Comandos de benchmark (seed_benchmark_data, run_benchmarks): só em desenvolvimento ou com BENCHMARKS_ENABLED=True
+BENCHMARKS_ENABLED = os.getenv('BENCHMARKS_ENABLED', str(DEBUG)) == 'True'
+if BENCHMARKS_ENABLED:
+    INSTALLED_APPS.append('benchmarks')
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -185,6 +190,23 @@ else:
         }
     }
 
+# Cache compartilhado entre os workers (status do bot, indicadores do painel, agendamentos).
+# Com CACHE_URL (ex.: redis://localhost:6379/1) usa Redis; sem ele, memória local de cada processo.
+CACHE_URL = os.getenv('CACHE_URL', '')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -292,8 +314,55 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+# Publicar tasks de manutenção (sincronização de contatos, eventos recebidos) no broker.
+# Desligado quando CELERY_BROKER_URL não está definido: sem worker, os comandos com --loop fazem esse trabalho
+TASK_QUEUE_ENABLED = os.getenv('TASK_QUEUE_ENABLED', 'True' if os.getenv('CELERY_BROKER_URL') else 'False') == 'True'
+
+# Envios agendados: tamanho de cada lote e número máximo de lotes em paralelo
+AUTOMATION_BATCH_SIZE = int(os.getenv('AUTOMATION_BATCH_SIZE', '200'))
+AUTOMATION_MAX_CONCURRENCY = int(os.getenv('AUTOMATION_MAX_CONCURRENCY', '4'))
+
+# Logs de envio gravados em lote (bulk_create/bulk_update)
+MESSAGE_LOG_BATCH_SIZE = int(os.getenv('MESSAGE_LOG_BATCH_SIZE', '500'))
+# Segundos até um log pendente (processo caiu antes de finalizar o envio) ser marcado como falha;
+# deve ser maior que a duração de um lote de envio
+MESSAGE_LOG_PENDING_TIMEOUT = int(os.getenv('MESSAGE_LOG_PENDING_TIMEOUT', '1800'))
+# Segundos sem progresso até um envio em massa "em andamento" ser encerrado como falha
+BULK_SEND_JOB_STALE_TIMEOUT = int(os.getenv('BULK_SEND_JOB_STALE_TIMEOUT', '900'))
+
+# Cache por processo dos templates ativos (segundos até reconsultar o banco)
+MESSAGE_TEMPLATE_CACHE_TTL = float(os.getenv('MESSAGE_TEMPLATE_CACHE_TTL', '300'))
+
+# Webhooks: "sync" processa na própria requisição; "queued" grava no buffer de eventos,
+# responde na hora e o worker processa em lote (respostas automáticas enviadas pelo bot).
+# O modo "queued" exige TASK_QUEUE_ENABLED (broker configurado); sem ele o Django não inicia
+WEBHOOK_INGESTION_MODE = os.getenv('WEBHOOK_INGESTION_MODE', 'sync')
+INBOUND_EVENT_BATCH_SIZE = int(os.getenv('INBOUND_EVENT_BATCH_SIZE', '200'))
+INBOUND_EVENT_DRAIN_DELAY = float(os.getenv('INBOUND_EVENT_DRAIN_DELAY', '1'))
+INBOUND_EVENT_CLAIM_TIMEOUT = int(os.getenv('INBOUND_EVENT_CLAIM_TIMEOUT', '300'))
+INBOUND_EVENT_MAX_ATTEMPTS = int(os.getenv('INBOUND_EVENT_MAX_ATTEMPTS', '3'))
 
 CELERY_BEAT_SCHEDULE = {
+    'sync_pending_contacts': {
+        'task': 'clients.tasks.sync_pending_contacts',
+        'schedule': 300.0,
+    },
+    'process_inbound_events': {
+        'task': 'messaging.tasks.process_inbound_events',
+        'schedule': 60.0,
+    },
+    'fail_stale_pending_logs': {
+        'task': 'messaging.tasks.fail_stale_pending_message_logs',
+        'schedule': 600.0,
+    },
+    'fail_stale_bulk_send_jobs': {
+        'task': 'messaging.tasks.fail_stale_bulk_send_jobs_task',
+        'schedule': 600.0,
+    },
+    'roll_over_due_dates_daily': {
+        'task': 'clients.tasks.roll_over_client_due_dates',
+        'schedule': crontab(minute=5, hour=0),
+    },
     'send_reminders_daily': {
         'task': 'automation.tasks.send_reminder_messages',
         'schedule': crontab(minute=0, hour=9),
@@ -326,6 +395,19 @@ LOGGING = {
 }
 
 
+# E-mail (canal de e-mail dos templates): servidor SMTP e mensagens por bloco de send_messages,
+# todas pela mesma conexão
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'False') == 'True'
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', '30'))
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'no-reply@cobranca.local')
+EMAIL_BATCH_SIZE = int(os.getenv('EMAIL_BATCH_SIZE', '50'))
+
+
 # WhatsApp provider configuration
 WHATSAPP_PROVIDER = os.getenv('WHATSAPP_PROVIDER', 'meta').lower()
 WHATSAPP_API_URL = os.getenv('WHATSAPP_API_URL', 'https://graph.facebook.com/v18.0')
@@ -341,6 +423,67 @@ WHAPI_TOKEN = os.getenv('WHAPI_TOKEN', '')
 INFOBIP_BASE_URL = os.getenv('INFOBIP_BASE_URL', '')
 INFOBIP_API_KEY = os.getenv('INFOBIP_API_KEY', '')
 INFOBIP_SENDER = os.getenv('INFOBIP_SENDER', '')
+# Envio em lote pela Infobip: template aprovado com um único placeholder no corpo
+# (recebe a mensagem renderizada), idioma e mensagens por requisição
+INFOBIP_BULK_TEMPLATE = os.getenv('INFOBIP_BULK_TEMPLATE', '')
+INFOBIP_BULK_TEMPLATE_LANGUAGE = os.getenv('INFOBIP_BULK_TEMPLATE_LANGUAGE', 'pt_BR')
+INFOBIP_BATCH_SIZE = int(os.getenv('INFOBIP_BATCH_SIZE', '100'))
 
 # WPPConnect Bot settings
 WPPCONNECT_BOT_URL = os.getenv('WPPCONNECT_BOT_URL', 'http://localhost:3001')
+
+# Status do bot em cache (segundos): consulta ao /status, status publicado pelo bot via webhook
+# e espera máxima pelo resultado de uma consulta já em andamento em outro processo
+BOT_STATUS_CACHE_TTL = float(os.getenv('BOT_STATUS_CACHE_TTL', '10'))
+BOT_STATUS_PUSH_TTL = float(os.getenv('BOT_STATUS_PUSH_TTL', '60'))
+BOT_STATUS_REFRESH_WAIT = float(os.getenv('BOT_STATUS_REFRESH_WAIT', '6'))
+# Token enviado pelo bot no header X-Bot-Token do webhook de status (vazio = webhook desativado;
+# o status passa a vir só da consulta ao /status)
+BOT_WEBHOOK_TOKEN = os.getenv('BOT_WEBHOOK_TOKEN', '')
+
+# Limite de envio por provedor/remetente (token bucket compartilhado pelo cache):
+# mensagens por segundo (0 = sem limite) e rajada máxima
+BOT_SEND_RATE_PER_SECOND = float(os.getenv('BOT_SEND_RATE_PER_SECOND', '0.5'))
+BOT_SEND_BURST = int(os.getenv('BOT_SEND_BURST', '1'))
+META_SEND_RATE_PER_SECOND = float(os.getenv('META_SEND_RATE_PER_SECOND', '20'))
+META_SEND_BURST = int(os.getenv('META_SEND_BURST', '20'))
+WHAPI_SEND_RATE_PER_SECOND = float(os.getenv('WHAPI_SEND_RATE_PER_SECOND', '5'))
+WHAPI_SEND_BURST = int(os.getenv('WHAPI_SEND_BURST', '5'))
+INFOBIP_SEND_RATE_PER_SECOND = float(os.getenv('INFOBIP_SEND_RATE_PER_SECOND', '20'))
+INFOBIP_SEND_BURST = int(os.getenv('INFOBIP_SEND_BURST', '20'))
+# Ajuste da taxa: 429/5xx multiplicam por DECREASE_FACTOR (mínimo MIN_FACTOR da taxa configurada);
+# INCREASE_AFTER sucessos seguidos multiplicam por INCREASE_FACTOR; reenvios após 429/503
+SEND_RATE_MIN_FACTOR = float(os.getenv('SEND_RATE_MIN_FACTOR', '0.1'))
+SEND_RATE_DECREASE_FACTOR = float(os.getenv('SEND_RATE_DECREASE_FACTOR', '0.5'))
+SEND_RATE_INCREASE_AFTER = int(os.getenv('SEND_RATE_INCREASE_AFTER', '50'))
+SEND_RATE_INCREASE_FACTOR = float(os.getenv('SEND_RATE_INCREASE_FACTOR', '1.25'))
+SEND_THROTTLE_RETRIES = int(os.getenv('SEND_THROTTLE_RETRIES', '3'))
+
+# Motor de envio: "batch" usa a API de lote do provedor quando houver (Infobip), "single" envia uma a uma
+WHATSAPP_DISPATCH_MODE = os.getenv('WHATSAPP_DISPATCH_MODE', 'batch')
+# Motor de envio concorrente: requisições simultâneas por provedor
+META_SEND_CONCURRENCY = int(os.getenv('META_SEND_CONCURRENCY', '8'))
+WHAPI_SEND_CONCURRENCY = int(os.getenv('WHAPI_SEND_CONCURRENCY', '4'))
+INFOBIP_SEND_CONCURRENCY = int(os.getenv('INFOBIP_SEND_CONCURRENCY', '8'))
+BOT_SEND_CONCURRENCY = int(os.getenv('BOT_SEND_CONCURRENCY', '1'))
+
+# Cache em memória telefone → cliente usado pelos webhooks
+CLIENT_LOOKUP_CACHE_SIZE = int(os.getenv('CLIENT_LOOKUP_CACHE_SIZE', '10000'))
+CLIENT_LOOKUP_CACHE_TTL = float(os.getenv('CLIENT_LOOKUP_CACHE_TTL', '60'))
+
+# Importação de clientes em lote e sincronização posterior dos contatos com o bot
+CLIENT_IMPORT_BATCH_SIZE = int(os.getenv('CLIENT_IMPORT_BATCH_SIZE', '500'))
+CLIENT_IMPORT_INLINE_MAX_BYTES = int(os.getenv('CLIENT_IMPORT_INLINE_MAX_BYTES', str(1024 * 1024)))
+CLIENT_IMPORT_MAX_ERRORS = int(os.getenv('CLIENT_IMPORT_MAX_ERRORS', '500'))
+CONTACT_SYNC_BATCH_SIZE = int(os.getenv('CONTACT_SYNC_BATCH_SIZE', '500'))
+# Janela (segundos) que agrupa as gravações de clientes numa única sincronização com o bot
+CONTACT_SYNC_DEBOUNCE = float(os.getenv('CONTACT_SYNC_DEBOUNCE', '5'))
+
+# Cache dos indicadores da página inicial do painel (segundos)
+DASHBOARD_STATS_CACHE_TTL = int(os.getenv('DASHBOARD_STATS_CACHE_TTL', '30'))
+
+# Pool de conexões HTTP (keep-alive) compartilhado pelos provedores e pelo bot
+WHATSAPP_HTTP_POOL_SIZE = int(os.getenv('WHATSAPP_HTTP_POOL_SIZE', '10'))
+WHATSAPP_HTTP_KEEPALIVE = os.getenv('WHATSAPP_HTTP_KEEPALIVE', 'True') == 'True'
+WHATSAPP_HTTP_RETRIES = int(os.getenv('WHATSAPP_HTTP_RETRIES', '2'))
+WHATSAPP_HTTP_BACKOFF = float(os.getenv('WHATSAPP_HTTP_BACKOFF', '0.5'))
@@ -1,13 +1,8 @@
 from __future__ import annotations
 
-import csv
-import io
-from datetime import datetime
-from decimal import Decimal, InvalidOperation
-from typing import Iterable, Tuple
-
 from django import forms
 
+from clients.importer import REQUIRED_HEADERS, read_headers
 from clients.models import Client
 
 
@@ -83,77 +78,14 @@ class ContactImportForm(forms.Form):
     def clean_file(self):
         uploaded = self.cleaned_data["file"]
         try:
-            decoded = uploaded.read().decode("utf-8-sig")
+            headers = set(read_headers(uploaded))
         except UnicodeDecodeError as exc:  # pragma: no cover - validação simples
             raise forms.ValidationError("Não foi possível ler o arquivo. Utilize codificação UTF-8.") from exc
 
-        reader = csv.DictReader(io.StringIO(decoded))
-        headers = {header.strip().lower() for header in reader.fieldnames or []}
-        required_headers = {"name", "phone", "monthly_fee", "due_date"}
-        missing = required_headers - headers
+        missing = REQUIRED_HEADERS - headers
         if missing:
             raise forms.ValidationError(
                 f"Cabeçalhos obrigatórios ausentes: {', '.join(sorted(missing))}. "
                 "Use colunas: name, phone, monthly_fee, due_date, email, payment_link, status."
             )
-
-        rows: list[dict] = []
-        errors: list[str] = []
-        for idx, row in enumerate(reader, start=2):
-            name = (row.get("name") or "").strip()
-            phone = (row.get("phone") or "").strip()
-            monthly_fee = (row.get("monthly_fee") or "").replace(",", ".").strip()
-            due_date_raw = (row.get("due_date") or "").strip()
-
-            if not name or not phone or not monthly_fee or not due_date_raw:
-                errors.append(f"Linha {idx}: name, phone, monthly_fee e due_date são obrigatórios.")
-                continue
-
-            try:
-                fee_value = Decimal(monthly_fee)
-                if fee_value < 0:
-                    raise InvalidOperation("Valor negativo")
-            except (InvalidOperation, ValueError):
-                errors.append(f"Linha {idx}: monthly_fee inválido ({monthly_fee}).")
-                continue
-
-            due_date = _parse_date(due_date_raw)
-            if not due_date:
-                errors.append(f"Linha {idx}: due_date inválido ({due_date_raw}). Use formato DD/MM/AAAA ou AAAA-MM-DD.")
-                continue
-
-            rows.append(
-                {
-                    "name": name,
-                    "phone": phone,
-                    "email": (row.get("email") or "").strip(),
-                    "monthly_fee": fee_value,
-                    "due_date": due_date.date(),
-                    "payment_link": (row.get("payment_link") or "").strip(),
-                    "status": (row.get("status") or "").strip() or Client.Status.ACTIVE,
-                }
-            )
-
-        if errors:
-            raise forms.ValidationError(errors)
-
-        uploaded.seek(0)
-        uploaded.parsed_rows = rows  # type: ignore[attr-defined]
         return uploaded
-
-
-def _parse_date(value: str) -> datetime | None:
-    value = value.strip()
-    patterns: Iterable[Tuple[str, bool]] = [
-        ("%d/%m/%Y", True),
-        ("%Y-%m-%d", True),
-        ("%d-%m-%Y", True),
-    ]
-    for pattern, _ in patterns:
-        try:
-            return datetime.strptime(value, pattern)
-        except ValueError:
-            continue
-    return None
-
-
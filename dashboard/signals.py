@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from clients.models import Client
+from clients.signals import clients_bulk_changed
+from messaging.models import MessageLog
+from messaging.signals import message_logs_written
+
+from .stats import invalidate_home_stats
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+@receiver(post_save, sender=MessageLog)
+@receiver(post_delete, sender=MessageLog)
+@receiver(clients_bulk_changed)
+@receiver(message_logs_written)
+def invalidate_dashboard_stats(sender, **kwargs):
+    invalidate_home_stats()
@@ -0,0 +1,49 @@
+"""
+Indicadores da página inicial do painel, calculados numa única consulta e
+mantidos em cache por ``DASHBOARD_STATS_CACHE_TTL`` segundos. Os signals de
+``Client`` e ``MessageLog`` (ver ``dashboard.signals``) invalidam o cache.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from clients.models import Client, due_on
+from messaging.models import MessageLog
+
+HOME_STATS_CACHE_KEY = "dashboard:home-stats"
+
+
+def _compute_home_stats() -> Dict[str, Any]:
+    today = timezone.localdate()
+    tomorrow = today + timezone.timedelta(days=1)
+
+    totals = Client.objects.aggregate(
+        total_clients=Count("id"),
+        active_clients=Count("id", filter=Q(status=Client.Status.ACTIVE)),
+        delinquent_clients=Count("id", filter=Q(status=Client.Status.DELINQUENT)),
+        due_today=Count("id", filter=due_on(today)),
+        due_tomorrow=Count("id", filter=due_on(tomorrow)),
+        monthly_revenue=Sum("monthly_fee"),
+    )
+    totals["monthly_revenue"] = totals["monthly_revenue"] or 0
+    totals["last_logs"] = list(MessageLog.objects.select_related("client", "template").order_by("-sent_at")[:10])
+    totals["reference_date"] = today
+    return totals
+
+
+def get_home_stats() -> Dict[str, Any]:
+    stats = cache.get(HOME_STATS_CACHE_KEY)
+    # A virada do dia muda "vence hoje/amanhã" mesmo sem alterações nos dados
+    if stats is None or stats.get("reference_date") != timezone.localdate():
+        stats = _compute_home_stats()
+        cache.set(HOME_STATS_CACHE_KEY, stats, int(getattr(settings, "DASHBOARD_STATS_CACHE_TTL", 30)))
+    return stats
+
+
+def invalidate_home_stats() -> None:
+    cache.delete(HOME_STATS_CACHE_KEY)
@@ -1,3 +1,71 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from clients.models import Client, ImportJob
+from clients.tasks import execute_import_job
+
+CSV = b"name,phone,monthly_fee,due_date\nCliente Um,5511999990001,49.99,10/03/2026\nCliente Dois,5511999990002,59.99,15/03/2026\n"
+
+
+class ContactImportViewTests(TestCase):
+    """Importação pelo painel: inline para arquivos pequenos, em segundo plano para os grandes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("operador", password="x")
+        cls.other_user = get_user_model().objects.create_user("outro", password="x")
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.client.force_login(self.user)
+
+    def upload(self):
+        return self.client.post(
+            reverse("dashboard:client-import"),
+            {"file": SimpleUploadedFile("clientes.csv", CSV, content_type="text/csv")},
+            HTTP_HOST="localhost",
+        )
+
+    def test_small_file_is_imported_inline(self):
+        response = self.upload()
+
+        self.assertRedirects(response, reverse("dashboard:clients"), fetch_redirect_response=False)
+        job = ImportJob.objects.get()
+        self.assertEqual((job.status, job.created, job.failed), (ImportJob.Status.COMPLETED, 2, 0))
+        self.assertEqual(job.file.name, "")
+        self.assertEqual(Client.objects.count(), 2)
+
+    @override_settings(CLIENT_IMPORT_INLINE_MAX_BYTES=1, TASK_QUEUE_ENABLED=False)
+    def test_large_file_without_queue_runs_in_thread(self):
+        with mock.patch("messaging.scheduling.threading.Thread") as thread:
+            self.upload()
+
+        job = ImportJob.objects.get()
+        self.assertEqual(job.status, ImportJob.Status.QUEUED)
+        self.assertEqual(thread.call_args.kwargs["args"], (execute_import_job, (job.pk,)))
+        thread.return_value.start.assert_called_once()
+
+    @override_settings(CLIENT_IMPORT_INLINE_MAX_BYTES=1, TASK_QUEUE_ENABLED=True)
+    def test_large_file_with_queue_goes_to_worker(self):
+        with mock.patch.object(execute_import_job, "delay") as delay:
+            self.upload()
+
+        delay.assert_called_once_with(ImportJob.objects.get().pk)
+
+    def test_job_detail_is_visible_only_to_owner(self):
+        job = ImportJob.objects.create(original_name="clientes.csv", created_by=self.user)
+        url = reverse("dashboard:client-import-status", args=[job.pk])
+
+        self.assertEqual(self.client.get(url, HTTP_HOST="localhost").status_code, 200)
+        self.client.force_login(self.other_user)
+        self.assertEqual(self.client.get(url, HTTP_HOST="localhost").status_code, 404)
@@ -8,6 +8,7 @@ from .views import (
     ClientDeleteView,
     ClientListView,
     ClientUpdateView,
+    ImportJobDetailView,
     TriggerMessageView,
 )
 
@@ -20,6 +21,7 @@ urlpatterns = [
     path("clients/<int:pk>/editar/", ClientUpdateView.as_view(), name="client-update"),
     path("clients/<int:pk>/excluir/", ClientDeleteView.as_view(), name="client-delete"),
     path("clients/importar/", ContactImportView.as_view(), name="client-import"),
+    path("clients/importar/<int:pk>/", ImportJobDetailView.as_view(), name="client-import-status"),
     path("clients/enviar/", TriggerMessageView.as_view(), name="client-send-message"),
     path("bot/", BotControlView.as_view(), name="bot-control"),
 ]
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import logging
 from typing import Any, Dict
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q, Sum
+from django.db.models import Q
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect
 from django.urls import reverse, reverse_lazy
@@ -13,16 +15,24 @@ from django.views import View
 from django.views.generic import (
     CreateView,
     DeleteView,
+    DetailView,
     FormView,
     ListView,
     TemplateView,
     UpdateView,
 )
 
-from clients.models import Client
+from clients.importer import run_import_job
+from clients.models import Client, ImportJob, next_due_date_for
+from clients.tasks import execute_import_job
 from messaging.models import MessageLog, MessageTemplate
+from messaging.scheduling import run_task
+from messaging.templating import template_registry
 
 from .forms import ClientForm, ContactImportForm
+from .stats import get_home_stats
+
+logger = logging.getLogger(__name__)
 
 
 class DashboardHomeView(LoginRequiredMixin, TemplateView):
@@ -30,22 +40,7 @@ class DashboardHomeView(LoginRequiredMixin, TemplateView):
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        today = timezone.localdate()
-        tomorrow = today + timezone.timedelta(days=1)
-
-        clients = Client.objects.all()
-        context.update(
-            {
-                "total_clients": clients.count(),
-                "active_clients": clients.filter(status=Client.Status.ACTIVE).count(),
-                "delinquent_clients": clients.filter(status=Client.Status.DELINQUENT).count(),
-                "due_today": clients.filter(due_date=today).count(),
-                "due_tomorrow": clients.filter(due_date=tomorrow).count(),
-                "monthly_revenue": clients.aggregate(total=Sum("monthly_fee"))["total"] or 0,
-                "last_logs": MessageLog.objects.select_related("client", "template")
-                .order_by("-sent_at")[:10],
-            }
-        )
+        context.update(get_home_stats())
         return context
 
 
@@ -114,51 +109,61 @@ class ContactImportView(LoginRequiredMixin, FormView):
 
     def form_valid(self, form: ContactImportForm) -> HttpResponse:
         uploaded = form.cleaned_data["file"]
-        rows = getattr(uploaded, "parsed_rows", [])
-        created = 0
-        updated = 0
-
-        for row in rows:
-            phone_digits = "".join(filter(str.isdigit, row["phone"]))
-            lookup = {}
-            if len(phone_digits) >= 9:
-                lookup["phone__icontains"] = phone_digits[-9:]
-            else:
-                lookup["phone__icontains"] = phone_digits
-
-            existing = Client.objects.filter(**lookup).first()
-            status = row["status"] if row["status"] in Client.Status.values else Client.Status.ACTIVE
-
-            if existing:
-                for field, value in (
-                    ("name", row["name"]),
-                    ("phone", row["phone"]),
-                    ("email", row["email"]),
-                    ("monthly_fee", row["monthly_fee"]),
-                    ("due_date", row["due_date"]),
-                    ("payment_link", row["payment_link"]),
-                    ("status", status),
-                ):
-                    setattr(existing, field, value)
-                existing.save()
-                updated += 1
-            else:
-                Client.objects.create(
-                    name=row["name"],
-                    phone=row["phone"],
-                    email=row["email"],
-                    monthly_fee=row["monthly_fee"],
-                    due_date=row["due_date"],
-                    payment_link=row["payment_link"],
-                    status=status,
-                )
-                created += 1
-
-        messages.success(
-            self.request,
-            f"Importação concluída. Criados: {created}, atualizados: {updated}.",
+        job = ImportJob.objects.create(
+            file=uploaded,
+            original_name=uploaded.name,
+            file_size=uploaded.size,
+            created_by=self.request.user,
         )
-        return redirect(reverse("dashboard:clients"))
+
+        # Arquivos pequenos são importados na própria requisição; os grandes vão para o worker
+        # (ou para uma thread deste processo, sem fila configurada)
+        inline_limit = int(getattr(settings, "CLIENT_IMPORT_INLINE_MAX_BYTES", 1024 * 1024))
+        if uploaded.size <= inline_limit:
+            try:
+                run_import_job(job.pk)
+            except Exception as exc:  # noqa: BLE001
+                messages.error(self.request, f"Falha na importação: {exc}")
+                return redirect(reverse("dashboard:client-import-status", args=[job.pk]))
+            job.refresh_from_db()
+            messages.success(
+                self.request,
+                f"Importação concluída. Criados: {job.created}, atualizados: {job.updated}, "
+                f"linhas com erro: {job.failed}.",
+            )
+            if not job.failed:
+                return redirect(reverse("dashboard:clients"))
+            return redirect(reverse("dashboard:client-import-status", args=[job.pk]))
+
+        try:
+            run_task(execute_import_job, job.pk)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Não foi possível enfileirar a importação %s", job.pk)
+            job.file.delete(save=False)
+            ImportJob.objects.filter(pk=job.pk).update(
+                status=ImportJob.Status.FAILED,
+                file="",
+                error_message=f"Fila de processamento indisponível: {exc}",
+                finished_at=timezone.now(),
+            )
+            messages.error(self.request, "Fila de processamento indisponível. Tente novamente mais tarde.")
+            return redirect(reverse("dashboard:client-import"))
+
+        messages.info(self.request, "Arquivo recebido. A importação continua em segundo plano.")
+        return redirect(reverse("dashboard:client-import-status", args=[job.pk]))
+
+
+class ImportJobDetailView(LoginRequiredMixin, DetailView):
+    model = ImportJob
+    template_name = "dashboard/import_job_detail.html"
+    context_object_name = "job"
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.request.user.is_staff:
+            # Os erros por linha trazem dados dos clientes: só quem importou vê
+            queryset = queryset.filter(created_by=self.request.user)
+        return queryset
 
 
 class TriggerMessageView(LoginRequiredMixin, View):
@@ -174,7 +179,7 @@ class TriggerMessageView(LoginRequiredMixin, View):
             messages.error(request, "Cliente não encontrado.")
             return redirect(request.META.get("HTTP_REFERER", reverse("dashboard:clients")))
 
-        template = MessageTemplate.objects.filter(code=template_code, is_active=True).first()
+        template = template_registry.get(template_code)
         if not template:
             messages.error(request, "Template não encontrado ou inativo.")
             return redirect(request.META.get("HTTP_REFERER", reverse("dashboard:clients")))
@@ -187,7 +192,7 @@ class TriggerMessageView(LoginRequiredMixin, View):
             )
             send_message_to_client(
                 client=client,
-                template_code=template.code,
+                template=template,
                 message_type=message_type,
                 initiated_by=request.user,
             )
@@ -202,9 +207,8 @@ class BotControlView(LoginRequiredMixin, TemplateView):
     template_name = "dashboard/bot_control.html"
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
-        from calendar import monthrange
-        from datetime import date, timedelta
-        
+        from datetime import date
+
         context = super().get_context_data(**kwargs)
         
         # Filtrar por data de vencimento e veículo se fornecido
@@ -223,37 +227,15 @@ class BotControlView(LoginRequiredMixin, TemplateView):
                 # Converter data do formato DD/MM/YYYY
                 day, month, year = map(int, filter_date.split("/"))
                 filter_date_obj = date(year, month, day)
-                today = timezone.localdate()
-                
-                # Se a data já passou, calcular próxima ocorrência
-                if filter_date_obj < today:
-                    # Calcular próximo mês/ano
-                    if month == 12:
-                        next_year = year + 1
-                        next_month = 1
-                    else:
-                        next_year = year
-                        next_month = month + 1
-                    
-                    # Garantir que o dia existe no próximo mês
-                    days_in_month = monthrange(next_year, next_month)[1]
-                    next_day = min(day, days_in_month)
-                    filter_date_obj = date(next_year, next_month, next_day)
-                
-                # Filtrar clientes com vencimento na data calculada
-                # Busca clientes que têm vencimento neste dia específico
-                queryset = queryset.filter(
-                    Q(due_date=filter_date_obj) | 
-                    Q(due_date__isnull=True, due_day=filter_date_obj.day) |
-                    Q(due_date__day=filter_date_obj.day, due_date__month=filter_date_obj.month, due_date__year=filter_date_obj.year)
-                )
+                # Se a data já passou, considerar a próxima ocorrência do dia
+                filter_date_obj = next_due_date_for(filter_date_obj, None, timezone.localdate())
+                queryset = queryset.filter(next_due_date=filter_date_obj)
             except (ValueError, AttributeError):
                 pass  # Se data inválida, não filtrar
         elif filter_day:
             try:
                 day = int(filter_day)
-                today = timezone.localdate()
-                
+
                 # Filtrar clientes que têm vencimento neste dia do mês
                 # Busca por due_day (dia do mês) independente do mês/ano
                 queryset = queryset.filter(due_day=day)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import ClientInteraction, MessageLog, MessageTemplate
+from .models import BulkSendJob, ClientInteraction, InboundEvent, MessageLog, MessageLogDailyRollup, MessageTemplate
 
 
 @admin.register(MessageTemplate)
@@ -24,3 +24,25 @@ class ClientInteractionAdmin(admin.ModelAdmin):
     list_display = ("client", "channel", "normalized_option", "received_at")
     list_filter = ("channel", "normalized_option", "received_at")
     search_fields = ("client__name", "raw_message")
+
+
+@admin.register(BulkSendJob)
+class BulkSendJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "status", "total", "sent", "failed", "created_by", "created_at", "finished_at")
+    list_filter = ("status", "created_at")
+    readonly_fields = ("client_ids", "errors", "error_message", "created_at", "started_at", "finished_at")
+
+
+@admin.register(MessageLogDailyRollup)
+class MessageLogDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ("day", "message_type", "channel", "status", "template_code", "count")
+    list_filter = ("message_type", "channel", "status", "day")
+    ordering = ("-day",)
+
+
+@admin.register(InboundEvent)
+class InboundEventAdmin(admin.ModelAdmin):
+    list_display = ("id", "source", "kind", "phone", "status", "attempts", "received_at")
+    list_filter = ("source", "kind", "status")
+    search_fields = ("phone", "message")
+    readonly_fields = ("error_message", "claim_token", "claimed_at", "received_at")
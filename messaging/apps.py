@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 class MessagingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'messaging'
+
+    def ready(self):
+        import messaging.checks  # noqa
+        import messaging.signals  # noqa
+
+        # No modo queued os eventos só são processados pelo worker: sem broker ficariam parados no buffer
+        if getattr(settings, 'WEBHOOK_INGESTION_MODE', 'sync') == 'queued' and not getattr(settings, 'TASK_QUEUE_ENABLED', False):
+            raise ImproperlyConfigured(
+                'WEBHOOK_INGESTION_MODE=queued exige um broker Celery (CELERY_BROKER_URL / TASK_QUEUE_ENABLED).'
+            )
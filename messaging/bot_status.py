@@ -0,0 +1,108 @@
+"""
+Status do bot WPPConnect compartilhado entre processos pelo cache do Django.
+
+As leituras vêm do cache; quando a entrada expira (``BOT_STATUS_CACHE_TTL``),
+apenas um chamador por vez consulta o ``/status`` do bot (single-flight) e os
+demais aguardam o resultado por alguns instantes. O bot também pode publicar
+as mudanças de status em ``/api/webhooks/bot-status/`` (``publish_bot_status``),
+o que mantém o cache atualizado por ``BOT_STATUS_PUSH_TTL`` segundos sem
+nenhuma chamada de rede. O webhook só aceita publicações autenticadas com
+``BOT_WEBHOOK_TOKEN``: o status publicado (e o QR Code) é exibido ao operador.
+
+Para que o cache seja de fato compartilhado entre os workers do gunicorn e do
+Celery, configure ``CACHE_URL`` (Redis); sem ele o cache é por processo.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .http_client import bot_session, bot_url
+
+logger = logging.getLogger(__name__)
+
+BOT_STATUS_CACHE_KEY = "messaging:bot-status"
+BOT_STATUS_REFRESH_KEY = "messaging:bot-status:refresh"
+
+STATUS_FIELDS = ("status", "isConnected", "qrCode", "error", "connectedAt")
+
+
+def _normalize(data: Dict[str, Any], source: str) -> Dict[str, Any]:
+    status = {name: data.get(name) for name in STATUS_FIELDS}
+    status["status"] = status["status"] or "unknown"
+    status["isConnected"] = bool(status["isConnected"]) if status["isConnected"] is not None else status["status"] == "connected"
+    status["reachable"] = True
+    status["source"] = source
+    status["checkedAt"] = timezone.now().isoformat()
+    return status
+
+
+def _fetch() -> Dict[str, Any]:
+    try:
+        response = bot_session().get(bot_url("/status"), timeout=5)
+        response.raise_for_status()
+        return _normalize(response.json(), "poll")
+    except (requests.exceptions.RequestException, ValueError) as exc:
+        logger.warning("Não foi possível consultar o status do bot: %s", exc)
+        return {
+            "status": "error",
+            "isConnected": False,
+            "qrCode": None,
+            "error": f"Não foi possível conectar ao bot: {exc}",
+            "connectedAt": None,
+            "reachable": False,
+            "source": "poll",
+            "checkedAt": timezone.now().isoformat(),
+        }
+
+
+def _refresh() -> Dict[str, Any]:
+    ttl = float(getattr(settings, "BOT_STATUS_CACHE_TTL", 10))
+    if cache.add(BOT_STATUS_REFRESH_KEY, True, timeout=10):
+        try:
+            status = _fetch()
+            cache.set(BOT_STATUS_CACHE_KEY, status, ttl)
+            return status
+        finally:
+            cache.delete(BOT_STATUS_REFRESH_KEY)
+
+    # Outro chamador já está consultando o bot: aguardar o resultado dele
+    deadline = time.monotonic() + float(getattr(settings, "BOT_STATUS_REFRESH_WAIT", 6))
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        status = cache.get(BOT_STATUS_CACHE_KEY)
+        if status is not None:
+            return status
+    return _fetch()
+
+
+def get_bot_status(refresh: bool = False) -> Dict[str, Any]:
+    """Status atual do bot (mesmas chaves do ``/status`` do bot, mais ``reachable``/``source``/``checkedAt``)."""
+    if not refresh:
+        status = cache.get(BOT_STATUS_CACHE_KEY)
+        if status is not None:
+            return status
+    return _refresh()
+
+
+def is_bot_connected(status: Optional[Dict[str, Any]] = None) -> bool:
+    status = status if status is not None else get_bot_status()
+    return status.get("status") == "connected" and bool(status.get("isConnected"))
+
+
+def publish_bot_status(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Grava o status enviado pelo próprio bot (webhook já autenticado pelo token)."""
+    status = _normalize(data, "push")
+    cache.set(BOT_STATUS_CACHE_KEY, status, float(getattr(settings, "BOT_STATUS_PUSH_TTL", 60)))
+    return status
+
+
+def invalidate_bot_status() -> None:
+    """Descarta o status em cache (ex.: após iniciar/parar o bot)."""
+    cache.delete(BOT_STATUS_CACHE_KEY)
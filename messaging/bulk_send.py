@@ -0,0 +1,181 @@
+"""
+Execução dos envios em massa pelo bot WPPConnect (fora do ciclo da requisição).
+"""
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from clients.models import Client
+from .http_client import BOT_PROVIDER, bot_session, bot_url, provider_concurrency
+from .log_writer import MessageLogWriter
+from .models import BulkSendJob, MessageLog
+from .providers import post_whatsapp_message
+from .ratelimit import get_rate_limiter
+from .send_engine import OutboundMessage, SendResult, send_batch
+from .templating import compile_body, render_many
+
+logger = logging.getLogger(__name__)
+
+STALE_JOB_ERROR = "Envio interrompido: o processo parou durante o envio. Confira os logs antes de reenviar."
+
+
+def render_bulk_messages(message: str, clients: List[Client], today: date) -> Dict[int, str]:
+    """Renderiza a mensagem do envio em massa para cada cliente (compilada uma vez)."""
+    compiled = compile_body(message)
+    due_dates = {client.pk: client.upcoming_due_date(today) for client in clients}
+    rendered: Dict[int, str] = {}
+    for client, text in render_many(compiled, clients, lambda c: due_dates[c.pk], strict=False):
+        due_date = due_dates[client.pk]
+        # Se não vence hoje, substituir "vence hoje" pela data
+        if due_date != today:
+            text = text.replace("vence hoje", f"vence em {due_date.strftime('%d/%m/%Y')}")
+        rendered[client.pk] = text
+    return rendered
+
+
+def sync_contacts(clients: List[Client]) -> bool:
+    """Sincroniza contatos com o bot (/sync-contacts). Falhas não são críticas; retorna se deu certo."""
+    try:
+        response = bot_session().post(
+            bot_url("/sync-contacts"),
+            json={"contacts": [{"phone": client.formatted_phone, "name": client.name} for client in clients]},
+            timeout=10,
+        )
+        if response.status_code == 200:
+            result = response.json()
+            logger.info(
+                "Contatos sincronizados: %s verificados, %s não encontrados",
+                result.get("verified", 0),
+                result.get("not_found", 0),
+            )
+            return True
+        logger.warning("Sincronização de contatos falhou (não crítico): HTTP %s", response.status_code)
+    except requests.exceptions.RequestException as exc:
+        logger.warning("Sincronização de contatos falhou (não crítico): %s", exc)
+    return False
+
+
+def send_to_bot(phone: str, message: str) -> Tuple[bool, str]:
+    try:
+        post_whatsapp_message(phone, message, BOT_PROVIDER)
+    except (requests.exceptions.RequestException, ValueError) as exc:
+        return False, str(exc)
+    return True, ""
+
+
+def run_bulk_send_job(job_id: int) -> Dict[str, Any]:
+    # Reivindicar o job numa única instrução: uma task duplicada ou reentregue não o envia de novo
+    now = timezone.now()
+    claimed = BulkSendJob.objects.filter(pk=job_id, status=BulkSendJob.Status.QUEUED).update(
+        status=BulkSendJob.Status.RUNNING, started_at=now, heartbeat_at=now
+    )
+    job = BulkSendJob.objects.filter(pk=job_id).first()
+    if not job:
+        logger.warning("Envio em massa %s não encontrado.", job_id)
+        return {}
+    if not claimed:
+        logger.info("Envio em massa %s já processado (%s).", job_id, job.status)
+        return {"sent": job.sent, "failed": job.failed}
+
+    sent = 0
+    failed = 0
+    errors: List[Dict[str, str]] = []
+    try:
+        clients = list(Client.objects.filter(id__in=job.client_ids))
+        sync_contacts(clients)
+
+        rendered_messages = render_bulk_messages(job.message, clients, timezone.localdate())
+        limiter = get_rate_limiter(BOT_PROVIDER)
+        concurrency = provider_concurrency(BOT_PROVIDER)
+        by_id = {client.pk: client for client in clients}
+
+        with MessageLogWriter() as log_writer:
+
+            def record(result: SendResult) -> None:
+                nonlocal sent, failed
+                client = by_id[result.key]
+                if result.success:
+                    sent += 1
+                else:
+                    failed += 1
+                    errors.append({"phone": client.formatted_phone, "error": result.error})
+                    logger.error("❌ Erro ao enviar para %s: %s", client.formatted_phone, result.error)
+
+                log_writer.add(
+                    MessageLog(
+                        client=client,
+                        message_type=MessageLog.Type.CHARGE,
+                        channel=MessageLog.Channel.WHATSAPP,
+                        status=MessageLog.Status.SUCCESS if result.success else MessageLog.Status.FAILED,
+                        payload={"message": job.message, "bulk_send": True, "job_id": job.pk},
+                        response={"success": result.success},
+                        error_message=result.error,
+                        created_by=job.created_by,
+                    )
+                )
+
+            outbound: List[OutboundMessage] = []
+            for client in clients:
+                phone = client.formatted_phone
+                if len(phone) < 10:
+                    logger.warning("Telefone inválido para cliente %s: %s", client.name, phone)
+                    record(SendResult(client.pk, False, error="Telefone inválido"))
+                else:
+                    outbound.append(OutboundMessage(key=client.pk, phone=phone, body=rendered_messages[client.pk]))
+
+            # Lotes de algumas vezes a concorrência, para o progresso do job avançar durante o envio
+            chunk_size = concurrency * 4
+            for offset in range(0, len(outbound), chunk_size):
+                chunk = outbound[offset:offset + chunk_size]
+                logger.info("Enviando mensagens %s-%s/%s", offset + 1, offset + len(chunk), len(outbound))
+                for result in send_batch(chunk, BOT_PROVIDER, concurrency, limiter):
+                    record(result)
+                BulkSendJob.objects.filter(pk=job.pk).update(sent=sent, failed=failed, heartbeat_at=timezone.now())
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Erro inesperado no envio em massa %s", job.pk)
+        BulkSendJob.objects.filter(pk=job.pk).update(
+            status=BulkSendJob.Status.FAILED,
+            sent=sent,
+            failed=failed,
+            errors=errors,
+            error_message=str(exc),
+            finished_at=timezone.now(),
+        )
+        raise
+
+    BulkSendJob.objects.filter(pk=job.pk).update(
+        status=BulkSendJob.Status.COMPLETED,
+        sent=sent,
+        failed=failed,
+        errors=errors,
+        finished_at=timezone.now(),
+    )
+    logger.info("Envio em massa %s concluído. Enviados: %s, falhas: %s", job.pk, sent, failed)
+    return {"sent": sent, "failed": failed}
+
+
+def fail_stale_bulk_send_jobs(job_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Encerra como falha os envios em andamento sem atividade há mais de
+    ``BULK_SEND_JOB_STALE_TIMEOUT`` (worker ou thread encerrados no meio do
+    envio). Não são reenviados: parte das mensagens pode já ter saído.
+    Retorna quantos jobs foram encerrados.
+    """
+    cutoff = timezone.now() - timedelta(seconds=int(getattr(settings, "BULK_SEND_JOB_STALE_TIMEOUT", 900)))
+    queryset = BulkSendJob.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+        status=BulkSendJob.Status.RUNNING,
+    )
+    if job_ids is not None:
+        queryset = queryset.filter(pk__in=list(job_ids))
+    failed = queryset.update(status=BulkSendJob.Status.FAILED, error_message=STALE_JOB_ERROR, finished_at=timezone.now())
+    if failed:
+        logger.warning("%s envio(s) em massa parados marcados como falha.", failed)
+    return failed
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core import checks
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Limitadores de taxa e debounces guardam estado no cache: com LocMem cada processo tem o seu."""
+    if not settings.CACHES["default"]["BACKEND"].endswith("LocMemCache"):
+        return []
+    return [
+        checks.Warning(
+            "Cache local por processo (LocMemCache): os limites de taxa de envio não são compartilhados "
+            "entre workers, que podem enviar até N vezes a taxa configurada.",
+            hint="Defina CACHE_URL (Redis) em produção.",
+            id="messaging.W001",
+        )
+    ]
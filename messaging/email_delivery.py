@@ -0,0 +1,126 @@
+"""
+Entrega das mensagens do canal de e-mail.
+
+``send_email_batch`` usa uma única conexão (``get_connection``) para o lote
+inteiro e envia as mensagens com ``send_messages`` em blocos de
+``EMAIL_BATCH_SIZE``, em vez de abrir, autenticar e fechar uma conexão SMTP por
+cliente como o ``send_mail``. O resultado de cada mensagem volta separado para
+ser gravado no respectivo ``MessageLog``.
+"""
+from __future__ import annotations
+
+import logging
+import smtplib
+import socket
+from typing import Hashable, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+from clients.models import Client
+
+logger = logging.getLogger(__name__)
+
+# Erros em que a conexão não serve mais e precisa ser reaberta
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout)
+
+
+def email_subject(client: Client) -> str:
+    return f"Atualização de cobrança - {client.name}"
+
+
+def build_email_message(client: Client, body: str, subject: Optional[str] = None) -> EmailMessage:
+    if not client.email:
+        raise ValueError("Cliente não possui e-mail cadastrado.")
+
+    from_email = getattr(settings, "DEFAULT_FROM_EMAIL", "no-reply@cobranca.local")
+    return EmailMessage(subject=subject or email_subject(client), body=body, from_email=from_email, to=[client.email])
+
+
+class _TrackedChunk(list):
+    """
+    Bloco de mensagens que registra quantas o backend já consumiu: quando
+    ``send_messages`` falha no meio do bloco, as anteriores foram enviadas e a
+    última consumida é a que falhou.
+    """
+
+    consumed = 0
+
+    def __iter__(self):
+        for self.consumed, message in enumerate(super().__iter__(), start=1):
+            yield message
+
+
+def _reconnect(connection) -> None:
+    try:
+        connection.close()
+    except Exception:  # noqa: BLE001
+        pass
+    connection.open()
+
+
+def _send_chunk(connection, chunk: List[EmailMessage]) -> List[Tuple[bool, str]]:
+    results: List[Tuple[bool, str]] = []
+    remaining = chunk
+    while remaining:
+        tracked = _TrackedChunk(remaining)
+        try:
+            connection.send_messages(tracked)
+        except Exception as exc:  # noqa: BLE001
+            if not tracked.consumed:
+                # Falhou antes de enviar qualquer mensagem (ex.: conexão recusada)
+                logger.error("Falha ao enviar bloco de %s e-mails: %s", len(remaining), exc)
+                results.extend((False, str(exc)) for _ in remaining)
+                return results
+
+            results.extend((True, "") for _ in range(tracked.consumed - 1))
+            failed = remaining[tracked.consumed - 1]
+            logger.error("Falha ao enviar e-mail para %s: %s", ", ".join(failed.to), exc)
+            results.append((False, str(exc)))
+            remaining = remaining[tracked.consumed:]
+            if remaining and isinstance(exc, CONNECTION_ERRORS):
+                try:
+                    _reconnect(connection)
+                except Exception as reconnect_exc:  # noqa: BLE001
+                    logger.error("Não foi possível reabrir a conexão de e-mail: %s", reconnect_exc)
+                    results.extend((False, str(reconnect_exc)) for _ in remaining)
+                    return results
+        else:
+            results.extend((True, "") for _ in remaining)
+            remaining = []
+    return results
+
+
+def send_email_batch(
+    messages: Iterable[Tuple[Hashable, EmailMessage]],
+    connection=None,
+    chunk_size: Optional[int] = None,
+) -> List[Tuple[Hashable, bool, str]]:
+    """
+    Envia (chave, mensagem) por uma conexão compartilhada e devolve, na mesma
+    ordem, (chave, sucesso, erro). Sem ``connection``, abre uma para o lote.
+    """
+    messages = list(messages)
+    if not messages:
+        return []
+
+    chunk_size = max(1, chunk_size or int(getattr(settings, "EMAIL_BATCH_SIZE", 50)))
+    own_connection = connection is None
+    connection = connection or get_connection(fail_silently=False)
+
+    outcomes: List[Tuple[bool, str]] = []
+    try:
+        if own_connection:
+            connection.open()
+        for offset in range(0, len(messages), chunk_size):
+            outcomes.extend(_send_chunk(connection, [message for _, message in messages[offset:offset + chunk_size]]))
+    except Exception as exc:  # noqa: BLE001
+        logger.error("Falha ao abrir a conexão de e-mail: %s", exc)
+        outcomes.extend((False, str(exc)) for _ in range(len(messages) - len(outcomes)))
+    finally:
+        if own_connection:
+            try:
+                connection.close()
+            except Exception:  # noqa: BLE001
+                pass
+    return [(key, success, error) for (key, _), (success, error) in zip(messages, outcomes)]
@@ -0,0 +1,93 @@
+"""
+Sessões HTTP compartilhadas para os provedores de WhatsApp e o bot WPPConnect.
+
+Cada provedor recebe um ``requests.Session`` próprio por processo, com pool de
+conexões keep-alive e retry com backoff, para que envios em massa reaproveitem
+conexões TCP/TLS já abertas em vez de refazer DNS + handshake a cada mensagem.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from typing import Dict, Tuple
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BOT_PROVIDER = "wppconnect"
+
+# Requisições simultâneas por provedor no motor de envio (setting, padrão)
+SEND_CONCURRENCY_SETTINGS = {
+    "meta": ("META_SEND_CONCURRENCY", 8),
+    "whapi": ("WHAPI_SEND_CONCURRENCY", 4),
+    "infobip": ("INFOBIP_SEND_CONCURRENCY", 8),
+    BOT_PROVIDER: ("BOT_SEND_CONCURRENCY", 1),
+}
+
+_sessions: Dict[Tuple[int, str], requests.Session] = {}
+_lock = threading.Lock()
+
+
+def provider_concurrency(provider: str) -> int:
+    name, default = SEND_CONCURRENCY_SETTINGS.get(provider, SEND_CONCURRENCY_SETTINGS["meta"])
+    return max(1, int(getattr(settings, name, default)))
+
+
+def _build_session(provider: str) -> requests.Session:
+    # O pool precisa comportar todas as requisições simultâneas do motor de envio
+    pool_size = max(int(getattr(settings, "WHATSAPP_HTTP_POOL_SIZE", 10)), provider_concurrency(provider))
+    retries = int(getattr(settings, "WHATSAPP_HTTP_RETRIES", 2))
+    backoff = float(getattr(settings, "WHATSAPP_HTTP_BACKOFF", 0.5))
+
+    # Falhas de conexão são sempre repetidas (a requisição não chegou a sair);
+    # respostas 502/503/504 só são repetidas em métodos idempotentes para não
+    # duplicar mensagens enviadas via POST.
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not getattr(settings, "WHATSAPP_HTTP_KEEPALIVE", True):
+        session.headers["Connection"] = "close"
+    return session
+
+
+def get_session(provider: str) -> requests.Session:
+    """Retorna a sessão do provedor para o processo atual (seguro após fork)."""
+    key = (os.getpid(), provider)
+    session = _sessions.get(key)
+    if session is None:
+        with _lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = _build_session(provider)
+                _sessions[key] = session
+    return session
+
+
+def bot_session() -> requests.Session:
+    return get_session(BOT_PROVIDER)
+
+
+def bot_url(endpoint: str) -> str:
+    base_url = getattr(settings, "WPPCONNECT_BOT_URL", "http://localhost:3001")
+    return f"{base_url.rstrip('/')}/{endpoint.lstrip('/')}"
+
+
+def close_sessions() -> None:
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,313 @@
+"""
+Tratamento das mensagens recebidas pelos webhooks.
+
+``plan_event`` decide o que cada mensagem gera (interação, log de entrada,
+quitação do cliente e resposta automática) e é usado tanto no modo ``sync``
+(processamento na própria requisição) quanto no modo ``queued``
+(``WEBHOOK_INGESTION_MODE``). No modo ``queued`` a view apenas grava um
+``InboundEvent`` e responde; ``process_inbound_batch`` processa os eventos
+pendentes em lote, com gravações em massa, e envia as respostas automáticas
+pelo bot depois do commit.
+
+Ordem por telefone: cada lote é processado em ordem de chegada e, quando outro
+worker já está processando um evento anterior do mesmo telefone, os eventos
+desse telefone são devolvidos à fila para o próximo lote.
+"""
+from __future__ import annotations
+
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from clients.lookup import ClientRef, client_lookup_cache, resolve_clients
+from clients.models import Client, phone_key
+from clients.signals import clients_bulk_changed
+from .bulk_send import send_to_bot
+from .log_writer import MessageLogWriter
+from .models import ClientInteraction, InboundEvent, MessageLog
+
+logger = logging.getLogger(__name__)
+
+RECEIPT_MESSAGE = "[COMPROVANTE_ENVIADO]"
+
+NOT_FOUND_REPLY = (
+    "Olá! Não encontramos seu cadastro em nosso sistema.\n"
+    "Por favor, entre em contato conosco através dos nossos canais oficiais."
+)
+RECEIPT_NOT_FOUND_REPLY = "Não encontramos seu cadastro. Entre em contato conosco."
+RECEIPT_REPLY = "✅ Comprovante recebido! Seu pagamento foi registrado e seu status foi atualizado."
+
+
+@dataclass
+class InboundOutcome:
+    client: Optional[ClientRef]
+    interaction: Optional[ClientInteraction] = None
+    message_log: Optional[MessageLog] = None
+    settle: bool = False
+    auto_reply: Optional[str] = None
+
+
+def auto_reply_for(message: str) -> Optional[str]:
+    """
+    Resposta automática do bot. Apenas responde se a mensagem for exatamente
+    "1" ou "2" para evitar flood.
+    """
+    message_clean = message.strip()
+
+    if message_clean == "1":
+        return (
+            "👤 Nossa equipe entrará em contato em breve!\n"
+            "Aguarde que um atendente irá te responder."
+        )
+
+    if message_clean == "2":
+        return (
+            "📄 Para enviar seu comprovante:\n"
+            "Envie a imagem do comprovante aqui mesmo.\n"
+            "Nossa equipe analisará e atualizará seu status em breve!"
+        )
+
+    return None
+
+
+def _normalized_option(message: str) -> str:
+    return message.strip().split()[0] if message.strip() else ""
+
+
+def _incoming_log(client: ClientRef, payload: Dict[str, str]) -> MessageLog:
+    return MessageLog(
+        client_id=client.id,
+        message_type=MessageLog.Type.INCOMING,
+        channel=MessageLog.Channel.WHATSAPP,
+        status=MessageLog.Status.SUCCESS,
+        payload=payload,
+    )
+
+
+def _plan_wppconnect_message(phone: str, message: str, client: Optional[ClientRef]) -> InboundOutcome:
+    if not client:
+        return InboundOutcome(client=None, auto_reply=NOT_FOUND_REPLY)
+
+    option = _normalized_option(message)
+    notes = ""
+    if option == "1":
+        notes = "Cliente solicitou falar com atendente."
+    elif option == "2":
+        notes = "Cliente solicitou enviar comprovante."
+    return InboundOutcome(
+        client=client,
+        interaction=ClientInteraction(
+            client_id=client.id,
+            channel=MessageLog.Channel.WHATSAPP,
+            raw_message=message,
+            normalized_option=option,
+            notes=notes,
+        ),
+        message_log=_incoming_log(client, {"phone": phone, "message": message}),
+        auto_reply=auto_reply_for(message),
+    )
+
+
+def _plan_wppconnect_receipt(phone: str, client: Optional[ClientRef]) -> InboundOutcome:
+    if not client:
+        return InboundOutcome(client=None, auto_reply=RECEIPT_NOT_FOUND_REPLY)
+
+    return InboundOutcome(
+        client=client,
+        interaction=ClientInteraction(
+            client_id=client.id,
+            channel=MessageLog.Channel.WHATSAPP,
+            raw_message=RECEIPT_MESSAGE,
+            normalized_option="2",
+            notes="Cliente enviou comprovante de pagamento. Status atualizado automaticamente.",
+        ),
+        message_log=_incoming_log(client, {"phone": phone, "message": RECEIPT_MESSAGE, "type": "image"}),
+        settle=True,
+        auto_reply=RECEIPT_REPLY,
+    )
+
+
+def _plan_meta_message(message: str, client: Optional[ClientRef]) -> InboundOutcome:
+    if not client:
+        return InboundOutcome(client=None)
+
+    option = _normalized_option(message)
+    notes = ""
+    if option == "2":
+        notes = "Cliente solicitou envio de comprovante."
+    elif option == "3":
+        notes = "Cliente solicitou ajuda humana."
+    return InboundOutcome(
+        client=client,
+        interaction=ClientInteraction(
+            client_id=client.id,
+            channel=MessageLog.Channel.WHATSAPP,
+            raw_message=message,
+            normalized_option=option,
+            notes=notes,
+        ),
+        settle=option == "1",
+    )
+
+
+def plan_event(source: str, kind: str, phone: str, message: str, client: Optional[ClientRef]) -> InboundOutcome:
+    """O que uma mensagem recebida gera. Nada é gravado aqui."""
+    if source == InboundEvent.Source.META:
+        return _plan_meta_message(message, client)
+    if kind == InboundEvent.Kind.RECEIPT:
+        return _plan_wppconnect_receipt(phone, client)
+    return _plan_wppconnect_message(phone, message, client)
+
+
+def meta_messages(data: Dict) -> List[Tuple[str, str]]:
+    """(telefone, texto) das mensagens de um payload da WhatsApp Cloud API."""
+    messages: List[Tuple[str, str]] = []
+    for entry in data.get("entry", []):
+        for change in entry.get("changes", []):
+            value = change.get("value", {})
+            for message in value.get("messages", []):
+                phone_raw = message.get("from")
+                message_body = message.get("text", {}).get("body", "")
+                if phone_raw and message_body:
+                    messages.append((phone_raw, message_body))
+    return messages
+
+
+def enqueue_events(source: str, events: Iterable[Tuple[str, str, str]]) -> List[InboundEvent]:
+    """Grava os eventos (tipo, telefone, mensagem) no buffer, em uma única inserção."""
+    rows = [
+        InboundEvent(source=source, kind=kind, phone=phone, phone_key=phone_key(phone), message=message)
+        for kind, phone, message in events
+    ]
+    return InboundEvent.objects.bulk_create(rows)
+
+
+def release_stale_claims() -> int:
+    """Devolve à fila eventos de workers que morreram no meio do processamento."""
+    timeout = int(getattr(settings, "INBOUND_EVENT_CLAIM_TIMEOUT", 300))
+    return InboundEvent.objects.filter(
+        status=InboundEvent.Status.PROCESSING,
+        claimed_at__lt=timezone.now() - timedelta(seconds=timeout),
+    ).update(status=InboundEvent.Status.PENDING, claim_token="", claimed_at=None)
+
+
+def _claim_batch(batch_size: int) -> Tuple[str, List[InboundEvent]]:
+    candidates = list(
+        InboundEvent.objects.filter(status=InboundEvent.Status.PENDING)
+        .order_by("id")
+        .values_list("id", flat=True)[:batch_size]
+    )
+    if not candidates:
+        return "", []
+
+    token = uuid.uuid4().hex
+    InboundEvent.objects.filter(id__in=candidates, status=InboundEvent.Status.PENDING).update(
+        status=InboundEvent.Status.PROCESSING,
+        claim_token=token,
+        claimed_at=timezone.now(),
+    )
+    claimed = list(InboundEvent.objects.filter(claim_token=token).order_by("id"))
+
+    first_by_phone: Dict[str, int] = {}
+    for event in claimed:
+        first_by_phone.setdefault(event.phone_key, event.id)
+    in_flight = (
+        InboundEvent.objects.filter(status=InboundEvent.Status.PROCESSING, phone_key__in=list(first_by_phone))
+        .exclude(claim_token=token)
+        .values_list("phone_key", "id")
+    )
+    blocked = {key for key, event_id in in_flight if event_id < first_by_phone[key]}
+    if blocked:
+        InboundEvent.objects.filter(claim_token=token, phone_key__in=blocked).update(
+            status=InboundEvent.Status.PENDING, claim_token="", claimed_at=None
+        )
+        claimed = [event for event in claimed if event.phone_key not in blocked]
+    return token, claimed
+
+
+def _release_failed(token: str, error: str) -> None:
+    max_attempts = int(getattr(settings, "INBOUND_EVENT_MAX_ATTEMPTS", 3))
+    events = InboundEvent.objects.filter(claim_token=token)
+    events.update(attempts=F("attempts") + 1, error_message=error[:1000])
+    events.filter(attempts__gte=max_attempts).update(status=InboundEvent.Status.FAILED, claim_token="")
+    events.update(status=InboundEvent.Status.PENDING, claim_token="", claimed_at=None)
+
+
+def _push_auto_replies(replies: List[Tuple[str, str]]) -> int:
+    failed = 0
+    for phone, reply in replies:
+        success, error = send_to_bot(phone, reply)
+        if not success:
+            failed += 1
+            logger.warning("Falha ao enviar resposta automática para %s: %s", phone, error)
+    return failed
+
+
+def process_inbound_batch(batch_size: Optional[int] = None) -> Dict[str, int]:
+    """Processa um lote de eventos pendentes. Retorna as contagens do lote."""
+    batch_size = max(1, batch_size or int(getattr(settings, "INBOUND_EVENT_BATCH_SIZE", 200)))
+    token, events = _claim_batch(batch_size)
+    if not events:
+        return {"processed": 0, "replies": 0, "reply_failures": 0}
+
+    refs = resolve_clients(event.phone for event in events)
+    interactions: List[ClientInteraction] = []
+    logs: List[MessageLog] = []
+    settled_ids: List[int] = []
+    replies: List[Tuple[str, str]] = []
+    for event in events:
+        outcome = plan_event(event.source, event.kind, event.phone, event.message, refs.get(event.phone_key))
+        if outcome.interaction:
+            interactions.append(outcome.interaction)
+        if outcome.message_log:
+            logs.append(outcome.message_log)
+        if outcome.settle and outcome.client:
+            settled_ids.append(outcome.client.id)
+        if outcome.auto_reply and event.source == InboundEvent.Source.WPPCONNECT:
+            replies.append(("".join(filter(str.isdigit, event.phone)), outcome.auto_reply))
+
+    try:
+        with transaction.atomic():
+            ClientInteraction.objects.bulk_create(interactions)
+            with MessageLogWriter(batch_size=batch_size) as writer:
+                for message_log in logs:
+                    writer.add(message_log)
+            if settled_ids:
+                Client.objects.filter(id__in=settled_ids).exclude(status=Client.Status.SETTLED).update(
+                    status=Client.Status.SETTLED, updated_at=timezone.now()
+                )
+            InboundEvent.objects.filter(claim_token=token).delete()
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Falha ao processar lote de %s eventos recebidos", len(events))
+        _release_failed(token, str(exc))
+        return {"processed": 0, "replies": 0, "reply_failures": 0, "failed": len(events)}
+
+    if settled_ids:
+        # update() não dispara post_save (e a sincronização com o bot que ele faria)
+        for client_id in settled_ids:
+            client_lookup_cache.invalidate_client(client_id)
+        clients_bulk_changed.send(sender=Client, client_ids=settled_ids)
+
+    reply_failures = _push_auto_replies(replies)
+    return {"processed": len(events), "replies": len(replies), "reply_failures": reply_failures}
+
+
+def drain_inbound_events(max_batches: Optional[int] = None) -> Dict[str, int]:
+    """Processa lotes até esvaziar a fila (ou atingir ``max_batches``)."""
+    release_stale_claims()
+    totals = {"batches": 0, "processed": 0, "replies": 0, "reply_failures": 0, "failed": 0}
+    while max_batches is None or totals["batches"] < max_batches:
+        result = process_inbound_batch()
+        if not result["processed"] and not result.get("failed"):
+            break
+        totals["batches"] += 1
+        for key, value in result.items():
+            totals[key] += value
+    return totals
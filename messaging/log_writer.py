@@ -0,0 +1,81 @@
+"""
+Gravação em lote dos logs de envio.
+
+O ``MessageLogWriter`` acumula linhas novas (``add``) e finalizações de linhas
+já existentes (``update``) e as grava com ``bulk_create``/``bulk_update`` a cada
+``MESSAGE_LOG_BATCH_SIZE`` registros, ao fim do job (``with``) e no
+encerramento do processo.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import weakref
+from typing import List, Optional
+
+from celery.signals import worker_process_shutdown
+from django.conf import settings
+from django.db import transaction
+
+from .models import MessageLog
+from .signals import message_logs_written
+
+logger = logging.getLogger(__name__)
+
+_active_writers: "weakref.WeakSet[MessageLogWriter]" = weakref.WeakSet()
+
+
+class MessageLogWriter:
+    update_fields = ("status", "response", "error_message")
+
+    def __init__(self, batch_size: Optional[int] = None) -> None:
+        self.batch_size = max(1, batch_size or int(getattr(settings, "MESSAGE_LOG_BATCH_SIZE", 500)))
+        self._pending_create: List[MessageLog] = []
+        self._pending_update: List[MessageLog] = []
+        _active_writers.add(self)
+
+    def __enter__(self) -> "MessageLogWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
+
+    def add(self, message_log: MessageLog) -> None:
+        self._pending_create.append(message_log)
+        if len(self._pending_create) >= self.batch_size:
+            self._flush_creates()
+
+    def update(self, message_log: MessageLog) -> None:
+        self._pending_update.append(message_log)
+        if len(self._pending_update) >= self.batch_size:
+            self._flush_updates()
+
+    def _flush_creates(self) -> None:
+        rows, self._pending_create = self._pending_create, []
+        if rows:
+            with transaction.atomic():
+                MessageLog.objects.bulk_create(rows, batch_size=self.batch_size)
+            message_logs_written.send(sender=MessageLog, logs=rows, created=True)
+
+    def _flush_updates(self) -> None:
+        rows, self._pending_update = self._pending_update, []
+        if rows:
+            with transaction.atomic():
+                MessageLog.objects.bulk_update(rows, self.update_fields, batch_size=self.batch_size)
+            message_logs_written.send(sender=MessageLog, logs=rows, created=False)
+
+    def flush(self) -> None:
+        self._flush_creates()
+        self._flush_updates()
+
+
+def flush_all_writers(**kwargs) -> None:
+    for writer in list(_active_writers):
+        try:
+            writer.flush()
+        except Exception:  # noqa: BLE001
+            logger.exception("Falha ao gravar logs pendentes no encerramento")
+
+
+atexit.register(flush_all_writers)
+worker_process_shutdown.connect(flush_all_writers, weak=False)
@@ -0,0 +1,145 @@
+import socketserver
+import threading
+import time
+from typing import Callable, Dict, List
+
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from messaging.email_delivery import send_email_batch
+
+REJECTED_DOMAIN = "rejeitado.invalid"
+
+
+class _SmtpStubHandler(socketserver.StreamRequestHandler):
+    """Servidor SMTP mínimo: aceita tudo, exceto destinatários em ``REJECTED_DOMAIN``."""
+
+    latency = 0.0
+    stats: Dict[str, int] = {"connections": 0, "messages": 0}
+    lock = threading.Lock()
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        with self.lock:
+            self.stats["connections"] += 1
+        if self.latency:
+            # Custo de abrir a conexão (handshake, TLS, autenticação)
+            time.sleep(self.latency)
+        self._reply("220 stub ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self._reply("250-stub")
+                self._reply("250 OK")
+            elif verb == "RCPT" and REJECTED_DOMAIN in command:
+                self._reply("550 Mailbox unavailable")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                with self.lock:
+                    self.stats["messages"] += 1
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("250 OK")
+
+
+class _ThreadingSmtpServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def _build_messages(total: int, reject_every: int) -> List[EmailMessage]:
+    messages = []
+    for index in range(total):
+        domain = REJECTED_DOMAIN if reject_every and index % reject_every == reject_every - 1 else "example.com"
+        messages.append(
+            EmailMessage(
+                subject="Atualização de cobrança",
+                body="benchmark",
+                from_email="no-reply@cobranca.local",
+                to=[f"cliente{index}@{domain}"],
+            )
+        )
+    return messages
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o envio de e-mails um a um (uma conexão por mensagem) com o envio em lote por uma "
+        "única conexão, contra um servidor SMTP local (ou o backend locmem com --locmem)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=200, help="Quantidade de e-mails por cenário.")
+        parser.add_argument("--latency", type=float, default=20.0, help="Custo simulado de abrir a conexão (ms).")
+        parser.add_argument(
+            "--reject-every",
+            type=int,
+            default=0,
+            help="Recusar o destinatário de 1 a cada N e-mails (0 = nenhum).",
+        )
+        parser.add_argument("--locmem", action="store_true", help="Usar o backend locmem do Django em vez do SMTP local.")
+
+    def handle(self, *args, **options):
+        total = options["messages"]
+        messages = _build_messages(total, options["reject_every"])
+
+        if options["locmem"]:
+            with override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend"):
+                mail.outbox = []
+                results = send_email_batch(enumerate(messages))
+                sent = sum(1 for _, success, _ in results if success)
+                self.stdout.write(f"locmem: {sent}/{total} enviados, {len(mail.outbox)} na caixa de saída")
+            return
+
+        _SmtpStubHandler.latency = options["latency"] / 1000
+        server = _ThreadingSmtpServer(("127.0.0.1", 0), _SmtpStubHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        try:
+            with override_settings(
+                EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+                EMAIL_HOST="127.0.0.1",
+                EMAIL_PORT=server.server_address[1],
+                EMAIL_HOST_USER="",
+                EMAIL_HOST_PASSWORD="",
+                EMAIL_USE_TLS=False,
+            ):
+                scenarios: Dict[str, Callable[[], List[bool]]] = {
+                    "um a um": lambda: [self._send_alone(message) for message in messages],
+                    "lote (uma conexão)": lambda: [success for _, success, _ in send_email_batch(enumerate(messages))],
+                }
+                for label, run in scenarios.items():
+                    _SmtpStubHandler.stats.update(connections=0, messages=0)
+                    started = time.perf_counter()
+                    outcomes = run()
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"{label}: {total / elapsed:.1f} e-mails/s | total {elapsed:.2f} s | "
+                        f"conexões {_SmtpStubHandler.stats['connections']} | "
+                        f"aceitos {_SmtpStubHandler.stats['messages']} | falhas {outcomes.count(False)}"
+                    )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    @staticmethod
+    def _send_alone(message: EmailMessage) -> bool:
+        try:
+            message.send()
+        except Exception:  # noqa: BLE001
+            return False
+        return True
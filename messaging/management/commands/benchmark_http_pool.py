@@ -0,0 +1,92 @@
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List
+
+import requests
+from django.core.management.base import BaseCommand
+
+from messaging.http_client import close_sessions, get_session
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.0
+
+    def do_POST(self):  # noqa: N802
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.latency:
+            time.sleep(self.latency)
+        if isinstance(request.get("messages"), list):
+            # Formato da API de lote da Infobip: um status por mensagem
+            result = {
+                "bulkId": "benchmark",
+                "messages": [
+                    {
+                        "to": message.get("to"),
+                        "messageId": message.get("messageId"),
+                        "status": {"groupName": "PENDING", "name": "PENDING_ENROUTE"},
+                    }
+                    for message in request["messages"]
+                ],
+            }
+        else:
+            result = {"success": True}
+        body = json.dumps(result).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+
+def _measure(send: Callable[[], requests.Response], total: int) -> List[float]:
+    timings: List[float] = []
+    for _ in range(total):
+        started = time.perf_counter()
+        send().raise_for_status()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+class Command(BaseCommand):
+    help = "Compara a latência por mensagem com e sem o pool de conexões HTTP contra um servidor local."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=500, help="Quantidade de mensagens por cenário.")
+        parser.add_argument("--latency", type=float, default=0.0, help="Latência simulada do servidor (ms).")
+
+    def handle(self, *args, **options):
+        total = options["messages"]
+        _StubHandler.latency = options["latency"] / 1000
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = f"http://127.0.0.1:{server.server_port}/messages"
+        payload = {"to": "5511999999999", "body": "benchmark"}
+
+        try:
+            scenarios = {
+                "sem pool": lambda: requests.post(url, json=payload, timeout=30),
+                "com pool": lambda: get_session("benchmark").post(url, json=payload, timeout=30),
+            }
+            for label, send in scenarios.items():
+                timings = _measure(send, total)
+                quantiles = statistics.quantiles(timings, n=100)
+                self.stdout.write(
+                    f"{label}: média {statistics.mean(timings):.2f} ms | "
+                    f"p50 {quantiles[49]:.2f} ms | p95 {quantiles[94]:.2f} ms | "
+                    f"total {sum(timings) / 1000:.2f} s ({total} mensagens)"
+                )
+        finally:
+            close_sessions()
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,110 @@
+import statistics
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from typing import List
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from messaging.http_client import BOT_PROVIDER, close_sessions
+from messaging.providers import post_whatsapp_message, supports_batch
+from messaging.send_engine import DISPATCH_BATCH, DISPATCH_SINGLE, OutboundMessage, send_batch
+
+from .benchmark_http_pool import _StubHandler
+
+
+def _provider_settings(provider: str, base_url: str, concurrency: int) -> dict:
+    # Sem limite de taxa: o objetivo é medir o efeito da concorrência
+    if provider == "whapi":
+        return {
+            "WHAPI_BASE_URL": base_url,
+            "WHAPI_TOKEN": "benchmark",
+            "WHAPI_SEND_CONCURRENCY": concurrency,
+            "WHAPI_SEND_RATE_PER_SECOND": 0,
+        }
+    if provider == "infobip":
+        return {
+            "INFOBIP_BASE_URL": base_url,
+            "INFOBIP_API_KEY": "benchmark",
+            "INFOBIP_SENDER": "5511900000000",
+            "INFOBIP_BULK_TEMPLATE": "benchmark",
+            "INFOBIP_SEND_CONCURRENCY": concurrency,
+            "INFOBIP_SEND_RATE_PER_SECOND": 0,
+        }
+    if provider == BOT_PROVIDER:
+        return {"WPPCONNECT_BOT_URL": base_url, "BOT_SEND_RATE_PER_SECOND": 0, "BOT_SEND_CONCURRENCY": concurrency}
+    return {
+        "WHATSAPP_API_URL": base_url,
+        "WHATSAPP_ACCESS_TOKEN": "benchmark",
+        "WHATSAPP_PHONE_NUMBER_ID": "benchmark",
+        "META_SEND_CONCURRENCY": concurrency,
+        "META_SEND_RATE_PER_SECOND": 0,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o envio sequencial (uma requisição por vez) com o motor de envio concorrente "
+        "contra um provedor simulado local."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=200, help="Quantidade de mensagens por cenário.")
+        parser.add_argument("--latency", type=float, default=50.0, help="Latência simulada do provedor (ms).")
+        parser.add_argument("--concurrency", type=int, default=8, help="Requisições simultâneas do motor.")
+        parser.add_argument(
+            "--provider",
+            default="meta",
+            choices=["meta", "whapi", "infobip", BOT_PROVIDER],
+            help="Formato de requisição usado. Com infobip, mede também o envio pela API de lote.",
+        )
+
+    def handle(self, *args, **options):
+        total = options["messages"]
+        provider = options["provider"]
+        _StubHandler.latency = options["latency"] / 1000
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        messages = [OutboundMessage(key=index, phone=f"55119{index:08d}", body="benchmark") for index in range(total)]
+
+        try:
+            with override_settings(**_provider_settings(provider, base_url, options["concurrency"])):
+                close_sessions()
+
+                started = time.perf_counter()
+                timings: List[float] = []
+                for message in messages:
+                    sent_at = time.perf_counter()
+                    post_whatsapp_message(message.phone, message.body, provider)
+                    timings.append((time.perf_counter() - sent_at) * 1000)
+                self._report("sequencial", timings, time.perf_counter() - started, total)
+
+                modes = [DISPATCH_SINGLE] + ([DISPATCH_BATCH] if supports_batch(provider) else [])
+                for mode in modes:
+                    started = time.perf_counter()
+                    results = send_batch(messages, provider, mode=mode)
+                    elapsed = time.perf_counter() - started
+                    failures = sum(1 for result in results if not result.success)
+                    label = "motor em lote" if mode == DISPATCH_BATCH else "motor"
+                    self._report(
+                        f"{label} (concorrência {options['concurrency']})",
+                        [result.elapsed * 1000 for result in results],
+                        elapsed,
+                        total,
+                        failures,
+                    )
+        finally:
+            close_sessions()
+            server.shutdown()
+            server.server_close()
+
+    def _report(self, label: str, timings: List[float], elapsed: float, total: int, failures: int = 0) -> None:
+        quantiles = statistics.quantiles(timings, n=100)
+        self.stdout.write(
+            f"{label}: {total / elapsed:.1f} msg/s | total {elapsed:.2f} s | "
+            f"p50 {quantiles[49]:.2f} ms | p95 {quantiles[94]:.2f} ms | falhas {failures}"
+        )
@@ -0,0 +1,61 @@
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from clients.models import Client
+from messaging.models import MessageTemplate
+from messaging.templating import client_context, compile_body, format_currency, get_compiled
+
+SAMPLE_BODY = (
+    "Olá {{nome}}! Sua mensalidade de R$ {{valor}} vence em {{ vencimento }}. "
+    "Pague pelo link: {link_pagamento}"
+)
+
+
+def _legacy_render(body: str, client: Client, due_date: date) -> str:
+    context = {
+        "nome": client.name,
+        "valor": format_currency(client.monthly_fee),
+        "vencimento": due_date.strftime("%d/%m/%Y"),
+        "link_pagamento": client.payment_link or "",
+    }
+    normalized_body = body.replace("{{ ", "{").replace(" }}", "}").replace("{{", "{").replace("}}", "}")
+    return normalized_body.format(**context)
+
+
+class Command(BaseCommand):
+    help = "Compara a renderização de templates por str.format com o motor compilado (sem acesso ao banco)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--renders", type=int, default=10000, help="Quantidade de renderizações por cenário.")
+
+    def handle(self, *args, **options):
+        total = options["renders"]
+        today = date.today()
+        client = Client(
+            id=1,
+            name="Cliente Benchmark",
+            phone="11999999999",
+            monthly_fee=Decimal("149.90"),
+            payment_link="https://pagamento.exemplo/abc",
+        )
+        template = MessageTemplate(id=1, code="benchmark", body=SAMPLE_BODY, updated_at=today)
+
+        scenarios = {
+            "str.format": lambda: _legacy_render(template.body, client, today),
+            "compilado": lambda: get_compiled(template).render(client_context(client, today)),
+            "compilado (lote)": lambda: compiled.render(client_context(client, today)),
+        }
+        compiled = compile_body(SAMPLE_BODY)
+
+        for label, render in scenarios.items():
+            started = time.perf_counter()
+            for _ in range(total):
+                render()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"{label}: total {elapsed * 1000:.1f} ms | {elapsed / total * 1_000_000:.2f} µs por mensagem "
+                f"({total} renderizações)"
+            )
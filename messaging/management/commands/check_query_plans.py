@@ -0,0 +1,46 @@
+import time
+from typing import List
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from messaging.query_plans import PLAN_CHECK_ROWS, analyze, hot_queries, plan_problem, seed_plan_data, supports_plan_check
+
+
+class Command(BaseCommand):
+    help = (
+        "Verifica se as consultas mais frequentes usam índices (EXPLAIN). Por padrão popula uma "
+        "massa de dados temporária, descartada ao final (rollback). A mesma verificação roda nos "
+        "testes (messaging.tests.QueryPlanTests)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=PLAN_CHECK_ROWS, help="Linhas por tabela na massa de teste.")
+        parser.add_argument("--no-seed", action="store_true", help="Usar os dados existentes, sem popular.")
+        parser.add_argument("--verbose-plans", action="store_true", help="Exibir o plano completo de cada consulta.")
+
+    def handle(self, *args, **options):
+        if not supports_plan_check():
+            self.stdout.write(self.style.WARNING(f"Banco {connection.vendor}: planos exibidos sem verificação."))
+
+        failures: List[str] = []
+        with transaction.atomic():
+            if not options["no_seed"]:
+                started = time.perf_counter()
+                seed_plan_data(options["rows"])
+                self.stdout.write(f"Massa de teste: {options['rows']} linhas por tabela em {time.perf_counter() - started:.1f}s")
+            analyze()
+
+            for label, build in hot_queries():
+                plan, problem = plan_problem(build())
+                status = self.style.ERROR(problem) if problem else self.style.SUCCESS("ok")
+                self.stdout.write(f"[{status}] {label}")
+                if problem or options["verbose_plans"]:
+                    self.stdout.write("    " + plan.replace("\n", "\n    "))
+                if problem:
+                    failures.append(label)
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"{len(failures)} consulta(s) sem uso adequado de índice: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("Todas as consultas verificadas usam índices."))
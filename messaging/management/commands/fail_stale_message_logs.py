@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from messaging.bulk_send import fail_stale_bulk_send_jobs
+from messaging.services import fail_stale_pending_logs
+
+
+class Command(BaseCommand):
+    help = (
+        "Marca como falha os logs de envio pendentes há mais de MESSAGE_LOG_PENDING_TIMEOUT segundos "
+        "e os envios em massa sem progresso há mais de BULK_SEND_JOB_STALE_TIMEOUT "
+        "(processo interrompido antes de finalizar o envio). Alternativa às tasks periódicas do Celery."
+    )
+
+    def handle(self, *args, **options):
+        failed = fail_stale_pending_logs()
+        self.stdout.write(f"Logs pendentes expirados marcados como falha: {failed}")
+        jobs = fail_stale_bulk_send_jobs()
+        self.stdout.write(f"Envios em massa parados marcados como falha: {jobs}")
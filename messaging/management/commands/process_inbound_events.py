@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from messaging.inbound import drain_inbound_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Processa os eventos recebidos pelos webhooks no modo queued (WEBHOOK_INGESTION_MODE). "
+        "Com --loop, continua verificando a fila (alternativa ao worker Celery)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Continuar processando até ser interrompido.")
+        parser.add_argument("--interval", type=float, default=1.0, help="Segundos entre verificações com --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            totals = drain_inbound_events()
+            if totals["batches"] or not options["loop"]:
+                self.stdout.write(
+                    f"Eventos processados: {totals['processed']} em {totals['batches']} lote(s); "
+                    f"respostas automáticas: {totals['replies']} ({totals['reply_failures']} falhas)"
+                )
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
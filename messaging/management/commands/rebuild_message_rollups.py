@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from messaging.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recalcula os resumos diários de envios a partir dos logs (backfill ou correção)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="Primeiro dia (AAAA-MM-DD). Padrão: todo o histórico.")
+        parser.add_argument("--until", help="Último dia (AAAA-MM-DD). Padrão: sem limite.")
+
+    def handle(self, *args, **options):
+        dates = {}
+        for option in ("since", "until"):
+            value = options.get(option)
+            if value and not parse_date(value):
+                raise CommandError(f"Data inválida para --{option}: {value}. Use AAAA-MM-DD.")
+            dates[option] = parse_date(value) if value else None
+
+        buckets = rebuild(dates["since"], dates["until"])
+        self.stdout.write(self.style.SUCCESS(f"Resumos recalculados: {buckets} registros."))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0003_alter_messagelog_message_type'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='messagelog',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pendente'), ('success', 'Sucesso'), ('failed', 'Falha')], max_length=20, verbose_name='Status do envio'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('messaging', '0004_alter_messagelog_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkSendJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.TextField(verbose_name='Mensagem')),
+                ('client_ids', models.JSONField(default=list, verbose_name='Clientes selecionados')),
+                ('status', models.CharField(choices=[('queued', 'Na fila'), ('running', 'Em andamento'), ('completed', 'Concluído'), ('failed', 'Falha')], default='queued', max_length=20, verbose_name='Status')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Total')),
+                ('sent', models.PositiveIntegerField(default=0, verbose_name='Enviadas')),
+                ('failed', models.PositiveIntegerField(default=0, verbose_name='Falhas')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='Erros')),
+                ('error_message', models.TextField(blank=True, verbose_name='Mensagem de erro')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Início')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Término')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bulk_send_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Envio em massa',
+                'verbose_name_plural': 'Envios em massa',
+                'ordering': ('-created_at',),
+            },
+        ),
+    ]
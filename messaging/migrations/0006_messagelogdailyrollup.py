@@ -0,0 +1,34 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0005_bulksendjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessageLogDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Dia')),
+                ('message_type', models.CharField(choices=[('reminder', 'Lembrete'), ('charge', 'Cobrança'), ('incoming', 'Recebida')], max_length=20, verbose_name='Tipo de mensagem')),
+                ('channel', models.CharField(choices=[('whatsapp', 'WhatsApp'), ('email', 'E-mail')], max_length=20, verbose_name='Canal')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('success', 'Sucesso'), ('failed', 'Falha')], max_length=20, verbose_name='Status do envio')),
+                ('template_code', models.CharField(blank=True, default='', max_length=50, verbose_name='Template')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Quantidade')),
+            ],
+            options={
+                'verbose_name': 'Resumo diário de envios',
+                'verbose_name_plural': 'Resumos diários de envios',
+                'ordering': ('-day',),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='messagelogdailyrollup',
+            constraint=models.UniqueConstraint(fields=('day', 'message_type', 'channel', 'status', 'template_code'), name='messaging_rollup_bucket_unique'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0006_messagelogdailyrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clientinteraction',
+            index=models.Index(fields=['-received_at'], name='interaction_received_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientinteraction',
+            index=models.Index(fields=['client', '-received_at'], name='interaction_client_recv_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='messagelog',
+            index=models.Index(fields=['-sent_at'], name='msglog_sent_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='messagelog',
+            index=models.Index(fields=['status', '-sent_at'], name='msglog_status_sent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='messagelog',
+            index=models.Index(fields=['message_type', '-sent_at'], name='msglog_type_sent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='messagelog',
+            index=models.Index(fields=['client', '-sent_at'], name='msglog_client_sent_idx'),
+        ),
+    ]
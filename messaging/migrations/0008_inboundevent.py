@@ -0,0 +1,36 @@
+# Generated by Django 4.2.11 on 2026-10-18 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0007_messagelog_interaction_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InboundEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('wppconnect', 'Bot WPPConnect'), ('meta', 'WhatsApp Cloud API')], max_length=20, verbose_name='Origem')),
+                ('kind', models.CharField(choices=[('message', 'Mensagem'), ('receipt', 'Comprovante')], default='message', max_length=20, verbose_name='Tipo')),
+                ('phone', models.CharField(max_length=50, verbose_name='Telefone')),
+                ('phone_key', models.CharField(blank=True, max_length=9, verbose_name='Chave do telefone')),
+                ('message', models.TextField(blank=True, verbose_name='Mensagem')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('processing', 'Em processamento'), ('failed', 'Falha')], default='pending', max_length=20, verbose_name='Status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Tentativas')),
+                ('error_message', models.TextField(blank=True, verbose_name='Mensagem de erro')),
+                ('claim_token', models.CharField(blank=True, max_length=32)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True, verbose_name='Recebido em')),
+            ],
+            options={
+                'verbose_name': 'Evento recebido',
+                'verbose_name_plural': 'Eventos recebidos',
+                'ordering': ('id',),
+                'indexes': [models.Index(fields=['status', 'id'], name='inbound_status_idx'), models.Index(fields=['phone_key', 'status'], name='inbound_phone_status_idx')],
+            },
+        ),
+    ]
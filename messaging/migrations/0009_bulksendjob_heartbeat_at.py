@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-18 13:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0008_inboundevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bulksendjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Última atividade'),
+        ),
+    ]
@@ -42,6 +42,7 @@ class MessageLog(models.Model):
         EMAIL = "email", "E-mail"
 
     class Status(models.TextChoices):
+        PENDING = "pending", "Pendente"
         SUCCESS = "success", "Sucesso"
         FAILED = "failed", "Falha"
 
@@ -72,10 +73,49 @@ class MessageLog(models.Model):
         ordering = ("-sent_at",)
         verbose_name = "Log de envio"
         verbose_name_plural = "Logs de envio"
+        indexes = [
+            models.Index(fields=["-sent_at"], name="msglog_sent_at_idx"),
+            models.Index(fields=["status", "-sent_at"], name="msglog_status_sent_idx"),
+            models.Index(fields=["message_type", "-sent_at"], name="msglog_type_sent_idx"),
+            # Histórico por cliente e verificação de envios já feitos no dia
+            models.Index(fields=["client", "-sent_at"], name="msglog_client_sent_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.get_message_type_display()} - {self.client.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Status já contabilizado nos agregados diários (ver messaging.rollups)
+        instance._counted_status = instance.__dict__.get("status")
+        return instance
+
+
+class MessageLogDailyRollup(models.Model):
+    """Contagem diária de logs por tipo, canal, status e template (ver messaging.rollups)."""
+
+    day = models.DateField("Dia")
+    message_type = models.CharField("Tipo de mensagem", max_length=20, choices=MessageLog.Type.choices)
+    channel = models.CharField("Canal", max_length=20, choices=MessageLog.Channel.choices)
+    status = models.CharField("Status do envio", max_length=20, choices=MessageLog.Status.choices)
+    template_code = models.CharField("Template", max_length=50, blank=True, default="")
+    count = models.PositiveIntegerField("Quantidade", default=0)
+
+    class Meta:
+        ordering = ("-day",)
+        verbose_name = "Resumo diário de envios"
+        verbose_name_plural = "Resumos diários de envios"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "message_type", "channel", "status", "template_code"],
+                name="messaging_rollup_bucket_unique",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day:%d/%m/%Y} {self.message_type}/{self.channel}/{self.status}: {self.count}"
+
 
 class ClientInteraction(models.Model):
     client = models.ForeignKey(Client, on_delete=models.CASCADE, related_name="interactions")
@@ -101,6 +141,103 @@ class ClientInteraction(models.Model):
         ordering = ("-received_at",)
         verbose_name = "Interação do cliente"
         verbose_name_plural = "Interações dos clientes"
+        indexes = [
+            models.Index(fields=["-received_at"], name="interaction_received_idx"),
+            models.Index(fields=["client", "-received_at"], name="interaction_client_recv_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.client.name} - {self.received_at:%d/%m/%Y %H:%M}"
+
+
+class BulkSendJob(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Na fila"
+        RUNNING = "running", "Em andamento"
+        COMPLETED = "completed", "Concluído"
+        FAILED = "failed", "Falha"
+
+    message = models.TextField("Mensagem")
+    client_ids = models.JSONField("Clientes selecionados", default=list)
+    status = models.CharField(
+        "Status",
+        max_length=20,
+        choices=Status.choices,
+        default=Status.QUEUED,
+    )
+    total = models.PositiveIntegerField("Total", default=0)
+    sent = models.PositiveIntegerField("Enviadas", default=0)
+    failed = models.PositiveIntegerField("Falhas", default=0)
+    errors = models.JSONField("Erros", default=list, blank=True)
+    error_message = models.TextField("Mensagem de erro", blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="bulk_send_jobs",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField("Início", null=True, blank=True)
+    # Atualizado a cada lote enviado; jobs parados há mais de BULK_SEND_JOB_STALE_TIMEOUT são encerrados
+    heartbeat_at = models.DateTimeField("Última atividade", null=True, blank=True)
+    finished_at = models.DateTimeField("Término", null=True, blank=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+        verbose_name = "Envio em massa"
+        verbose_name_plural = "Envios em massa"
+
+    def __str__(self) -> str:
+        return f"Envio em massa #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def remaining(self) -> int:
+        return max(self.total - self.sent - self.failed, 0)
+
+
+class InboundEvent(models.Model):
+    """
+    Buffer de eventos recebidos pelos webhooks no modo ``queued``
+    (``WEBHOOK_INGESTION_MODE``), processados em lote por ``messaging.inbound``.
+    Eventos processados são removidos; os que falharam ficam para inspeção.
+    """
+
+    class Source(models.TextChoices):
+        WPPCONNECT = "wppconnect", "Bot WPPConnect"
+        META = "meta", "WhatsApp Cloud API"
+
+    class Kind(models.TextChoices):
+        MESSAGE = "message", "Mensagem"
+        RECEIPT = "receipt", "Comprovante"
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pendente"
+        PROCESSING = "processing", "Em processamento"
+        FAILED = "failed", "Falha"
+
+    source = models.CharField("Origem", max_length=20, choices=Source.choices)
+    kind = models.CharField("Tipo", max_length=20, choices=Kind.choices, default=Kind.MESSAGE)
+    phone = models.CharField("Telefone", max_length=50)
+    phone_key = models.CharField("Chave do telefone", max_length=9, blank=True)
+    message = models.TextField("Mensagem", blank=True)
+    status = models.CharField("Status", max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField("Tentativas", default=0)
+    error_message = models.TextField("Mensagem de erro", blank=True)
+    claim_token = models.CharField(max_length=32, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    received_at = models.DateTimeField("Recebido em", auto_now_add=True)
+
+    class Meta:
+        ordering = ("id",)
+        verbose_name = "Evento recebido"
+        verbose_name_plural = "Eventos recebidos"
+        indexes = [
+            # Próximo lote pendente, em ordem de chegada
+            models.Index(fields=["status", "id"], name="inbound_status_idx"),
+            # Ordem por telefone entre workers
+            models.Index(fields=["phone_key", "status"], name="inbound_phone_status_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_source_display()} {self.phone} ({self.get_status_display()})"
@@ -0,0 +1,68 @@
+"""
+Paginação por cursor para os logs e interações (exportações de grande volume).
+
+O modo cursor é opcional: ``?pagination=cursor`` (ou a presença de ``?cursor=``)
+troca a paginação por página/offset pela paginação por cursor e a listagem
+passa a usar a representação compacta. Campos pesados voltam com
+``?include=payload,response,client``.
+
+No modo cursor a ordenação é sempre a da paginação (data desc, id desc): o
+``?ordering=`` do ``OrderingFilter`` é ignorado, já que paginar por um campo de
+baixa cardinalidade como ``status`` anularia o cursor e os índices.
+"""
+from __future__ import annotations
+
+from typing import Set
+
+from rest_framework.pagination import CursorPagination
+
+
+class FixedOrderingCursorPagination(CursorPagination):
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
+
+class MessageLogCursorPagination(FixedOrderingCursorPagination):
+    ordering = ("-sent_at", "-id")
+
+
+class ClientInteractionCursorPagination(FixedOrderingCursorPagination):
+    ordering = ("-received_at", "-id")
+
+
+class CursorModeMixin:
+    """Alterna paginação e serializer da listagem quando o modo cursor é pedido."""
+
+    cursor_pagination_class = None
+    compact_serializer_class = None
+
+    @property
+    def cursor_mode(self) -> bool:
+        params = self.request.query_params
+        return getattr(self, "action", None) == "list" and (
+            "cursor" in params or params.get("pagination") == "cursor"
+        )
+
+    @property
+    def included_fields(self) -> Set[str]:
+        raw = self.request.query_params.get("include", "")
+        return {name.strip() for name in raw.split(",") if name.strip()}
+
+    @property
+    def paginator(self):
+        if self.cursor_mode and not isinstance(getattr(self, "_paginator", None), CursorPagination):
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
+
+    def get_serializer_class(self):
+        if self.cursor_mode:
+            return self.compact_serializer_class
+        return super().get_serializer_class()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["include"] = self.included_fields
+        return context
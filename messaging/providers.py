@@ -0,0 +1,204 @@
+"""
+Montagem e envio das requisições de texto para cada provedor de WhatsApp.
+
+Usado tanto pelo envio unitário (``services``) quanto pelo motor de envio
+concorrente (``send_engine``). ``wppconnect`` envia pelo ``/send`` do bot.
+
+Envio em lote: a Infobip aceita várias mensagens numa única requisição pelo
+endpoint de templates (``/whatsapp/1/message/template``). Com
+``INFOBIP_BULK_TEMPLATE`` configurado (template aprovado com um único
+placeholder no corpo, que recebe a mensagem renderizada), ``post_whatsapp_batch``
+envia até ``INFOBIP_BATCH_SIZE`` mensagens por requisição. Os demais provedores
+não têm API de lote para texto livre e seguem com envios unitários.
+"""
+from __future__ import annotations
+
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from .http_client import BOT_PROVIDER, bot_url, get_session
+
+PROVIDERS = ("meta", "whapi", "infobip", BOT_PROVIDER)
+
+# Status da Infobip que indicam mensagem aceita
+INFOBIP_ACCEPTED_GROUPS = frozenset({"PENDING", "DELIVERED"})
+
+
+def current_provider() -> str:
+    return getattr(settings, "WHATSAPP_PROVIDER", "meta")
+
+
+def _infobip_url(base_url: str, path: str) -> str:
+    # INFOBIP_BASE_URL normalmente vem sem esquema (ex.: xxxx.api.infobip.com)
+    base_url = base_url.rstrip("/")
+    if "://" not in base_url:
+        base_url = f"https://{base_url}"
+    return f"{base_url}{path}"
+
+
+def _infobip_headers(api_key: str) -> Dict[str, str]:
+    return {
+        "Authorization": f"App {api_key}",
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+    }
+
+
+def _infobip_credentials() -> Tuple[str, str, str]:
+    base_url = getattr(settings, "INFOBIP_BASE_URL", "")
+    api_key = getattr(settings, "INFOBIP_API_KEY", "")
+    sender = getattr(settings, "INFOBIP_SENDER", "")
+    if not all([base_url, api_key, sender]):
+        raise ValueError("Configurações Infobip ausentes. Defina INFOBIP_BASE_URL, INFOBIP_API_KEY e INFOBIP_SENDER.")
+    return base_url, api_key, sender
+
+
+def build_whatsapp_request(provider: str, phone: str, message: str) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+    """Retorna (url, payload, headers) da mensagem de texto no provedor."""
+    if provider == "whapi":
+        base_url = getattr(settings, "WHAPI_BASE_URL", "")
+        token = getattr(settings, "WHAPI_TOKEN", "")
+        channel_type = getattr(settings, "WHAPI_CHANNEL_TYPE", "web")
+
+        if not token:
+            raise ValueError("Token da WHAPI não configurado. Defina WHAPI_TOKEN.")
+
+        url = f"{base_url.rstrip('/')}/messages/text"
+        payload = {
+            "to": phone,
+            "body": message,
+            "typing_time": 0,
+            "channel_type": channel_type,
+        }
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "accept": "application/json",
+            "Content-Type": "application/json",
+        }
+
+    elif provider == "infobip":
+        base_url, api_key, sender = _infobip_credentials()
+        url = _infobip_url(base_url, "/whatsapp/1/message/text")
+        to_number = phone if phone.startswith("+") else f"+{phone}"
+        payload = {
+            "from": sender,
+            "to": to_number,
+            "content": {"text": message},
+        }
+        headers = _infobip_headers(api_key)
+
+    elif provider == BOT_PROVIDER:
+        url = bot_url("/send")
+        payload = {"phone": phone, "message": message}
+        headers = {"Content-Type": "application/json"}
+
+    else:
+        api_url = getattr(settings, "WHATSAPP_API_URL", "")
+        token = getattr(settings, "WHATSAPP_ACCESS_TOKEN", "")
+        phone_id = getattr(settings, "WHATSAPP_PHONE_NUMBER_ID", "")
+
+        if not all([api_url, token, phone_id]):
+            raise ValueError("Configurações da API do WhatsApp (Meta) ausentes. Verifique as variáveis de ambiente.")
+
+        url = f"{api_url.rstrip('/')}/{phone_id}/messages"
+        payload = {
+            "messaging_product": "whatsapp",
+            "to": phone,
+            "type": "text",
+            "text": {"preview_url": False, "body": message},
+        }
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        }
+    return url, payload, headers
+
+
+def post_whatsapp_message(phone: str, message: str, provider: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Envia a mensagem de forma bloqueante pela sessão HTTP do provedor e retorna
+    a resposta. Erros HTTP/de rede são propagados; o bot sinaliza falha no corpo
+    (``success: false``), que vira ``ValueError``.
+    """
+    provider = provider or current_provider()
+    url, payload, headers = build_whatsapp_request(provider, phone, message)
+    response = get_session(provider).post(url, json=payload, headers=headers, timeout=30)
+    response.raise_for_status()
+    data = response.json()
+    if provider == BOT_PROVIDER and not data.get("success"):
+        raise ValueError(data.get("error", "Erro desconhecido"))
+    return data
+
+
+def supports_batch(provider: str) -> bool:
+    return provider == "infobip" and bool(getattr(settings, "INFOBIP_BULK_TEMPLATE", ""))
+
+
+def batch_size(provider: str) -> int:
+    return max(1, int(getattr(settings, "INFOBIP_BATCH_SIZE", 100)))
+
+
+def build_whatsapp_batch_request(
+    provider: str, messages: Sequence[Tuple[str, str, str]]
+) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+    """Requisição única para várias mensagens (id, telefone, texto). Apenas Infobip."""
+    if not supports_batch(provider):
+        raise ValueError(f"Provedor {provider} não suporta envio em lote.")
+
+    base_url, api_key, sender = _infobip_credentials()
+    template = getattr(settings, "INFOBIP_BULK_TEMPLATE", "")
+    language = getattr(settings, "INFOBIP_BULK_TEMPLATE_LANGUAGE", "pt_BR")
+    payload = {
+        "messages": [
+            {
+                "from": sender,
+                "to": phone.lstrip("+"),
+                "messageId": message_id,
+                "content": {
+                    "templateName": template,
+                    "templateData": {"body": {"placeholders": [body]}},
+                    "language": language,
+                },
+            }
+            for message_id, phone, body in messages
+        ]
+    }
+    return _infobip_url(base_url, "/whatsapp/1/message/template"), payload, _infobip_headers(api_key)
+
+
+def post_whatsapp_batch(
+    provider: str, messages: Sequence[Tuple[str, str]]
+) -> List[Tuple[bool, Dict[str, Any], str]]:
+    """
+    Envia (telefone, texto) numa única requisição e devolve, na mesma ordem,
+    (sucesso, resposta, erro) de cada destinatário. Erros HTTP/de rede do lote
+    inteiro são propagados.
+    """
+    ids = [uuid.uuid4().hex for _ in messages]
+    url, payload, headers = build_whatsapp_batch_request(
+        provider, [(message_id, phone, body) for message_id, (phone, body) in zip(ids, messages)]
+    )
+    response = get_session(provider).post(url, json=payload, headers=headers, timeout=60)
+    response.raise_for_status()
+    data = response.json()
+
+    bulk_id = data.get("bulkId")
+    by_id: Dict[str, Dict[str, Any]] = {}
+    for position, item in enumerate(data.get("messages", [])):
+        message_id = item.get("messageId") or (ids[position] if position < len(ids) else None)
+        if message_id:
+            by_id[message_id] = item
+
+    results: List[Tuple[bool, Dict[str, Any], str]] = []
+    for message_id in ids:
+        item = by_id.get(message_id)
+        if item is None:
+            results.append((False, {"bulkId": bulk_id}, "Provedor não retornou resultado para a mensagem."))
+            continue
+        item_status = item.get("status") or {}
+        accepted = item_status.get("groupName") in INFOBIP_ACCEPTED_GROUPS
+        error = "" if accepted else item_status.get("description") or item_status.get("name") or "Mensagem recusada"
+        results.append((accepted, {"bulkId": bulk_id, **item}, error))
+    return results
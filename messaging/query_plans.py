@@ -0,0 +1,175 @@
+"""
+Verificação dos planos de execução (EXPLAIN) das consultas mais frequentes.
+
+``hot_queries`` lista as consultas dos envios automáticos, webhooks, painel e
+APIs; ``query_plan_problems`` aponta as que fazem varredura completa da tabela
+ou ordenam fora do índice. Usado pelo teste de regressão em
+``messaging.tests`` e pelo comando ``check_query_plans``.
+"""
+from __future__ import annotations
+
+import random
+import re
+from datetime import timedelta
+from decimal import Decimal
+from typing import Callable, List, Optional, Tuple
+
+from django.db import connection
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from automation.tasks import _eligible_clients
+from clients.models import Client, due_on, next_due_date_for, phone_key
+from .models import ClientInteraction, InboundEvent, MessageLog
+
+# Linhas por tabela na massa de teste: volume próximo ao de produção, para o planejador escolher os mesmos planos
+PLAN_CHECK_ROWS = 100_000
+FULL_SCAN_PATTERNS = {
+    # "SCAN tabela" sem índice; "SCAN tabela USING [COVERING] INDEX" é varredura ordenada pelo índice
+    "sqlite": re.compile(r"\bSCAN (?!.*USING (COVERING )?INDEX)\w+"),
+    "postgresql": re.compile(r"Seq Scan on"),
+}
+
+# SQLite: "SCAN tabela USING INDEX" lê a tabela inteira na ordem do índice
+ORDERED_SCAN_PATTERN = re.compile(r"\bSCAN \w+ USING (COVERING )?INDEX")
+
+# Consultas com LIMIT (listagens por data): a ordenação também precisa vir do índice
+SORT_PATTERNS = {
+    "sqlite": re.compile(r"USE TEMP B-TREE FOR ORDER BY"),
+    "postgresql": re.compile(r"^\s*(->\s*)?Sort\b", re.MULTILINE),
+}
+
+
+def hot_queries() -> List[Tuple[str, Callable[[], QuerySet]]]:
+    today = timezone.localdate()
+    sample = Client.objects.order_by("id").values("id", "phone").first() or {"id": 0, "phone": ""}
+    return [
+        (
+            "envios automáticos (status + vencimento)",
+            lambda: _eligible_clients(today.day, statuses=[Client.Status.ACTIVE, Client.Status.DELINQUENT]),
+        ),
+        ("cliente por telefone (webhooks)", lambda: Client.objects.filter(phone_key=phone_key(sample["phone"]))),
+        ("painel: vencendo hoje", lambda: Client.objects.filter(due_on(today))),
+        # Usada em .count(), que descarta a ordenação padrão por nome
+        ("resumo: inadimplentes", lambda: Client.objects.filter(status=Client.Status.DELINQUENT).order_by()),
+        (
+            "controle do bot: dia + veículo",
+            lambda: Client.objects.filter(
+                auto_messaging_enabled=True, due_day=10, vehicle_type=Client.VehicleType.MOTO
+            ),
+        ),
+        (
+            "controle do bot: data",
+            lambda: Client.objects.filter(auto_messaging_enabled=True, next_due_date=today),
+        ),
+        (
+            "virada de vencimentos",
+            lambda: Client.objects.filter(next_due_date__lt=today, due_day=today.day),
+        ),
+        (
+            "contatos a sincronizar",
+            lambda: Client.objects.filter(contact_sync_pending=True).order_by("id")[:500],
+        ),
+        ("logs recentes", lambda: MessageLog.objects.order_by("-sent_at")[:10]),
+        (
+            "logs por status",
+            lambda: MessageLog.objects.filter(status=MessageLog.Status.FAILED).order_by("-sent_at")[:20],
+        ),
+        (
+            "logs por tipo",
+            lambda: MessageLog.objects.filter(message_type=MessageLog.Type.CHARGE).order_by("-sent_at")[:20],
+        ),
+        ("logs do cliente", lambda: MessageLog.objects.filter(client_id=sample["id"]).order_by("-sent_at")[:20]),
+        (
+            "envios já feitos hoje",
+            lambda: MessageLog.objects.filter(
+                client_id__in=[sample["id"]],
+                message_type=MessageLog.Type.CHARGE,
+                sent_at__gte=timezone.now() - timedelta(days=1),
+            ),
+        ),
+        ("interações recentes", lambda: ClientInteraction.objects.order_by("-received_at")[:20]),
+        (
+            "interações do cliente",
+            lambda: ClientInteraction.objects.filter(client_id=sample["id"]).order_by("-received_at")[:20],
+        ),
+        (
+            "eventos recebidos pendentes",
+            lambda: InboundEvent.objects.filter(status=InboundEvent.Status.PENDING).order_by("id")[:200],
+        ),
+    ]
+
+
+def seed_plan_data(rows: int = PLAN_CHECK_ROWS) -> None:
+    rng = random.Random(42)
+    today = timezone.localdate()
+    statuses = Client.Status.values
+    vehicles = Client.VehicleType.values
+    clients = []
+    for index in range(rows):
+        due_date = today + timedelta(days=rng.randint(-45, 45))
+        phone = f"55{rng.randint(11, 99)}9{index:08d}"
+        clients.append(
+            Client(
+                name=f"Cliente {index:06d}",
+                phone=phone,
+                phone_key=phone_key(phone),
+                monthly_fee=Decimal("49.99"),
+                due_date=due_date,
+                due_day=due_date.day,
+                next_due_date=next_due_date_for(due_date, due_date.day, today),
+                status=rng.choice(statuses),
+                vehicle_type=rng.choice(vehicles),
+                auto_messaging_enabled=rng.random() < 0.9,
+            )
+        )
+    Client.objects.bulk_create(clients, batch_size=2000)
+    client_ids = list(Client.objects.values_list("id", flat=True))
+
+    logs = [
+        MessageLog(
+            client_id=rng.choice(client_ids),
+            message_type=rng.choice(MessageLog.Type.values),
+            channel=MessageLog.Channel.WHATSAPP,
+            status=rng.choice(MessageLog.Status.values),
+        )
+        for _ in range(rows)
+    ]
+    MessageLog.objects.bulk_create(logs, batch_size=2000)
+    # sent_at é auto_now_add: espalhar as datas por faixa de id depois da inserção
+    log_ids = list(MessageLog.objects.order_by("id").values_list("id", flat=True))
+    step = max(1, len(log_ids) // 365)
+    now = timezone.now()
+    for days, start in enumerate(range(0, len(log_ids), step)):
+        chunk = log_ids[start:start + step]
+        MessageLog.objects.filter(id__gte=chunk[0], id__lte=chunk[-1]).update(sent_at=now - timedelta(days=days))
+
+    ClientInteraction.objects.bulk_create(
+        [ClientInteraction(client_id=rng.choice(client_ids), raw_message="1") for _ in range(rows)],
+        batch_size=2000,
+    )
+
+
+def plan_problem(queryset: QuerySet) -> Tuple[str, str]:
+    """Retorna (plano, problema); problema vazio quando a consulta usa índice."""
+    plan = queryset.explain()
+    pattern: Optional[re.Pattern] = FULL_SCAN_PATTERNS.get(connection.vendor)
+    sort_pattern: Optional[re.Pattern] = SORT_PATTERNS.get(connection.vendor)
+    if pattern and pattern.search(plan):
+        return plan, "VARREDURA"
+    if not queryset.query.is_sliced and connection.vendor == "sqlite" and ORDERED_SCAN_PATTERN.search(plan):
+        # Sem LIMIT, percorrer a tabela na ordem de um índice também é varredura completa
+        return plan, "VARREDURA"
+    if queryset.query.is_sliced and sort_pattern and sort_pattern.search(plan):
+        return plan, "ORDENAÇÃO"
+    return plan, ""
+
+
+def analyze() -> None:
+    """Atualiza as estatísticas do banco para o planejador considerar a massa atual."""
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def supports_plan_check() -> bool:
+    return connection.vendor in FULL_SCAN_PATTERNS
@@ -0,0 +1,285 @@
+"""
+Limitadores de taxa usados pelos envios ao bot e aos provedores de WhatsApp.
+
+``AdaptiveRateLimiter`` é um token bucket por provedor e número remetente cujo
+estado fica no cache do Django, então todos os workers (gunicorn e Celery)
+dividem a mesma cota quando ``CACHE_URL`` aponta para o Redis. A taxa se ajusta
+às respostas do provedor (AIMD):
+
+- 429/5xx reduzem a taxa pela metade (``SEND_RATE_DECREASE_FACTOR``), sem
+  descer abaixo de ``SEND_RATE_MIN_FACTOR`` da taxa configurada, e um
+  ``Retry-After`` bloqueia novos envios até o prazo indicado;
+- depois de ``SEND_RATE_INCREASE_AFTER`` sucessos seguidos a taxa sobe
+  ``SEND_RATE_INCREASE_FACTOR`` vezes, até voltar à taxa configurada.
+
+Com o cache local (``LocMemCache``, sem ``CACHE_URL``) cada processo tem a sua
+cota: N workers enviam até N vezes a taxa configurada (aviso ``messaging.W001``
+do ``manage.py check --deploy``, ver ``messaging.checks``).
+
+Cada envio custa uma atualização do estado (lock, leitura, gravação e
+liberação). Os sucessos ficam acumulados no limitador e entram na atualização
+seguinte (próximo ``acquire``, ``record_throttle`` ou ``flush``).
+
+``rate_limit_metrics`` expõe a taxa atual e o estado de backoff de cada
+limitador.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .http_client import BOT_PROVIDER
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_CACHE_PREFIX = "messaging:rate-limit"
+
+# Taxa configurada (mensagens/s) e rajada máxima por provedor: (setting, padrão)
+RATE_SETTINGS = {
+    "meta": ("META_SEND_RATE_PER_SECOND", 20.0),
+    "whapi": ("WHAPI_SEND_RATE_PER_SECOND", 5.0),
+    "infobip": ("INFOBIP_SEND_RATE_PER_SECOND", 20.0),
+    BOT_PROVIDER: ("BOT_SEND_RATE_PER_SECOND", 0.5),
+}
+BURST_SETTINGS = {
+    "meta": ("META_SEND_BURST", 20),
+    "whapi": ("WHAPI_SEND_BURST", 5),
+    "infobip": ("INFOBIP_SEND_BURST", 20),
+    BOT_PROVIDER: ("BOT_SEND_BURST", 1),
+}
+
+# Status que indicam sobrecarga do provedor. O bot responde 500 para qualquer
+# falha de envio (ex.: número inexistente), então nele só 429/503 contam.
+THROTTLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+BOT_THROTTLE_STATUS_CODES = frozenset({429, 503})
+
+
+def sender_for(provider: str) -> str:
+    """Número/conta remetente: provedores limitam por remetente, não por chave de API."""
+    if provider == "infobip":
+        return getattr(settings, "INFOBIP_SENDER", "") or "default"
+    if provider == "whapi":
+        # O token da WHAPI é por canal (número); guardar só um hash no cache
+        token = getattr(settings, "WHAPI_TOKEN", "")
+        return hashlib.sha1(token.encode()).hexdigest()[:12] if token else "default"
+    if provider == BOT_PROVIDER:
+        return "bot"
+    return getattr(settings, "WHATSAPP_PHONE_NUMBER_ID", "") or "default"
+
+
+def is_throttle_status(provider: str, status_code: Optional[int]) -> bool:
+    codes = BOT_THROTTLE_STATUS_CODES if provider == BOT_PROVIDER else THROTTLE_STATUS_CODES
+    return status_code in codes
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Segundos indicados por um header ``Retry-After`` (número ou data HTTP)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket compartilhado pelo cache. ``rate <= 0`` desativa o limite.
+
+    O estado é lido e gravado sob um lock curto no cache (``cache.add``); se o
+    lock não sair a tempo, a operação segue sem ele, já que um envio a mais não
+    compensa travar o lote.
+    """
+
+    LOCK_TIMEOUT = 2
+    LOCK_WAIT = 0.5
+    DECREASE_COOLDOWN = 1.0
+
+    def __init__(self, provider: str, sender: str, rate: float, capacity: int = 1) -> None:
+        self.provider = provider
+        self.sender = sender
+        self.max_rate = rate
+        self.min_rate = rate * float(getattr(settings, "SEND_RATE_MIN_FACTOR", 0.1))
+        self.capacity = max(1, capacity)
+        self.key = f"{RATE_LIMIT_CACHE_PREFIX}:{provider}:{sender}"
+        self.lock_key = f"{self.key}:lock"
+        self._pending_successes = 0
+        self._pending_lock = threading.Lock()
+
+    def _initial_state(self, now: float) -> Dict[str, Any]:
+        return {
+            "rate": self.max_rate,
+            "tokens": float(self.capacity),
+            "updated": now,
+            "blocked_until": 0.0,
+            "streak": 0,
+            "sent": 0,
+            "throttled": 0,
+            "last_throttle_at": None,
+            "last_status": None,
+        }
+
+    def _lock(self) -> Optional[str]:
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.LOCK_WAIT
+        while True:
+            if cache.add(self.lock_key, token, timeout=self.LOCK_TIMEOUT):
+                return token
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.005)
+
+    def _unlock(self, token: Optional[str]) -> None:
+        # Sem conferir o dono: a operação leva milissegundos e o lock só expira em LOCK_TIMEOUT
+        if token:
+            cache.delete(self.lock_key)
+
+    def _take_pending_successes(self) -> int:
+        with self._pending_lock:
+            count, self._pending_successes = self._pending_successes, 0
+        return count
+
+    def _apply_successes(self, state: Dict[str, Any], count: int) -> None:
+        state["sent"] += count
+        state["streak"] += count
+        state["last_status"] = "ok"
+        if state["rate"] < self.max_rate and state["streak"] >= int(getattr(settings, "SEND_RATE_INCREASE_AFTER", 50)):
+            factor = float(getattr(settings, "SEND_RATE_INCREASE_FACTOR", 1.25))
+            state["rate"] = min(self.max_rate, state["rate"] * factor)
+            state["streak"] = 0
+            logger.info("Taxa de envio %s/%s aumentada para %.2f msg/s", self.provider, self.sender, state["rate"])
+
+    def _update(self, change) -> Any:
+        """Aplica os sucessos acumulados e ``change(state, now)`` ao estado compartilhado; devolve o retorno de ``change``."""
+        successes = self._take_pending_successes()
+        token = self._lock()
+        try:
+            now = time.time()
+            state = cache.get(self.key) or self._initial_state(now)
+            if successes:
+                self._apply_successes(state, successes)
+            result = change(state, now)
+            cache.set(self.key, state, int(getattr(settings, "SEND_RATE_STATE_TTL", 86400)))
+            return result
+        finally:
+            self._unlock(token)
+
+    def _take(self, state: Dict[str, Any], now: float) -> float:
+        if now < state["blocked_until"]:
+            return state["blocked_until"] - now
+        # A taxa configurada pode ter sido reduzida desde que o estado foi gravado
+        state["rate"] = min(state["rate"], self.max_rate)
+        # Não acumular cota durante o bloqueio do Retry-After
+        elapsed = max(0.0, now - max(state["updated"], state["blocked_until"]))
+        state["tokens"] = min(self.capacity, state["tokens"] + elapsed * state["rate"])
+        state["updated"] = now
+        if state["tokens"] >= 1:
+            state["tokens"] -= 1
+            return 0.0
+        return (1 - state["tokens"]) / state["rate"]
+
+    def acquire(self) -> float:
+        """Bloqueia até haver cota para um envio. Retorna o tempo esperado (s)."""
+        if self.max_rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            wait = self._update(self._take)
+            if not wait:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    def record_success(self) -> None:
+        """Conta um sucesso; gravado no cache junto com a próxima atualização do estado."""
+        if self.max_rate <= 0:
+            return
+        with self._pending_lock:
+            self._pending_successes += 1
+
+    def flush(self) -> None:
+        """Grava os sucessos ainda não aplicados (fim de um lote de envios)."""
+        if self._pending_successes:
+            self._update(lambda state, now: None)
+
+    def record_throttle(self, status_code: Optional[int] = None, retry_after: Optional[float] = None) -> None:
+        """Registra uma resposta de sobrecarga (429/5xx): reduz a taxa e respeita o ``Retry-After``."""
+        if self.max_rate <= 0:
+            return
+
+        def change(state: Dict[str, Any], now: float) -> None:
+            # Recusas das requisições que já estavam em voo contam como um único evento
+            if not state["last_throttle_at"] or now - state["last_throttle_at"] >= self.DECREASE_COOLDOWN:
+                factor = float(getattr(settings, "SEND_RATE_DECREASE_FACTOR", 0.5))
+                state["rate"] = max(self.min_rate, state["rate"] * factor)
+            state["tokens"] = min(state["tokens"], 0.0)
+            state["streak"] = 0
+            state["throttled"] += 1
+            state["last_throttle_at"] = now
+            state["last_status"] = status_code
+            if retry_after:
+                state["blocked_until"] = max(state["blocked_until"], now + retry_after)
+            logger.warning(
+                "Provedor %s/%s sobrecarregado (HTTP %s, Retry-After %s): taxa reduzida para %.2f msg/s",
+                self.provider,
+                self.sender,
+                status_code,
+                retry_after,
+                state["rate"],
+            )
+
+        self._update(change)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        state = cache.get(self.key) or self._initial_state(now)
+        return {
+            "provider": self.provider,
+            "sender": self.sender,
+            "rate": round(state["rate"], 4),
+            "max_rate": self.max_rate,
+            "min_rate": round(self.min_rate, 4),
+            "capacity": self.capacity,
+            "backoff_seconds": round(max(0.0, state["blocked_until"] - now), 3),
+            "backing_off": state["rate"] < self.max_rate or state["blocked_until"] > now,
+            "success_streak": state["streak"],
+            "sent_total": state["sent"],
+            "throttled_total": state["throttled"],
+            "last_throttle_at": state["last_throttle_at"],
+            "last_status": state["last_status"],
+        }
+
+    def reset(self) -> None:
+        cache.delete(self.key)
+
+
+def get_rate_limiter(provider: str, sender: Optional[str] = None) -> AdaptiveRateLimiter:
+    rate_name, rate_default = RATE_SETTINGS.get(provider, RATE_SETTINGS["meta"])
+    burst_name, burst_default = BURST_SETTINGS.get(provider, BURST_SETTINGS["meta"])
+    return AdaptiveRateLimiter(
+        provider,
+        sender or sender_for(provider),
+        float(getattr(settings, rate_name, rate_default)),
+        int(getattr(settings, burst_name, burst_default)),
+    )
+
+
+def rate_limit_metrics() -> List[Dict[str, Any]]:
+    """Estado dos limitadores do provedor configurado e do bot."""
+    provider = getattr(settings, "WHATSAPP_PROVIDER", "meta")
+    providers = [provider] if provider == BOT_PROVIDER else [provider, BOT_PROVIDER]
+    return [get_rate_limiter(name).snapshot() for name in providers]
@@ -0,0 +1,167 @@
+"""
+Agregados diários de ``MessageLog`` usados pelo resumo da API.
+
+Os contadores de ``MessageLogDailyRollup`` são atualizados de forma incremental
+pelos signals (``messaging.signals``): +1 na criação, transferência de balde
+quando o status muda e -1 na exclusão. Quando o status anterior de um log não é
+conhecido, a alteração não é contabilizada e o dia é registrado em log: recalcular
+o dia dentro da gravação concorreria com os incrementos de outros processos.
+``rebuild`` recalcula um intervalo a partir da tabela de logs (comando
+``rebuild_message_rollups``).
+"""
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import MessageLog, MessageLogDailyRollup
+
+logger = logging.getLogger(__name__)
+
+Bucket = Tuple[date, str, str, str, str]
+
+GROUP_FIELDS = {
+    "day": "day",
+    "message_type": "message_type",
+    "channel": "channel",
+    "status": "status",
+    "template": "template_code",
+}
+
+_UNSET = object()
+
+
+def _log_day(message_log: MessageLog) -> date:
+    sent_at = message_log.sent_at or timezone.now()
+    return timezone.localdate(sent_at) if timezone.is_aware(sent_at) else sent_at.date()
+
+
+def _template_code(message_log: MessageLog) -> str:
+    if message_log.template_id is None:
+        return ""
+    return message_log.template.code
+
+
+def _bucket(message_log: MessageLog, status: Optional[str] = None) -> Bucket:
+    return (
+        _log_day(message_log),
+        message_log.message_type,
+        message_log.channel,
+        status or message_log.status,
+        _template_code(message_log),
+    )
+
+
+def _apply(deltas: Dict[Bucket, int]) -> None:
+    for (day, message_type, channel, status, template_code), delta in deltas.items():
+        if not delta:
+            continue
+        lookup = {
+            "day": day,
+            "message_type": message_type,
+            "channel": channel,
+            "status": status,
+            "template_code": template_code,
+        }
+        if MessageLogDailyRollup.objects.filter(**lookup).update(count=F("count") + delta):
+            continue
+        if delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                MessageLogDailyRollup.objects.create(count=delta, **lookup)
+        except IntegrityError:
+            # Outro processo criou o balde ao mesmo tempo
+            MessageLogDailyRollup.objects.filter(**lookup).update(count=F("count") + delta)
+
+
+def record_created(message_logs: Iterable[MessageLog]) -> None:
+    deltas: Counter = Counter()
+    for message_log in message_logs:
+        deltas[_bucket(message_log)] += 1
+        message_log._counted_status = message_log.status
+    _apply(deltas)
+
+
+def record_updated(message_logs: Iterable[MessageLog]) -> None:
+    deltas: Counter = Counter()
+    stale_days = set()
+    for message_log in message_logs:
+        previous = getattr(message_log, "_counted_status", _UNSET)
+        if previous is _UNSET or previous is None:
+            stale_days.add(_log_day(message_log))
+        elif previous != message_log.status:
+            deltas[_bucket(message_log, previous)] -= 1
+            deltas[_bucket(message_log)] += 1
+        message_log._counted_status = message_log.status
+    _apply(deltas)
+    for day in sorted(stale_days):
+        logger.warning(
+            "Status anterior desconhecido em logs de %s; resumo do dia pode estar desatualizado. "
+            "Execute: manage.py rebuild_message_rollups --since %s --until %s",
+            day,
+            day,
+            day,
+        )
+
+
+def record_deleted(message_log: MessageLog) -> None:
+    status = getattr(message_log, "_counted_status", None) or message_log.status
+    _apply({_bucket(message_log, status): -1})
+
+
+def rebuild(start: Optional[date] = None, end: Optional[date] = None) -> int:
+    """Recalcula os agregados do intervalo (inclusive) a partir dos logs. Retorna o nº de baldes."""
+    logs = MessageLog.objects.annotate(day=TruncDate("sent_at"))
+    rollups = MessageLogDailyRollup.objects.all()
+    if start:
+        logs = logs.filter(day__gte=start)
+        rollups = rollups.filter(day__gte=start)
+    if end:
+        logs = logs.filter(day__lte=end)
+        rollups = rollups.filter(day__lte=end)
+
+    rows = (
+        logs.values("day", "message_type", "channel", "status", template_code=Coalesce("template__code", Value("")))
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    buckets = [MessageLogDailyRollup(**row) for row in rows]
+    with transaction.atomic():
+        rollups.delete()
+        MessageLogDailyRollup.objects.bulk_create(buckets, batch_size=1000)
+    return len(buckets)
+
+
+def summarize(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    group_by: Sequence[str] = (),
+) -> Tuple[Dict[str, int], List[Dict[str, object]]]:
+    """Totais (total/sucesso/falha) e, opcionalmente, grupos lidos dos agregados."""
+    queryset = MessageLogDailyRollup.objects.filter(count__gt=0)
+    if start:
+        queryset = queryset.filter(day__gte=start)
+    if end:
+        queryset = queryset.filter(day__lte=end)
+
+    totals: Dict[str, int] = {"total": 0}
+    for row in queryset.values("status").annotate(total=Sum("count")).order_by():
+        totals[row["status"]] = row["total"]
+        totals["total"] += row["total"]
+
+    groups: List[Dict[str, object]] = []
+    if group_by:
+        columns = [GROUP_FIELDS[name] for name in group_by]
+        for row in queryset.values(*columns).annotate(total=Sum("count")).order_by(*columns):
+            group = {name: row[GROUP_FIELDS[name]] for name in group_by}
+            group["total"] = row["total"]
+            groups.append(group)
+    return totals, groups
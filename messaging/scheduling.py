@@ -0,0 +1,65 @@
+"""
+Agendamento com debounce das tasks de manutenção disparadas por gravações
+(sincronização de contatos, processamento dos eventos recebidos).
+
+Cada chamada grava uma chave no cache por uma janela; só a primeira da janela
+publica a task no broker. Se o broker recusar, a chave é mantida até o fim da
+janela, então as gravações seguintes não voltam a tentar o broker a cada
+requisição. Sem fila configurada (``TASK_QUEUE_ENABLED``), nada é publicado e
+o trabalho fica para a rodada periódica fora do Celery (comandos com ``--loop``).
+
+``run_task`` executa os jobs pedidos pelo usuário (envio em massa, importação
+grande): no worker quando há fila; sem ela, numa thread do próprio processo.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+def task_queue_enabled() -> bool:
+    return bool(getattr(settings, "TASK_QUEUE_ENABLED", False))
+
+
+def schedule_debounced(task, key: str, delay: float) -> bool:
+    """Publica ``task`` com ``countdown=delay`` no máximo uma vez por janela. Retorna se publicou."""
+    if not task_queue_enabled():
+        return False
+    window = max(int(delay) * 10, 10)
+    if not cache.add(key, True, timeout=window):
+        return False
+    try:
+        # Sem novas tentativas de conexão: a rodada periódica cobre a falha
+        task.apply_async(countdown=delay, retry=False)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Não foi possível agendar %s (%s); nova tentativa em até %ss.", task.name, exc, window)
+        return False
+    return True
+
+
+def _run_in_thread(task, args) -> None:
+    try:
+        task(*args)
+    except Exception:  # noqa: BLE001
+        logger.exception("Falha ao executar %s fora do Celery", task.name)
+    finally:
+        # Conexões abertas pela thread não são fechadas pelo ciclo da requisição
+        connections.close_all()
+
+
+def run_task(task, *args) -> None:
+    """
+    Executa ``task(*args)`` em segundo plano: ``delay`` quando há fila; senão numa
+    thread deste processo (se o processo cair, o job fica para a limpeza de jobs
+    parados). Erros do broker sobem para o chamador.
+    """
+    if task_queue_enabled():
+        task.delay(*args)
+        return
+    threading.Thread(target=_run_in_thread, args=(task, args), name=f"task-{task.name}", daemon=True).start()
@@ -0,0 +1,215 @@
+"""
+Motor de envio concorrente de mensagens de WhatsApp.
+
+Recebe um lote de mensagens já renderizadas e as despacha com asyncio,
+limitando as requisições simultâneas por provedor com um semáforo
+(``<PROVEDOR>_SEND_CONCURRENCY``) e a vazão pelo limitador adaptativo
+compartilhado entre os workers (``ratelimit``). Cada requisição roda num pool
+de threads sobre as sessões HTTP com keep-alive de ``http_client``, então a
+vazão passa a ser ~concorrência/latência em vez de 1/latência.
+
+Nada aqui acessa o ORM: quem chama monta as mensagens antes e grava os
+resultados depois (o Django não permite consultas dentro do event loop).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import requests
+from django.conf import settings
+
+from .http_client import provider_concurrency
+from .providers import batch_size, current_provider, post_whatsapp_batch, post_whatsapp_message, supports_batch
+from .ratelimit import AdaptiveRateLimiter, get_rate_limiter, is_throttle_status, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# Recusas em que o provedor não processou a mensagem: seguro reenviar
+RETRYABLE_STATUS_CODES = frozenset({429, 503})
+
+# WHATSAPP_DISPATCH_MODE: "batch" usa a API de lote do provedor quando houver
+DISPATCH_BATCH = "batch"
+DISPATCH_SINGLE = "single"
+
+
+@dataclass
+class OutboundMessage:
+    key: Hashable
+    phone: str
+    body: str
+
+
+@dataclass
+class SendResult:
+    key: Hashable
+    success: bool
+    response: Dict[str, Any] = field(default_factory=dict)
+    error: str = ""
+    elapsed: float = 0.0
+    attempts: int = 1
+
+
+def _throttle_info(exc: requests.exceptions.HTTPError) -> Tuple[Optional[int], Optional[float]]:
+    response = exc.response
+    if response is None:
+        return None, None
+    return response.status_code, parse_retry_after(response.headers.get("Retry-After"))
+
+
+def deliver_message(
+    message: OutboundMessage,
+    provider: Optional[str] = None,
+    limiter: Optional[AdaptiveRateLimiter] = None,
+) -> SendResult:
+    """
+    Envia uma mensagem respeitando o limitador do provedor. Respostas 429/5xx
+    reduzem a taxa compartilhada; 429/503 (requisição recusada, mensagem não
+    entregue) são reenviadas até ``SEND_THROTTLE_RETRIES`` vezes, depois do
+    ``Retry-After``.
+    """
+    provider = provider or current_provider()
+    own_limiter = limiter is None
+    limiter = limiter or get_rate_limiter(provider)
+    retries = int(getattr(settings, "SEND_THROTTLE_RETRIES", 3))
+    started = time.perf_counter()
+    attempts = 0
+    while True:
+        attempts += 1
+        limiter.acquire()
+        try:
+            response = post_whatsapp_message(message.phone, message.body, provider)
+        except requests.exceptions.HTTPError as exc:
+            status_code, retry_after = _throttle_info(exc)
+            if is_throttle_status(provider, status_code):
+                limiter.record_throttle(status_code, retry_after)
+                if status_code in RETRYABLE_STATUS_CODES and attempts <= retries:
+                    continue
+            error = str(exc)
+        except Exception as exc:  # noqa: BLE001
+            error = str(exc)
+        else:
+            limiter.record_success()
+            if own_limiter:
+                limiter.flush()
+            return SendResult(message.key, True, response, "", time.perf_counter() - started, attempts)
+
+        logger.error("Falha ao enviar mensagem para %s via %s: %s", message.phone, provider, error)
+        return SendResult(message.key, False, {"error": error}, error, time.perf_counter() - started, attempts)
+
+
+def deliver_chunk(
+    messages: List[OutboundMessage],
+    provider: str,
+    limiter: AdaptiveRateLimiter,
+) -> Optional[List[SendResult]]:
+    """
+    Envia várias mensagens numa única requisição à API de lote do provedor.
+    Cada requisição consome uma cota do limitador (o limite da API é por
+    requisição). Retorna ``None`` quando o provedor recusa o lote inteiro
+    (4xx, nenhuma mensagem aceita), para que o chamador envie individualmente.
+    """
+    retries = int(getattr(settings, "SEND_THROTTLE_RETRIES", 3))
+    started = time.perf_counter()
+    attempts = 0
+    while True:
+        attempts += 1
+        limiter.acquire()
+        try:
+            outcomes = post_whatsapp_batch(provider, [(message.phone, message.body) for message in messages])
+        except requests.exceptions.HTTPError as exc:
+            status_code, retry_after = _throttle_info(exc)
+            if is_throttle_status(provider, status_code):
+                limiter.record_throttle(status_code, retry_after)
+                if status_code in RETRYABLE_STATUS_CODES and attempts <= retries:
+                    continue
+            elif status_code and 400 <= status_code < 500:
+                logger.warning(
+                    "Lote de %s mensagens recusado por %s (HTTP %s); enviando individualmente",
+                    len(messages),
+                    provider,
+                    status_code,
+                )
+                return None
+            error = str(exc)
+        except Exception as exc:  # noqa: BLE001
+            error = str(exc)
+        else:
+            limiter.record_success()
+            elapsed = time.perf_counter() - started
+            return [
+                SendResult(message.key, success, response, error, elapsed, attempts)
+                for message, (success, response, error) in zip(messages, outcomes)
+            ]
+
+        logger.error("Falha ao enviar lote de %s mensagens via %s: %s", len(messages), provider, error)
+        elapsed = time.perf_counter() - started
+        return [SendResult(message.key, False, {"error": error}, error, elapsed, attempts) for message in messages]
+
+
+def batch_dispatch_enabled(provider: str, mode: Optional[str] = None) -> bool:
+    mode = mode or getattr(settings, "WHATSAPP_DISPATCH_MODE", DISPATCH_BATCH)
+    return mode == DISPATCH_BATCH and supports_batch(provider)
+
+
+async def send_batch_async(
+    messages: Iterable[OutboundMessage],
+    provider: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    limiter: Optional[AdaptiveRateLimiter] = None,
+    mode: Optional[str] = None,
+) -> List[SendResult]:
+    """
+    Envia o lote concorrentemente. Os resultados seguem a ordem de ``messages``.
+
+    No modo ``batch`` (padrão, ``WHATSAPP_DISPATCH_MODE``) provedores com API
+    de lote recebem as mensagens em requisições de ``batch_size`` mensagens; os
+    demais, ou lotes recusados, caem nos envios unitários concorrentes.
+    """
+    provider = provider or current_provider()
+    concurrency = max(1, concurrency or provider_concurrency(provider))
+    limiter = limiter or get_rate_limiter(provider)
+    messages = list(messages)
+    if not messages:
+        return []
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"send-{provider}") as executor:
+
+        async def send_one(message: OutboundMessage) -> SendResult:
+            async with semaphore:
+                return await loop.run_in_executor(executor, deliver_message, message, provider, limiter)
+
+        async def send_chunk(chunk: List[OutboundMessage]) -> List[SendResult]:
+            async with semaphore:
+                results = await loop.run_in_executor(executor, deliver_chunk, chunk, provider, limiter)
+            if results is None:
+                results = list(await asyncio.gather(*(send_one(message) for message in chunk)))
+            return results
+
+        try:
+            if batch_dispatch_enabled(provider, mode):
+                size = batch_size(provider)
+                chunks = [messages[offset:offset + size] for offset in range(0, len(messages), size)]
+                nested = await asyncio.gather(*(send_chunk(chunk) for chunk in chunks))
+                return [result for results in nested for result in results]
+            return list(await asyncio.gather(*(send_one(message) for message in messages)))
+        finally:
+            await loop.run_in_executor(executor, limiter.flush)
+
+
+def send_batch(
+    messages: Iterable[OutboundMessage],
+    provider: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    limiter: Optional[AdaptiveRateLimiter] = None,
+    mode: Optional[str] = None,
+) -> List[SendResult]:
+    """Versão síncrona de ``send_batch_async`` para as tasks do Celery e os comandos."""
+    return asyncio.run(send_batch_async(messages, provider, concurrency, limiter, mode))
@@ -2,7 +2,7 @@ from rest_framework import serializers
 
 from clients.models import Client
 from clients.serializers import ClientSerializer
-from .models import ClientInteraction, MessageLog, MessageTemplate
+from .models import BulkSendJob, ClientInteraction, MessageLog, MessageTemplate
 
 
 class MessageTemplateSerializer(serializers.ModelSerializer):
@@ -52,6 +52,47 @@ class MessageLogSerializer(serializers.ModelSerializer):
         ]
 
 
+class CompactFieldsMixin:
+    """Remove os campos de ``heavy_fields`` que não foram pedidos em ``?include=``."""
+
+    heavy_fields: tuple = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        include = self.context.get("include", set())
+        for name in self.heavy_fields:
+            if name not in include:
+                self.fields.pop(name, None)
+
+
+class MessageLogCompactSerializer(CompactFieldsMixin, serializers.ModelSerializer):
+    heavy_fields = ("client", "payload", "response")
+
+    client = ClientSerializer(read_only=True)
+    client_name = serializers.CharField(read_only=True)
+    template_code = serializers.CharField(read_only=True, allow_null=True)
+
+    class Meta:
+        model = MessageLog
+        fields = [
+            "id",
+            "client_id",
+            "client_name",
+            "client",
+            "template_id",
+            "template_code",
+            "message_type",
+            "channel",
+            "status",
+            "sent_at",
+            "error_message",
+            "created_by_id",
+            "payload",
+            "response",
+        ]
+        read_only_fields = fields
+
+
 class ClientInteractionSerializer(serializers.ModelSerializer):
     client = ClientSerializer(read_only=True)
     client_id = serializers.PrimaryKeyRelatedField(queryset=Client.objects.all(), source="client", write_only=True)
@@ -71,3 +112,46 @@ class ClientInteractionSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "client", "received_at"]
 
+
+class ClientInteractionCompactSerializer(CompactFieldsMixin, serializers.ModelSerializer):
+    heavy_fields = ("client",)
+
+    client = ClientSerializer(read_only=True)
+    client_name = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = ClientInteraction
+        fields = [
+            "id",
+            "client_id",
+            "client_name",
+            "client",
+            "message_log_id",
+            "received_at",
+            "channel",
+            "raw_message",
+            "normalized_option",
+            "notes",
+        ]
+        read_only_fields = fields
+
+
+class BulkSendJobSerializer(serializers.ModelSerializer):
+    remaining = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = BulkSendJob
+        fields = [
+            "id",
+            "status",
+            "total",
+            "sent",
+            "failed",
+            "remaining",
+            "errors",
+            "error_message",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
@@ -1,184 +1,260 @@
 from __future__ import annotations
 
 import logging
-from calendar import monthrange
-from datetime import date
-from typing import Any, Dict, Optional
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-import requests
 from django.conf import settings
-from django.core.mail import send_mail
 from django.db import transaction
 from django.utils import timezone
 
 from clients.models import Client
+from .http_client import get_session
+from .email_delivery import build_email_message, email_subject, send_email_batch
+from .log_writer import MessageLogWriter
 from .models import MessageLog, MessageTemplate
+from .send_engine import OutboundMessage, deliver_message, send_batch
+from .templating import client_context, get_active_template, get_compiled
 
 logger = logging.getLogger(__name__)
 
 
-def _compute_due_date(client: Client, reference_date: Optional[date] = None) -> date:
-    today = reference_date or timezone.localdate()
-    if getattr(client, "due_date", None):
-        return client.due_date
-
-    days_in_month = monthrange(today.year, today.month)[1]
-    day = min(client.due_day, days_in_month)
-    return date(today.year, today.month, day)
-
-
 def _render_message(template: MessageTemplate, client: Client, extra_context: Optional[Dict[str, Any]] = None) -> str:
-    due_date = _compute_due_date(client)
-    context = {
-        "nome": client.name,
-        "valor": f"{client.monthly_fee:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."),
-        "vencimento": due_date.strftime("%d/%m/%Y"),
-        "link_pagamento": client.payment_link or "",
-    }
-    if extra_context:
-        context.update(extra_context)
-
-    normalized_body = template.body.replace("{{", "{").replace("}}", "}")
+    context = client_context(client, client.upcoming_due_date(), extra_context)
     try:
-        rendered = normalized_body.format(**context)
-    except KeyError as exc:
-        missing_key = exc.args[0]
-        logger.exception("Chave de template ausente: %s", missing_key)
-        raise ValueError(f"Chave de template ausente: {missing_key}") from exc
-    return rendered
+        return get_compiled(template).render(context)
+    except ValueError:
+        logger.exception("Falha ao renderizar template %s", template.code)
+        raise
 
 
 def _send_whatsapp_message(client: Client, message: str) -> Dict[str, Any]:
-    provider = getattr(settings, "WHATSAPP_PROVIDER", "meta")
-
-    if provider == "whapi":
-        base_url = getattr(settings, "WHAPI_BASE_URL", "")
-        token = getattr(settings, "WHAPI_TOKEN", "")
-        channel_type = getattr(settings, "WHAPI_CHANNEL_TYPE", "web")
-
-        if not token:
-            raise ValueError("Token da WHAPI não configurado. Defina WHAPI_TOKEN.")
-
-        url = f"{base_url.rstrip('/')}/messages/text"
-        payload = {
-            "to": client.formatted_phone,
-            "body": message,
-            "typing_time": 0,
-            "channel_type": channel_type,
-        }
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "accept": "application/json",
-            "Content-Type": "application/json",
-        }
+    result = deliver_message(OutboundMessage(key=client.pk, phone=client.formatted_phone, body=message))
+    if not result.success:
+        raise ValueError(result.error)
+    return result.response
 
-    elif provider == "infobip":
-        base_url = getattr(settings, "INFOBIP_BASE_URL", "")
-        api_key = getattr(settings, "INFOBIP_API_KEY", "")
-        sender = getattr(settings, "INFOBIP_SENDER", "")
 
-        if not all([base_url, api_key, sender]):
-            raise ValueError("Configurações Infobip ausentes. Defina INFOBIP_BASE_URL, INFOBIP_API_KEY e INFOBIP_SENDER.")
+EMAIL_SENT_RESPONSE = {"status": "email_sent"}
 
-        url = f"https://{base_url.rstrip('/')}/whatsapp/1/message/text"
-        to_number = client.formatted_phone
-        if not to_number.startswith("+"):
-            to_number = f"+{to_number}"
-
-        payload = {
-            "from": sender,
-            "to": to_number,
-            "content": {"text": message},
-        }
-        headers = {
-            "Authorization": f"App {api_key}",
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
 
-    else:
-        api_url = getattr(settings, "WHATSAPP_API_URL", "")
-        token = getattr(settings, "WHATSAPP_ACCESS_TOKEN", "")
-        phone_id = getattr(settings, "WHATSAPP_PHONE_NUMBER_ID", "")
+def _send_email_message(client: Client, subject: str, message: str) -> Dict[str, Any]:
+    build_email_message(client, message, subject).send()
+    return dict(EMAIL_SENT_RESPONSE)
 
-        if not all([api_url, token, phone_id]):
-            raise ValueError("Configurações da API do WhatsApp (Meta) ausentes. Verifique as variáveis de ambiente.")
 
-        url = f"{api_url.rstrip('/')}/{phone_id}/messages"
-        payload = {
-            "messaging_product": "whatsapp",
-            "to": client.formatted_phone,
-            "type": "text",
-            "text": {"preview_url": False, "body": message},
-        }
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-        }
+def _build_payload(template: MessageTemplate, message_body: str, extra_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "template": template.code,
+        "message": message_body,
+        "context": extra_context or {},
+    }
 
-    response = requests.post(url, json=payload, headers=headers, timeout=30)
-    response.raise_for_status()
-    return response.json()
 
+def _deliver(template: MessageTemplate, client: Client, message_body: str) -> Tuple[str, Dict[str, Any], str]:
+    """Faz a chamada ao provedor e devolve (status, resposta, erro)."""
+    try:
+        if template.channel == MessageTemplate.Channel.WHATSAPP:
+            response_data = _send_whatsapp_message(client, message_body)
+        else:
+            response_data = _send_email_message(client, email_subject(client), message_body)
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Falha ao enviar mensagem para %s", client)
+        error_message = str(exc)
+        return MessageLog.Status.FAILED, {"error": error_message}, error_message
+    return MessageLog.Status.SUCCESS, response_data, ""
 
-def _send_email_message(client: Client, subject: str, message: str) -> Dict[str, Any]:
-    if not client.email:
-        raise ValueError("Cliente não possui e-mail cadastrado.")
 
-    from_email = getattr(settings, "DEFAULT_FROM_EMAIL", "no-reply@cobranca.local")
-    send_mail(subject=subject, message=message, from_email=from_email, recipient_list=[client.email])
-    return {"status": "email_sent"}
+def _resolve_template(template: Optional[MessageTemplate], template_code: Optional[str]) -> MessageTemplate:
+    """Usa o template já resolvido pelo chamador ou busca pelo código no registro."""
+    if template is None:
+        if not template_code:
+            raise ValueError("Informe o template ou o código do template.")
+        return get_active_template(template_code)
+    if not template.is_active:
+        raise ValueError(f"Template não encontrado ou inativo: {template.code}")
+    return template
 
 
-@transaction.atomic
 def send_message_to_client(
     *,
     client: Client,
-    template_code: str,
+    template_code: Optional[str] = None,
+    template: Optional[MessageTemplate] = None,
     message_type: str,
     extra_context: Optional[Dict[str, Any]] = None,
     initiated_by=None,
 ) -> MessageLog:
-    template = MessageTemplate.objects.filter(code=template_code, is_active=True).first()
-    if not template:
-        raise ValueError(f"Template não encontrado ou inativo: {template_code}")
+    """
+    Envia a mensagem em três fases para não manter transação aberta durante a
+    chamada ao provedor: registra o log como pendente, faz o envio fora de
+    qualquer transação e finaliza o status numa segunda transação curta. Se o
+    processo cair entre as fases, o log pendente é finalizado como falha por
+    ``fail_stale_pending_logs``.
+    """
+    template = _resolve_template(template, template_code)
 
     message_body = _render_message(template, client, extra_context)
 
-    payload = {
-        "template": template.code,
-        "message": message_body,
-        "context": extra_context or {},
-    }
+    with transaction.atomic():
+        message_log = MessageLog.objects.create(
+            client=client,
+            template=template,
+            message_type=message_type,
+            channel=template.channel,
+            status=MessageLog.Status.PENDING,
+            payload=_build_payload(template, message_body, extra_context),
+            created_by=initiated_by,
+        )
+
+    status, response_data, error_message = _deliver(template, client, message_body)
+
+    message_log.status = status
+    message_log.response = response_data
+    message_log.error_message = error_message
+    with transaction.atomic():
+        message_log.save(update_fields=["status", "response", "error_message"])
+    return message_log
 
-    response_data: Dict[str, Any] = {}
-    status = MessageLog.Status.SUCCESS
-    error_message = ""
 
-    try:
+STALE_PENDING_ERROR = "Envio interrompido antes da confirmação do provedor (log pendente expirado)."
+
+
+def pending_cutoff() -> datetime:
+    """Logs pendentes criados antes deste instante não pertencem mais a nenhum envio em andamento."""
+    return timezone.now() - timedelta(seconds=int(getattr(settings, "MESSAGE_LOG_PENDING_TIMEOUT", 1800)))
+
+
+def fail_stale_pending_logs(client_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Marca como falha os logs que ficaram pendentes além de
+    ``MESSAGE_LOG_PENDING_TIMEOUT``: o processo caiu entre o registro e a
+    finalização do envio, então o resultado não é conhecido. A finalização
+    passa pelo ``MessageLogWriter``, que ajusta os agregados diários.
+    Retorna quantos logs foram finalizados.
+    """
+    queryset = MessageLog.objects.filter(status=MessageLog.Status.PENDING, sent_at__lt=pending_cutoff())
+    if client_ids is not None:
+        queryset = queryset.filter(client_id__in=list(client_ids))
+
+    failed = 0
+    with MessageLogWriter() as writer:
+        for message_log in queryset.select_related("template").iterator():
+            message_log.status = MessageLog.Status.FAILED
+            message_log.response = {"error": STALE_PENDING_ERROR}
+            message_log.error_message = STALE_PENDING_ERROR
+            writer.update(message_log)
+            failed += 1
+    if failed:
+        logger.warning("%s log(s) de envio pendentes expirados marcados como falha.", failed)
+    return failed
+
+
+def send_messages_to_clients(
+    *,
+    clients: Iterable[Client],
+    template_code: Optional[str] = None,
+    template: Optional[MessageTemplate] = None,
+    message_type: str,
+    extra_context: Optional[Dict[str, Any]] = None,
+    initiated_by=None,
+    dispatch_mode: Optional[str] = None,
+    email_connection=None,
+) -> List[MessageLog]:
+    """
+    Versão em lote de ``send_message_to_client``: os logs pendentes do lote são
+    criados com um único ``bulk_create``, as mensagens de WhatsApp são enviadas
+    pelo ``send_engine`` e as finalizações são gravadas em lotes pelo
+    ``MessageLogWriter``.
+
+    ``dispatch_mode`` (padrão ``WHATSAPP_DISPATCH_MODE``): ``"batch"`` usa a API
+    de lote do provedor quando existir (várias mensagens por requisição, com o
+    resultado de cada destinatário no seu log); ``"single"`` força envios
+    unitários concorrentes.
+
+    No canal de e-mail o lote inteiro usa uma única conexão SMTP
+    (``email_connection`` permite reaproveitar uma já aberta pelo chamador).
+    """
+    template = _resolve_template(template, template_code)
+
+    pending: List[Tuple[Client, str, MessageLog]] = []
+    message_logs: List[MessageLog] = []
+    for client in clients:
+        try:
+            message_body = _render_message(template, client, extra_context)
+        except ValueError as exc:
+            message_body = ""
+            message_log = MessageLog(
+                client=client,
+                template=template,
+                message_type=message_type,
+                channel=template.channel,
+                status=MessageLog.Status.FAILED,
+                payload=_build_payload(template, message_body, extra_context),
+                response={"error": str(exc)},
+                error_message=str(exc),
+                created_by=initiated_by,
+            )
+        else:
+            message_log = MessageLog(
+                client=client,
+                template=template,
+                message_type=message_type,
+                channel=template.channel,
+                status=MessageLog.Status.PENDING,
+                payload=_build_payload(template, message_body, extra_context),
+                created_by=initiated_by,
+            )
+            pending.append((client, message_body, message_log))
+        message_logs.append(message_log)
+
+    with MessageLogWriter() as writer:
+        for message_log in message_logs:
+            writer.add(message_log)
+
+    with MessageLogWriter() as writer:
         if template.channel == MessageTemplate.Channel.WHATSAPP:
-            response_data = _send_whatsapp_message(client, message_body)
+            # Envio concorrente pelo motor; os logs são finalizados depois, fora do event loop
+            results = send_batch(
+                (
+                    OutboundMessage(key=index, phone=client.formatted_phone, body=message_body)
+                    for index, (client, message_body, _) in enumerate(pending)
+                ),
+                mode=dispatch_mode,
+            )
+            for result in results:
+                message_log = pending[result.key][2]
+                message_log.status = MessageLog.Status.SUCCESS if result.success else MessageLog.Status.FAILED
+                message_log.response = result.response
+                message_log.error_message = result.error
+                writer.update(message_log)
         else:
-            subject = f"Atualização de cobrança - {client.name}"
-            response_data = _send_email_message(client, subject, message_body)
-    except Exception as exc:  # noqa: BLE001
-        logger.exception("Falha ao enviar mensagem para %s", client)
-        status = MessageLog.Status.FAILED
-        error_message = str(exc)
-        response_data = {"error": error_message}
-
-    message_log = MessageLog.objects.create(
-        client=client,
-        template=template,
-        message_type=message_type,
-        channel=template.channel,
-        status=status,
-        payload=payload,
-        response=response_data,
-        error_message=error_message,
-        created_by=initiated_by,
-    )
-    return message_log
+            _deliver_emails(pending, writer, email_connection)
+    return message_logs
+
+
+def _deliver_emails(
+    pending: List[Tuple[Client, str, MessageLog]],
+    writer: MessageLogWriter,
+    connection=None,
+) -> None:
+    """Envia os e-mails do lote por uma única conexão e finaliza cada log com o seu resultado."""
+    outbound = []
+    for index, (client, message_body, message_log) in enumerate(pending):
+        try:
+            outbound.append((index, build_email_message(client, message_body)))
+        except ValueError as exc:
+            message_log.status = MessageLog.Status.FAILED
+            message_log.response = {"error": str(exc)}
+            message_log.error_message = str(exc)
+            writer.update(message_log)
+
+    for index, success, error in send_email_batch(outbound, connection=connection):
+        message_log = pending[index][2]
+        message_log.status = MessageLog.Status.SUCCESS if success else MessageLog.Status.FAILED
+        message_log.response = dict(EMAIL_SENT_RESPONSE) if success else {"error": error}
+        message_log.error_message = error
+        writer.update(message_log)
 
 
 def check_whatsapp_health() -> Dict[str, Any]:
@@ -201,7 +277,7 @@ def check_whatsapp_health() -> Dict[str, Any]:
             "accept": "application/json",
         }
 
-        response = requests.get(url, params=params, headers=headers, timeout=30)
+        response = get_session(provider).get(url, params=params, headers=headers, timeout=30)
         response.raise_for_status()
         return {
             "provider": "whapi",
@@ -225,7 +301,7 @@ def check_whatsapp_health() -> Dict[str, Any]:
         "accept": "application/json",
     }
 
-    response = requests.get(url, headers=headers, timeout=30)
+    response = get_session(provider).get(url, headers=headers, timeout=30)
     response.raise_for_status()
     return {
         "provider": "meta",
@@ -0,0 +1,37 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from . import rollups
+from .models import MessageLog, MessageTemplate
+from .templating import template_registry
+
+# Enviado pelo MessageLogWriter após cada bulk_create/bulk_update (que não disparam post_save).
+# Argumentos: ``logs`` (lista de MessageLog) e ``created`` (True para inserções).
+message_logs_written = Signal()
+
+
+@receiver(post_save, sender=MessageTemplate)
+@receiver(post_delete, sender=MessageTemplate)
+def invalidate_template_registry(sender, instance, **kwargs):
+    template_registry.invalidate(instance.pk, instance.code)
+
+
+@receiver(post_save, sender=MessageLog)
+def update_rollup_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        rollups.record_created([instance])
+    elif update_fields is None or "status" in update_fields:
+        rollups.record_updated([instance])
+
+
+@receiver(post_delete, sender=MessageLog)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    rollups.record_deleted(instance)
+
+
+@receiver(message_logs_written, sender=MessageLog)
+def update_rollup_on_bulk_write(sender, logs, created, **kwargs):
+    if created:
+        rollups.record_created(logs)
+    else:
+        rollups.record_updated(logs)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict
+
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+
+from .bulk_send import fail_stale_bulk_send_jobs, run_bulk_send_job
+from .inbound import drain_inbound_events
+from .scheduling import schedule_debounced
+from .services import fail_stale_pending_logs
+
+logger = logging.getLogger(__name__)
+
+INBOUND_DRAIN_SCHEDULED_KEY = "messaging:inbound-drain-scheduled"
+
+
+@shared_task
+def execute_bulk_send_job(job_id: int) -> Dict[str, Any]:
+    return run_bulk_send_job(job_id)
+
+
+@shared_task
+def fail_stale_pending_message_logs() -> int:
+    return fail_stale_pending_logs()
+
+
+@shared_task
+def fail_stale_bulk_send_jobs_task() -> int:
+    return fail_stale_bulk_send_jobs()
+
+
+@shared_task
+def process_inbound_events() -> Dict[str, int]:
+    # Liberar o agendamento antes de drenar: eventos que chegarem agora agendam a próxima rodada
+    cache.delete(INBOUND_DRAIN_SCHEDULED_KEY)
+    return drain_inbound_events()
+
+
+def schedule_inbound_processing() -> None:
+    """
+    Agenda o processamento do buffer de eventos, no máximo uma vez por janela de
+    ``INBOUND_EVENT_DRAIN_DELAY`` segundos (rajadas viram um único lote). Se o
+    broker estiver fora, os eventos ficam pendentes para a rodada periódica.
+    """
+    schedule_debounced(
+        process_inbound_events,
+        INBOUND_DRAIN_SCHEDULED_KEY,
+        float(getattr(settings, "INBOUND_EVENT_DRAIN_DELAY", 1)),
+    )
@@ -0,0 +1,173 @@
+"""
+Motor de templates de mensagem compartilhado pelos envios agendados e em massa.
+
+Os templates ativos são resolvidos por código no ``template_registry`` (um
+cache por processo invalidado pelos signals de ``MessageTemplate``). O corpo do template é compilado uma única vez numa lista de trechos fixos e
+variáveis (``{{nome}}``, ``{{ nome }}`` ou ``{nome}``); cada renderização só
+junta os trechos com o contexto do cliente. Templates salvos ficam em cache por
+(id, ``updated_at``), então uma edição no template gera uma nova compilação.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from django.conf import settings
+
+from clients.models import Client
+from .models import MessageTemplate
+
+PLACEHOLDER_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}|\{(\w+)\}")
+
+COMPILED_CACHE_SIZE = 256
+
+
+class CompiledTemplate:
+    __slots__ = ("source", "_parts", "fields")
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        parts: List[Tuple[bool, str, str]] = []
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(source):
+            if match.start() > position:
+                parts.append((False, source[position:match.start()], ""))
+            parts.append((True, match.group(1) or match.group(2), match.group(0)))
+            position = match.end()
+        if position < len(source):
+            parts.append((False, source[position:], ""))
+        self._parts = tuple(parts)
+        self.fields = frozenset(text for is_field, text, _ in parts if is_field)
+
+    def render(self, context: Mapping[str, Any], strict: bool = True) -> str:
+        """
+        Renderiza com o contexto. Em modo ``strict`` uma variável ausente gera
+        ``ValueError``; caso contrário o marcador original é mantido no texto.
+        """
+        chunks: List[str] = []
+        for is_field, text, raw in self._parts:
+            if not is_field:
+                chunks.append(text)
+                continue
+            try:
+                chunks.append(str(context[text]))
+            except KeyError:
+                if strict:
+                    raise ValueError(f"Chave de template ausente: {text}") from None
+                chunks.append(raw)
+        return "".join(chunks)
+
+
+_compiled_templates: "OrderedDict[Tuple[int, Any], CompiledTemplate]" = OrderedDict()
+_lock = threading.Lock()
+
+
+@lru_cache(maxsize=COMPILED_CACHE_SIZE)
+def compile_body(body: str) -> CompiledTemplate:
+    """Compila um corpo avulso (ex.: mensagem digitada no envio em massa)."""
+    return CompiledTemplate(body)
+
+
+def get_compiled(template: MessageTemplate) -> CompiledTemplate:
+    if template.pk is None:
+        return compile_body(template.body)
+
+    key = (template.pk, template.updated_at)
+    with _lock:
+        compiled = _compiled_templates.get(key)
+        if compiled is not None and compiled.source == template.body:
+            _compiled_templates.move_to_end(key)
+            return compiled
+
+    compiled = CompiledTemplate(template.body)
+    with _lock:
+        _compiled_templates[key] = compiled
+        while len(_compiled_templates) > COMPILED_CACHE_SIZE:
+            _compiled_templates.popitem(last=False)
+    return compiled
+
+
+class TemplateRegistry:
+    """Cache por código dos templates ativos (``None`` = inexistente ou inativo)."""
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, Optional[MessageTemplate]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, code: str) -> Optional[MessageTemplate]:
+        with self._lock:
+            entry = self._entries.get(code)
+            if entry is not None and entry[0] >= time.monotonic():
+                return entry[1]
+
+        template = MessageTemplate.objects.filter(code=code, is_active=True).first()
+        with self._lock:
+            self._entries[code] = (time.monotonic() + self.ttl, template)
+        return template
+
+    def invalidate(self, template_id: Optional[int] = None, code: str = "") -> None:
+        with self._lock:
+            if code:
+                self._entries.pop(code, None)
+            if template_id is not None:
+                # O código pode ter sido alterado: descartar também a entrada antiga
+                for cached_code, (_, cached) in list(self._entries.items()):
+                    if cached is not None and cached.pk == template_id:
+                        del self._entries[cached_code]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+template_registry = TemplateRegistry(ttl=float(getattr(settings, "MESSAGE_TEMPLATE_CACHE_TTL", 300)))
+
+
+def get_active_template(code: str) -> MessageTemplate:
+    template = template_registry.get(code)
+    if not template:
+        raise ValueError(f"Template não encontrado ou inativo: {code}")
+    return template
+
+
+def format_currency(value: Any) -> str:
+    try:
+        return f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    except (TypeError, ValueError):
+        return "0,00"
+
+
+def client_context(client: Client, due_date: date, extra_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    client_name = client.name or ""
+    context: Dict[str, Any] = {
+        "nome": client_name,
+        "nome_cliente": client_name,
+        "cliente": client_name,
+        "valor": format_currency(client.monthly_fee),
+        "vencimento": due_date.strftime("%d/%m/%Y"),
+        "link_pagamento": client.payment_link or "",
+    }
+    if extra_context:
+        context.update(extra_context)
+    return context
+
+
+def render_many(
+    template: MessageTemplate | CompiledTemplate,
+    clients: Iterable[Client],
+    due_date_for: Callable[[Client], date],
+    extra_context: Optional[Dict[str, Any]] = None,
+    strict: bool = True,
+) -> List[Tuple[Client, str]]:
+    """Renderiza o mesmo template para vários clientes com uma única compilação."""
+    compiled = template if isinstance(template, CompiledTemplate) else get_compiled(template)
+    return [
+        (client, compiled.render(client_context(client, due_date_for(client), extra_context), strict=strict))
+        for client in clients
+    ]
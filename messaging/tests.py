@@ -1,3 +1,348 @@
-from django.test import TestCase
+import smtplib
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.base import BaseEmailBackend
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from clients.models import Client
+
+from .bulk_send import STALE_JOB_ERROR, fail_stale_bulk_send_jobs, run_bulk_send_job
+from .checks import check_shared_cache
+from .models import BulkSendJob, MessageLog, MessageLogDailyRollup, MessageTemplate
+from .query_plans import PLAN_CHECK_ROWS, analyze, hot_queries, plan_problem, seed_plan_data, supports_plan_check
+from .scheduling import schedule_debounced
+from .send_engine import SendResult
+from .services import send_messages_to_clients
+from .tasks import execute_bulk_send_job
+
+
+class QueryPlanTests(TestCase):
+    """Regressão dos índices: as consultas frequentes não podem voltar a varrer as tabelas."""
+
+    rows = PLAN_CHECK_ROWS
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_plan_data(cls.rows)
+        analyze()
+
+    def test_hot_queries_use_indexes(self):
+        if not supports_plan_check():
+            self.skipTest("Verificação de planos disponível apenas para SQLite e PostgreSQL.")
+        for label, build in hot_queries():
+            with self.subTest(label):
+                plan, problem = plan_problem(build())
+                self.assertEqual(problem, "", f"{label}: {problem}\n{plan}")
+
+
+class FakeSMTPBackend(BaseEmailBackend):
+    """Backend que falha uma vez para os destinatários em ``failures`` e conta aberturas da conexão."""
+
+    def __init__(self, failures=None, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = dict(failures or {})
+        self.sent = []
+        self.opened = 0
+        self.closed = 0
+
+    def open(self):
+        self.opened += 1
+
+    def close(self):
+        self.closed += 1
+
+    def send_messages(self, email_messages):
+        count = 0
+        for message in email_messages:
+            error = self.failures.pop(message.to[0], None)
+            if error:
+                raise error
+            self.sent.append(message.to[0])
+            count += 1
+        return count
+
+
+class EmailDeliveryTests(TestCase):
+    """Cada ``MessageLog`` do lote de e-mail recebe o resultado da sua própria mensagem."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.template = MessageTemplate.objects.create(
+            code="teste_email",
+            name="Teste e-mail",
+            channel=MessageTemplate.Channel.EMAIL,
+            body="Olá {{nome}}",
+        )
+        cls.clients = [
+            Client.objects.create(
+                name=f"Cliente {index}",
+                phone=f"551199999000{index}",
+                email=f"cliente{index}@example.com",
+                monthly_fee=Decimal("49.99"),
+            )
+            for index in range(4)
+        ]
+
+    def send(self, email_connection=None):
+        send_messages_to_clients(
+            clients=self.clients,
+            template=self.template,
+            message_type=MessageLog.Type.CHARGE,
+            email_connection=email_connection,
+        )
+        return dict(MessageLog.objects.filter(template=self.template).values_list("client__email", "status"))
+
+    def assertStatuses(self, statuses, failed):
+        expected = {
+            client.email: MessageLog.Status.FAILED if client.email in failed else MessageLog.Status.SUCCESS
+            for client in self.clients
+        }
+        self.assertEqual(statuses, expected)
+
+    @override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend", EMAIL_BATCH_SIZE=3)
+    def test_locmem_delivery_marks_every_log_sent(self):
+        statuses = self.send()
+
+        self.assertStatuses(statuses, failed=set())
+        self.assertEqual([message.to[0] for message in mail.outbox], [client.email for client in self.clients])
+
+    def test_refused_recipient_fails_only_its_log(self):
+        refused = self.clients[1].email
+        backend = FakeSMTPBackend(failures={refused: smtplib.SMTPRecipientsRefused({refused: (550, b"recusado")})})
+
+        statuses = self.send(email_connection=backend)
+
+        self.assertStatuses(statuses, failed={refused})
+        self.assertEqual(backend.sent, [client.email for client in self.clients if client.email != refused])
+        self.assertEqual(backend.opened, 0)
+
+    def test_disconnect_reopens_connection_for_remaining_messages(self):
+        dropped = self.clients[2].email
+        backend = FakeSMTPBackend(failures={dropped: smtplib.SMTPServerDisconnected("conexão encerrada")})
+
+        statuses = self.send(email_connection=backend)
+
+        self.assertStatuses(statuses, failed={dropped})
+        self.assertEqual(backend.sent, [client.email for client in self.clients if client.email != dropped])
+        self.assertEqual((backend.closed, backend.opened), (1, 1))
+        log = MessageLog.objects.get(template=self.template, client__email=dropped)
+        self.assertIn("conexão encerrada", log.error_message)
+
+
+CONNECTED_BOT = {"reachable": True, "status": "connected", "isConnected": True, "error": ""}
+
+
+def fake_send_batch(messages, *args, **kwargs):
+    return [SendResult(message.key, True) for message in messages]
+
+
+class BulkSendJobTests(TestCase):
+    """Ciclo de vida do envio em massa: enfileirar, reivindicar, concluir e encerrar jobs parados."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("operador", password="x")
+        cls.other_user = get_user_model().objects.create_user("outro", password="x")
+        cls.clients = [
+            Client.objects.create(name=f"Cliente {index}", phone=f"551199999100{index}", monthly_fee=Decimal("49.99"))
+            for index in range(3)
+        ]
+
+    def create_job(self, **fields):
+        client_ids = [client.pk for client in self.clients]
+        return BulkSendJob.objects.create(
+            message="Olá {{nome}}", client_ids=client_ids, total=len(client_ids), created_by=self.user, **fields
+        )
+
+    @mock.patch("messaging.bulk_send.sync_contacts", return_value=True)
+    @mock.patch("messaging.bulk_send.send_batch", side_effect=fake_send_batch)
+    def test_job_runs_once(self, send_batch, _sync_contacts):
+        job = self.create_job()
+
+        self.assertEqual(run_bulk_send_job(job.pk), {"sent": 3, "failed": 0})
+        self.assertEqual(run_bulk_send_job(job.pk), {"sent": 3, "failed": 0})
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, BulkSendJob.Status.COMPLETED)
+        self.assertIsNotNone(job.heartbeat_at)
+        self.assertEqual(send_batch.call_count, 1)
+        self.assertEqual(MessageLog.objects.filter(payload__job_id=job.pk).count(), 3)
+
+    def test_stale_running_job_is_failed(self):
+        old = timezone.now() - timedelta(hours=1)
+        stale = self.create_job(status=BulkSendJob.Status.RUNNING, started_at=old, heartbeat_at=old)
+        active = self.create_job(status=BulkSendJob.Status.RUNNING, started_at=old, heartbeat_at=timezone.now())
+
+        self.assertEqual(fail_stale_bulk_send_jobs(), 1)
+
+        stale.refresh_from_db()
+        active.refresh_from_db()
+        self.assertEqual((stale.status, stale.error_message), (BulkSendJob.Status.FAILED, STALE_JOB_ERROR))
+        self.assertEqual(active.status, BulkSendJob.Status.RUNNING)
+
+    def post_bulk(self):
+        self.client.force_login(self.user)
+        with mock.patch("messaging.views.get_bot_status", return_value=CONNECTED_BOT):
+            return self.client.post(
+                reverse("bot-send-bulk"),
+                {"client_ids": [client.pk for client in self.clients], "message": "Olá"},
+                content_type="application/json",
+                HTTP_HOST="localhost",
+            )
+
+    @override_settings(TASK_QUEUE_ENABLED=False)
+    def test_without_queue_job_runs_in_thread(self):
+        with mock.patch("messaging.scheduling.threading.Thread") as thread:
+            response = self.post_bulk()
+
+        self.assertEqual(response.status_code, 202)
+        job = BulkSendJob.objects.get(pk=response.json()["job_id"])
+        self.assertEqual(job.status, BulkSendJob.Status.QUEUED)
+        self.assertEqual(thread.call_args.kwargs["args"], (execute_bulk_send_job, (job.pk,)))
+        thread.return_value.start.assert_called_once()
+
+    @override_settings(TASK_QUEUE_ENABLED=True)
+    def test_with_queue_job_goes_to_worker(self):
+        with mock.patch.object(execute_bulk_send_job, "delay") as delay:
+            response = self.post_bulk()
+
+        self.assertEqual(response.status_code, 202)
+        delay.assert_called_once_with(response.json()["job_id"])
+
+    def test_status_is_visible_only_to_owner(self):
+        job = self.create_job()
+        url = reverse("bot-send-bulk-status", kwargs={"pk": job.pk})
+
+        self.client.force_login(self.other_user)
+        self.assertEqual(self.client.get(url, HTTP_HOST="localhost").status_code, 404)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url, HTTP_HOST="localhost").status_code, 200)
+
+
+class SharedCacheCheckTests(TestCase):
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_local_cache_warns(self):
+        self.assertEqual([warning.id for warning in check_shared_cache(None)], ["messaging.W001"])
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://"}})
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+
+class CursorPaginationTests(TestCase):
+    """No modo cursor a ordem é sempre (-sent_at, -id), mesmo com ``?ordering=``."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("leitor", password="x", is_staff=True)
+        client = Client.objects.create(name="Cliente", phone="5511999992000", monthly_fee=Decimal("49.99"))
+        now = timezone.now()
+        statuses = [MessageLog.Status.SUCCESS, MessageLog.Status.FAILED, MessageLog.Status.SUCCESS, MessageLog.Status.FAILED]
+        cls.logs = []
+        for minutes, log_status in enumerate(statuses):
+            log = MessageLog.objects.create(client=client, message_type=MessageLog.Type.CHARGE, status=log_status)
+            MessageLog.objects.filter(pk=log.pk).update(sent_at=now - timedelta(minutes=minutes))
+            cls.logs.append(log)
+
+    def fetch_ids(self, url):
+        ids = []
+        while url:
+            data = self.client.get(url, HTTP_HOST="localhost").json()
+            ids.extend(item["id"] for item in data["results"])
+            url = data["next"]
+        return ids
+
+    def test_ordering_param_does_not_change_cursor_order(self):
+        self.client.force_login(self.user)
+        url = f"{reverse('message-log-list')}?pagination=cursor&page_size=2&ordering=status"
+
+        self.assertEqual(self.fetch_ids(url), [log.pk for log in self.logs])
+
+    def test_page_mode_still_honours_ordering(self):
+        self.client.force_login(self.user)
+        data = self.client.get(f"{reverse('message-log-list')}?ordering=status", HTTP_HOST="localhost").json()
+
+        self.assertEqual([item["status"] for item in data["results"]], sorted(log.status for log in self.logs))
+
+
+class FailingTask:
+    name = "tests.failing_task"
+
+    def __init__(self):
+        self.calls = 0
+
+    def apply_async(self, **kwargs):
+        self.calls += 1
+        raise ConnectionError("broker fora do ar")
+
+
+class ScheduleDebouncedTests(TestCase):
+    key = "tests:debounce"
+
+    def setUp(self):
+        cache.delete(self.key)
+        self.addCleanup(cache.delete, self.key)
+
+    @override_settings(TASK_QUEUE_ENABLED=True)
+    def test_broker_failure_keeps_key_for_the_window(self):
+        task = FailingTask()
+
+        with self.assertLogs("messaging.scheduling", "WARNING"):
+            self.assertFalse(schedule_debounced(task, self.key, 1))
+        self.assertFalse(schedule_debounced(task, self.key, 1))
+
+        self.assertEqual(task.calls, 1)
+        self.assertTrue(cache.get(self.key))
+
+    @override_settings(TASK_QUEUE_ENABLED=False)
+    def test_without_queue_nothing_is_published(self):
+        task = FailingTask()
+
+        self.assertFalse(schedule_debounced(task, self.key, 1))
+        self.assertEqual(task.calls, 0)
+
+
+class RollupTests(TestCase):
+    """Agregados diários mantidos pelos signals de ``MessageLog``."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.client_record = Client.objects.create(name="Cliente", phone="5511999993000", monthly_fee=Decimal("49.99"))
+
+    def counts(self):
+        return dict(MessageLogDailyRollup.objects.filter(count__gt=0).values_list("status", "count"))
+
+    def test_status_change_moves_the_count(self):
+        log = MessageLog.objects.create(
+            client=self.client_record, message_type=MessageLog.Type.CHARGE, status=MessageLog.Status.PENDING
+        )
+        self.assertEqual(self.counts(), {MessageLog.Status.PENDING: 1})
+
+        log.status = MessageLog.Status.SUCCESS
+        log.save()
+        self.assertEqual(self.counts(), {MessageLog.Status.SUCCESS: 1})
+
+    def test_unknown_previous_status_is_logged_not_rebuilt(self):
+        log = MessageLog.objects.create(
+            client=self.client_record, message_type=MessageLog.Type.CHARGE, status=MessageLog.Status.PENDING
+        )
+        detached = MessageLog(
+            pk=log.pk,
+            client=self.client_record,
+            message_type=MessageLog.Type.CHARGE,
+            status=MessageLog.Status.SUCCESS,
+            sent_at=log.sent_at,
+        )
+
+        with self.assertLogs("messaging.rollups", "WARNING") as logs:
+            detached.save()
+
+        self.assertIn("rebuild_message_rollups", logs.output[0])
+        self.assertEqual(self.counts(), {MessageLog.Status.PENDING: 1})
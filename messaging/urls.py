@@ -5,9 +5,12 @@ from .views import (
     BotControlView,
     BotQRCodeView,
     BotSendBulkView,
+    BotStatusWebhookView,
+    BulkSendJobStatusView,
     ClientInteractionViewSet,
     MessageLogViewSet,
     MessageTemplateViewSet,
+    SendRateMetricsView,
     WhatsAppHealthView,
     WhatsAppWebhookView,
     WPPConnectWebhookView,
@@ -21,9 +24,12 @@ router.register(r"client-interactions", ClientInteractionViewSet, basename="clie
 urlpatterns = router.urls + [
     path("webhooks/whatsapp/", WhatsAppWebhookView.as_view(), name="whatsapp-webhook"),
     path("webhooks/whatsapp/wppconnect/", WPPConnectWebhookView.as_view(), name="wppconnect-webhook"),
+    path("webhooks/bot-status/", BotStatusWebhookView.as_view(), name="bot-status-webhook"),
     path("integrations/whatsapp/health/", WhatsAppHealthView.as_view(), name="whatsapp-health"),
+    path("integrations/whatsapp/rate-limits/", SendRateMetricsView.as_view(), name="whatsapp-rate-limits"),
     path("bot/control/", BotControlView.as_view(), name="bot-control"),
     path("bot/qr/", BotQRCodeView.as_view(), name="bot-qr"),
     path("bot/send-bulk/", BotSendBulkView.as_view(), name="bot-send-bulk"),
+    path("bot/send-bulk/<int:pk>/", BulkSendJobStatusView.as_view(), name="bot-send-bulk-status"),
 ]
 
@@ -1,4 +1,11 @@
+import hmac
+import logging
+
 from django.conf import settings
+from django.db.models import Count, F, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.urls import reverse
+from django.utils.dateparse import parse_date
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
@@ -6,24 +13,49 @@ from rest_framework import filters, mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 import requests
-import time
 
+from clients.lookup import resolve_client
 from clients.models import Client
-from .models import ClientInteraction, MessageLog, MessageTemplate
+from . import rollups
+from .bot_status import get_bot_status, invalidate_bot_status, is_bot_connected, publish_bot_status
+from .bulk_send import fail_stale_bulk_send_jobs
+from .http_client import bot_session, bot_url
+from .inbound import RECEIPT_MESSAGE, enqueue_events, meta_messages, plan_event
+from .models import BulkSendJob, ClientInteraction, InboundEvent, MessageLog, MessageTemplate
+from .pagination import ClientInteractionCursorPagination, CursorModeMixin, MessageLogCursorPagination
+from .ratelimit import rate_limit_metrics
+from .scheduling import run_task
 from .serializers import (
+    BulkSendJobSerializer,
+    ClientInteractionCompactSerializer,
     ClientInteractionSerializer,
+    MessageLogCompactSerializer,
     MessageLogSerializer,
     MessageTemplateSerializer,
 )
 from .services import check_whatsapp_health, send_message_to_client
+from .tasks import execute_bulk_send_job, schedule_inbound_processing
+
+logger = logging.getLogger(__name__)
 
 
 def _normalize_phone(phone: str) -> str:
     return "".join(filter(str.isdigit, phone or ""))
 
 
+def _queued_ingestion() -> bool:
+    return getattr(settings, "WEBHOOK_INGESTION_MODE", "sync") == "queued"
+
+
+def _settle_client(client_id: int) -> None:
+    client_obj = Client.objects.get(pk=client_id)
+    client_obj.status = Client.Status.SETTLED
+    client_obj.save(update_fields=["status"])
+
+
 class MessageTemplateViewSet(viewsets.ModelViewSet):
     queryset = MessageTemplate.objects.all()
     serializer_class = MessageTemplateSerializer
@@ -57,7 +89,7 @@ class MessageTemplateViewSet(viewsets.ModelViewSet):
         template = self.get_object()
         message_log = send_message_to_client(
             client=client,
-            template_code=template.code,
+            template=template,
             message_type=message_type,
             extra_context=extra_context,
             initiated_by=request.user if request.user.is_authenticated else None,
@@ -66,9 +98,11 @@ class MessageTemplateViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class MessageLogViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+class MessageLogViewSet(CursorModeMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
     queryset = MessageLog.objects.select_related("client", "template", "created_by")
     serializer_class = MessageLogSerializer
+    compact_serializer_class = MessageLogCompactSerializer
+    cursor_pagination_class = MessageLogCursorPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["client__name", "client__phone", "template__name", "template__code"]
     ordering_fields = [
@@ -78,31 +112,118 @@ class MessageLogViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewse
         "channel",
     ]
 
+    def get_queryset(self):
+        if not self.cursor_mode:
+            return super().get_queryset()
+        include = self.included_fields
+        queryset = MessageLog.objects.annotate(client_name=F("client__name"), template_code=F("template__code"))
+        heavy = [name for name in ("payload", "response") if name not in include]
+        if heavy:
+            queryset = queryset.defer(*heavy)
+        if "client" in include:
+            queryset = queryset.select_related("client")
+        return queryset
+
     @action(detail=False, methods=["get"], url_path="summary")
     def summary(self, request):
-        queryset = self.filter_queryset(self.get_queryset())
-        total_messages = queryset.count()
-        successful_messages = queryset.filter(status=MessageLog.Status.SUCCESS).count()
-        failed_messages = queryset.filter(status=MessageLog.Status.FAILED).count()
-        clients_pending = Client.objects.filter(status=Client.Status.DELINQUENT).count()
+        """
+        Totais de envios. Aceita ``date_from``/``date_to`` (AAAA-MM-DD) e
+        ``group_by`` (lista separada por vírgula de: day, message_type, channel,
+        status, template). Sem busca textual, lê os agregados diários.
+        """
+        date_from, date_to = request.query_params.get("date_from"), request.query_params.get("date_to")
+        start = parse_date(date_from) if date_from else None
+        end = parse_date(date_to) if date_to else None
+        if (date_from and not start) or (date_to and not end):
+            return Response(
+                {"detail": "date_from/date_to inválidos. Use o formato AAAA-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        group_by = [name.strip() for name in request.query_params.get("group_by", "").split(",") if name.strip()]
+        invalid = [name for name in group_by if name not in rollups.GROUP_FIELDS]
+        if invalid:
+            return Response(
+                {"detail": f"group_by inválido: {', '.join(invalid)}. Use: {', '.join(rollups.GROUP_FIELDS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
+        if request.query_params.get(api_settings.SEARCH_PARAM):
+            source = "logs"
+            totals, groups = self._summarize_logs(start, end, group_by)
+        else:
+            source = "rollup"
+            totals, groups = rollups.summarize(start, end, group_by)
+
+        total_messages = totals.get("total", 0)
+        successful_messages = totals.get(MessageLog.Status.SUCCESS, 0)
         data = {
             "total_messages": total_messages,
             "successful_messages": successful_messages,
-            "failed_messages": failed_messages,
+            "failed_messages": totals.get(MessageLog.Status.FAILED, 0),
             "success_rate": (successful_messages / total_messages) if total_messages else 0,
-            "clients_pending": clients_pending,
+            "clients_pending": Client.objects.filter(status=Client.Status.DELINQUENT).count(),
+            "source": source,
         }
+        if group_by:
+            data["groups"] = groups
         return Response(data)
 
+    def _summarize_logs(self, start, end, group_by):
+        queryset = self.filter_queryset(MessageLog.objects.all())
+        if start:
+            queryset = queryset.filter(sent_at__date__gte=start)
+        if end:
+            queryset = queryset.filter(sent_at__date__lte=end)
+
+        totals = {"total": 0}
+        for row in queryset.values("status").annotate(total=Count("id")).order_by():
+            totals[row["status"]] = row["total"]
+            totals["total"] += row["total"]
+
+        groups = []
+        if group_by:
+            columns = {
+                "day": TruncDate("sent_at"),
+                "message_type": F("message_type"),
+                "channel": F("channel"),
+                "status": F("status"),
+                "template": Coalesce("template__code", Value("")),
+            }
+            aliases = {name: columns[name] for name in group_by}
+            keys = [f"group_{name}" for name in group_by]
+            rows = (
+                queryset.annotate(**{f"group_{name}": expression for name, expression in aliases.items()})
+                .values(*keys)
+                .annotate(total=Count("id"))
+                .order_by(*keys)
+            )
+            for row in rows:
+                group = {name: row[f"group_{name}"] for name in group_by}
+                group["total"] = row["total"]
+                groups.append(group)
+        return totals, groups
+
 
-class ClientInteractionViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+class ClientInteractionViewSet(
+    CursorModeMixin, mixins.CreateModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet
+):
     queryset = ClientInteraction.objects.select_related("client", "message_log")
     serializer_class = ClientInteractionSerializer
+    compact_serializer_class = ClientInteractionCompactSerializer
+    cursor_pagination_class = ClientInteractionCursorPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ["client__name", "raw_message", "normalized_option"]
     ordering_fields = ["received_at", "channel"]
 
+    def get_queryset(self):
+        if not self.cursor_mode:
+            return super().get_queryset()
+        queryset = ClientInteraction.objects.annotate(client_name=F("client__name"))
+        if "client" in self.included_fields:
+            queryset = queryset.select_related("client")
+        return queryset
+
 
 class WhatsAppWebhookView(APIView):
     authentication_classes: list = []
@@ -119,47 +240,28 @@ class WhatsAppWebhookView(APIView):
         return Response(status=status.HTTP_403_FORBIDDEN)
 
     def post(self, request, *args, **kwargs):
-        entries = request.data.get("entry", [])
-        processed = 0
+        messages = meta_messages(request.data)
 
-        for entry in entries:
-            for change in entry.get("changes", []):
-                value = change.get("value", {})
-                for message in value.get("messages", []):
-                    phone_raw = message.get("from")
-                    message_body = message.get("text", {}).get("body", "")
-
-                    if not phone_raw or not message_body:
-                        continue
-
-                    normalized_phone = _normalize_phone(phone_raw)
-                    client = (
-                        Client.objects.filter(phone__icontains=normalized_phone[-9:]).first()
-                        if normalized_phone
-                        else None
-                    )
-                    if not client:
-                        continue
-
-                    normalized_option = message_body.strip().split()[0]
-                    interaction = ClientInteraction.objects.create(
-                        client=client,
-                        channel=MessageLog.Channel.WHATSAPP,
-                        raw_message=message_body,
-                        normalized_option=normalized_option,
-                    )
+        if _queued_ingestion():
+            events = enqueue_events(
+                InboundEvent.Source.META,
+                [(InboundEvent.Kind.MESSAGE, phone_raw, body) for phone_raw, body in messages],
+            )
+            if events:
+                schedule_inbound_processing()
+            return Response({"queued": len(events)}, status=status.HTTP_200_OK)
 
-                    if normalized_option == "1":
-                        client.status = Client.Status.SETTLED
-                        client.save(update_fields=["status"])
-                    elif normalized_option == "2":
-                        interaction.notes = "Cliente solicitou envio de comprovante."
-                        interaction.save(update_fields=["notes"])
-                    elif normalized_option == "3":
-                        interaction.notes = "Cliente solicitou ajuda humana."
-                        interaction.save(update_fields=["notes"])
+        processed = 0
+        for phone_raw, message_body in messages:
+            client = resolve_client(phone_raw)
+            if not client:
+                continue
 
-                    processed += 1
+            outcome = plan_event(InboundEvent.Source.META, InboundEvent.Kind.MESSAGE, phone_raw, message_body, client)
+            outcome.interaction.save()
+            if outcome.settle:
+                _settle_client(client.id)
+            processed += 1
 
         return Response({"processed": processed}, status=status.HTTP_200_OK)
 
@@ -177,6 +279,14 @@ class WhatsAppHealthView(APIView):
         return Response(result, status=status.HTTP_200_OK)
 
 
+class SendRateMetricsView(APIView):
+    """Taxa atual e estado de backoff dos limitadores de envio (provedor configurado e bot)."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        return Response({"limiters": rate_limit_metrics()}, status=status.HTTP_200_OK)
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 class BotControlView(APIView):
     """
@@ -185,8 +295,7 @@ class BotControlView(APIView):
     permission_classes = [IsAuthenticated]
 
     def _get_bot_url(self, endpoint: str) -> str:
-        bot_url = getattr(settings, "WPPCONNECT_BOT_URL", "http://localhost:3001")
-        return f"{bot_url.rstrip('/')}/{endpoint.lstrip('/')}"
+        return bot_url(endpoint)
     
     def _is_render_healthcheck(self, request):
         """Verifica se é um healthcheck do Render"""
@@ -206,15 +315,13 @@ class BotControlView(APIView):
         if self._is_render_healthcheck(request):
             return Response({"status": "ok", "service": "bot-control"}, status=status.HTTP_200_OK)
         
-        try:
-            response = requests.get(self._get_bot_url("/status"), timeout=5)
-            response.raise_for_status()
-            return Response(response.json(), status=status.HTTP_200_OK)
-        except requests.exceptions.RequestException as exc:
+        bot_status = get_bot_status(refresh=request.query_params.get("refresh") == "1")
+        if not bot_status["reachable"]:
             return Response(
-                {"error": f"Não foi possível conectar ao bot: {str(exc)}", "status": "error"},
+                {"error": bot_status["error"], "status": "error"},
                 status=status.HTTP_503_SERVICE_UNAVAILABLE,
             )
+        return Response(bot_status, status=status.HTTP_200_OK)
 
     def post(self, request, *args, **kwargs):
         """Iniciar ou parar o bot"""
@@ -228,9 +335,9 @@ class BotControlView(APIView):
             for attempt in range(max_retries):
                 try:
                     if action_type == "start":
-                        response = requests.post(self._get_bot_url("/start"), timeout=30)
+                        response = bot_session().post(self._get_bot_url("/start"), timeout=30)
                     elif action_type == "stop":
-                        response = requests.post(self._get_bot_url("/stop"), timeout=10)
+                        response = bot_session().post(self._get_bot_url("/stop"), timeout=10)
                     else:
                         return Response(
                             {"error": "Ação inválida. Use 'start' ou 'stop'"},
@@ -238,6 +345,7 @@ class BotControlView(APIView):
                         )
 
                     response.raise_for_status()
+                    invalidate_bot_status()
                     return Response(response.json(), status=status.HTTP_200_OK)
                 except requests.exceptions.ConnectionError as conn_exc:
                     last_exception = conn_exc
@@ -278,8 +386,7 @@ class BotQRCodeView(APIView):
     permission_classes = [IsAuthenticated]
 
     def _get_bot_url(self, endpoint: str) -> str:
-        bot_url = getattr(settings, "WPPCONNECT_BOT_URL", "http://localhost:3001")
-        return f"{bot_url.rstrip('/')}/{endpoint.lstrip('/')}"
+        return bot_url(endpoint)
     
     def _is_render_healthcheck(self, request):
         """Verifica se é um healthcheck do Render"""
@@ -299,7 +406,7 @@ class BotQRCodeView(APIView):
             return Response({"status": "ok", "service": "bot-qr"}, status=status.HTTP_200_OK)
         
         try:
-            response = requests.get(self._get_bot_url("/qr"), timeout=5)
+            response = bot_session().get(self._get_bot_url("/qr"), timeout=5)
             response.raise_for_status()
             return Response(response.json(), status=status.HTTP_200_OK)
         except requests.exceptions.RequestException as exc:
@@ -310,12 +417,11 @@ class BotQRCodeView(APIView):
 
 
 class BotSendBulkView(APIView):
-    """Enviar mensagens em massa via bot"""
+    """Enfileira um envio em massa via bot e retorna o ID do job imediatamente"""
     permission_classes = [IsAuthenticated]
 
     def _get_bot_url(self, endpoint: str) -> str:
-        bot_url = getattr(settings, "WPPCONNECT_BOT_URL", "http://localhost:3001")
-        return f"{bot_url.rstrip('/')}/{endpoint.lstrip('/')}"
+        return bot_url(endpoint)
 
     def post(self, request, *args, **kwargs):
         clients_ids = request.data.get("client_ids", [])
@@ -327,238 +433,68 @@ class BotSendBulkView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Verificar se o bot está conectado antes de tentar enviar
-        try:
-            status_response = requests.get(self._get_bot_url("/status"), timeout=5)
-            status_response.raise_for_status()
-            bot_status = status_response.json()
-            
-            if bot_status.get("status") != "connected" or not bot_status.get("isConnected"):
-                return Response(
-                    {"error": "Bot não está conectado. Conecte o bot antes de enviar mensagens."},
-                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
-                )
-        except requests.exceptions.RequestException as exc:
+        # Verificar se o bot está conectado antes de enfileirar
+        bot_status = get_bot_status()
+        if not bot_status["reachable"]:
             return Response(
-                {"error": f"Não foi possível verificar o status do bot: {str(exc)}"},
+                {"error": f"Não foi possível verificar o status do bot: {bot_status['error']}"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        if not is_bot_connected(bot_status):
+            return Response(
+                {"error": "Bot não está conectado. Conecte o bot antes de enviar mensagens."},
                 status=status.HTTP_503_SERVICE_UNAVAILABLE,
             )
 
-        # Buscar clientes PRIMEIRO
-        clients = Client.objects.filter(id__in=clients_ids)
-        if not clients.exists():
+        found_ids = list(Client.objects.filter(id__in=clients_ids).values_list("id", flat=True))
+        if not found_ids:
             return Response(
                 {"error": "Nenhum cliente encontrado"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        
-        # Sincronizar contatos antes de enviar (verificar se existem no WhatsApp)
-        # IMPORTANTE: Não bloquear envio se sincronização falhar
-        try:
-            contacts_to_sync = [
-                {"phone": client.formatted_phone, "name": client.name}
-                for client in clients
-            ]
-            # Fazer sincronização em background (não esperar)
-            sync_response = requests.post(
-                self._get_bot_url("/sync-contacts"),
-                json={"contacts": contacts_to_sync},
-                timeout=10,  # Timeout curto - não bloquear envio
-            )
-            if sync_response.status_code == 200:
-                sync_result = sync_response.json()
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.info(f"Contatos sincronizados: {sync_result.get('verified', 0)} verificados, {sync_result.get('not_found', 0)} não encontrados")
-        except requests.exceptions.RequestException as sync_error:
-            # Se falhar a sincronização, continua mesmo assim (não é crítico)
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.warning(f"Sincronização de contatos falhou (não crítico): {str(sync_error)}")
-            # Continuar com o envio mesmo se sincronização falhar
-
-        # Preparar lista de telefones e renderizar mensagem para cada cliente
-        from calendar import monthrange
-        from datetime import date as date_class
-        
-        clients_data = []
-        today = timezone.localdate()
-        
-        for client in clients:
-            # Renderizar mensagem com variáveis do cliente
-            rendered_message = message
-            try:
-                # Calcular data de vencimento
-                due_date = None
-                if client.due_date:
-                    due_date = client.due_date
-                    # Se a data já passou, calcular próxima ocorrência
-                    if due_date < today:
-                        if due_date.month == 12:
-                            next_year = due_date.year + 1
-                            next_month = 1
-                        else:
-                            next_year = due_date.year
-                            next_month = due_date.month + 1
-                        days_in_month = monthrange(next_year, next_month)[1]
-                        next_day = min(due_date.day, days_in_month)
-                        due_date = date_class(next_year, next_month, next_day)
-                elif hasattr(client, 'due_day') and client.due_day:
-                    # Usar due_day para calcular próxima data
-                    day = client.due_day
-                    if today.day >= day:
-                        # Já passou este mês
-                        if today.month == 12:
-                            next_year = today.year + 1
-                            next_month = 1
-                        else:
-                            next_year = today.year
-                            next_month = today.month + 1
-                    else:
-                        # Ainda não passou este mês
-                        next_year = today.year
-                        next_month = today.month
-                    
-                    days_in_month = monthrange(next_year, next_month)[1]
-                    next_day = min(day, days_in_month)
-                    due_date = date_class(next_year, next_month, next_day)
-                else:
-                    # Se não tem data, usar data de hoje como fallback
-                    due_date = today
-                
-                # Substituir variáveis na mensagem - múltiplas tags para nome
-                client_name = client.name or ""
-                rendered_message = rendered_message.replace("{{nome}}", client_name)
-                rendered_message = rendered_message.replace("{{nome_cliente}}", client_name)
-                rendered_message = rendered_message.replace("{{cliente}}", client_name)
-                
-                # Formatar valor em reais
-                try:
-                    valor_str = f"{client.monthly_fee:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-                except (AttributeError, TypeError):
-                    valor_str = "0,00"
-                rendered_message = rendered_message.replace("{{valor}}", valor_str)
-                
-                # Substituir data de vencimento
-                if due_date:
-                    rendered_message = rendered_message.replace("{{vencimento}}", due_date.strftime("%d/%m/%Y"))
-                else:
-                    rendered_message = rendered_message.replace("{{vencimento}}", "Não definido")
-                
-                # Substituir "vence hoje" pela data correta
-                if due_date and due_date == today:
-                    # Se vence hoje, manter "vence hoje"
-                    rendered_message = rendered_message.replace("vence hoje", "vence hoje")
-                elif due_date:
-                    # Se não vence hoje, substituir pela data
-                    rendered_message = rendered_message.replace("vence hoje", f"vence em {due_date.strftime('%d/%m/%Y')}")
-                
-                # Substituir link de pagamento
-                rendered_message = rendered_message.replace("{{link_pagamento}}", client.payment_link or "")
-            except Exception as e:
-                # Se houver erro na renderização, usa a mensagem original
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.exception(f"Erro ao renderizar mensagem para {client.name}: {e}")
-                rendered_message = message
-            
-            # Validar telefone antes de adicionar
-            phone = client.formatted_phone
-            phone_digits = "".join(filter(str.isdigit, phone or ""))
-            if not phone or len(phone_digits) < 10:
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.warning(f"Telefone inválido para cliente {client.name}: {phone}")
-                continue
-            
-            clients_data.append({
-                "phone": phone,
-                "message": rendered_message
-            })
 
-        try:
-            # Enviar uma mensagem por vez para melhor controle
-            results = []
-            errors = []
-            
-            for idx, client_data in enumerate(clients_data):
-                try:
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    logger.info(f"Enviando mensagem {idx + 1}/{len(clients_data)} para {client_data['phone']}")
-                    
-                    response = requests.post(
-                        self._get_bot_url("/send"),
-                        json={"phone": client_data["phone"], "message": client_data["message"]},
-                        timeout=30,
-                    )
-                    response.raise_for_status()
-                    result = response.json()
-                    
-                    if result.get("success"):
-                        results.append({"phone": client_data["phone"], "success": True})
-                        logger.info(f"✅ Mensagem enviada com sucesso para {client_data['phone']}")
-                    else:
-                        error_msg = result.get("error", "Erro desconhecido")
-                        errors.append({"phone": client_data["phone"], "error": error_msg})
-                        logger.error(f"❌ Erro ao enviar para {client_data['phone']}: {error_msg}")
-                except requests.exceptions.RequestException as exc:
-                    error_msg = str(exc)
-                    errors.append({"phone": client_data["phone"], "error": error_msg})
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    logger.error(f"❌ Erro de conexão ao enviar para {client_data['phone']}: {error_msg}")
-                
-                # Delay entre envios (2 segundos) - exceto no último
-                if idx < len(clients_data) - 1:
-                    time.sleep(2)
-            
-            # Criar logs de mensagens
-            for client in clients:
-                try:
-                    client_success = any(
-                        r.get("phone") == client.formatted_phone and r.get("success")
-                        for r in results
-                    )
-                    MessageLog.objects.create(
-                        client=client,
-                        message_type=MessageLog.Type.CHARGE,
-                        channel=MessageLog.Channel.WHATSAPP,
-                        status=MessageLog.Status.SUCCESS if client_success else MessageLog.Status.FAILED,
-                        payload={"message": message, "bulk_send": True},
-                        response={"success": client_success},
-                        created_by=request.user,
-                    )
-                except Exception as log_error:
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    logger.error(f"Erro ao criar log para cliente {client.name}: {log_error}")
-
-            result = {
-                "success": True,
-                "sent": len(results),
-                "failed": len(errors),
-                "results": results,
-                "errors": errors,
-            }
+        job = BulkSendJob.objects.create(
+            message=message,
+            client_ids=found_ids,
+            total=len(found_ids),
+            created_by=request.user,
+        )
 
-            return Response(result, status=status.HTTP_200_OK)
-        except requests.exceptions.RequestException as exc:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.exception("Erro ao enviar mensagens via bot")
+        try:
+            # Sem worker Celery (TASK_QUEUE_ENABLED desligado) o envio roda numa thread deste processo
+            run_task(execute_bulk_send_job, job.pk)
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Não foi possível enfileirar o envio em massa %s", job.pk)
+            job.status = BulkSendJob.Status.FAILED
+            job.error_message = str(exc)
+            job.finished_at = timezone.now()
+            job.save(update_fields=["status", "error_message", "finished_at"])
             return Response(
-                {"error": f"Erro ao enviar mensagens: {str(exc)}"},
+                {"error": f"Não foi possível enfileirar o envio: {str(exc)}", "job_id": job.pk},
                 status=status.HTTP_503_SERVICE_UNAVAILABLE,
             )
-        except Exception as exc:
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.exception("Erro inesperado ao enviar mensagens em massa")
-            return Response(
-                {"error": f"Erro inesperado: {str(exc)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+
+        data = BulkSendJobSerializer(job).data
+        data["job_id"] = job.pk
+        data["status_url"] = reverse("bot-send-bulk-status", kwargs={"pk": job.pk})
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+
+
+class BulkSendJobStatusView(APIView):
+    """Progresso de um envio em massa (enviados, falhas e restantes)"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        # Sem a task periódica (deploy sem Celery), o job parado é encerrado ao consultar o progresso
+        fail_stale_bulk_send_jobs([pk])
+        jobs = BulkSendJob.objects.filter(pk=pk)
+        if not request.user.is_staff:
+            # A mensagem e os erros do envio só são visíveis para quem o criou
+            jobs = jobs.filter(created_by=request.user)
+        job = jobs.first()
+        if not job:
+            return Response({"error": "Envio não encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(BulkSendJobSerializer(job).data, status=status.HTTP_200_OK)
 
 
 class WPPConnectWebhookView(APIView):
@@ -581,7 +517,9 @@ class WPPConnectWebhookView(APIView):
             )
         
         # Se for imagem/documento, tratar como comprovante
-        if message_type in ["image", "document"] or message == "[COMPROVANTE_ENVIADO]":
+        if message_type in ["image", "document"] or message == RECEIPT_MESSAGE:
+            if _queued_ingestion():
+                return self._enqueue(InboundEvent.Kind.RECEIPT, phone, RECEIPT_MESSAGE)
             return self._process_receipt(phone, request)
 
         # Ignorar mensagens de status/broadcast
@@ -605,8 +543,22 @@ class WPPConnectWebhookView(APIView):
                 {"error": "message é obrigatório para mensagens de texto"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        if _queued_ingestion():
+            return self._enqueue(InboundEvent.Kind.MESSAGE, phone, message)
         return self._process_message(phone, message, request)
 
+    def _enqueue(self, kind: str, phone: str, message: str) -> Response:
+        """Modo queued: grava o evento e responde; a resposta automática é enviada pelo worker."""
+        normalized_phone = _normalize_phone(phone)
+        if not normalized_phone or len(normalized_phone) < 9:
+            return Response(
+                {"error": "Telefone inválido"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        [event] = enqueue_events(InboundEvent.Source.WPPCONNECT, [(kind, phone, message)])
+        schedule_inbound_processing()
+        return Response({"processed": False, "queued": True, "event_id": event.id}, status=status.HTTP_200_OK)
+
     def _process_message(self, phone: str, message: str, request) -> Response:
         """Processa uma mensagem recebida do WhatsApp"""
         # Normalizar telefone
@@ -617,57 +569,25 @@ class WPPConnectWebhookView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         
-        # Buscar cliente pelo telefone (busca pelos últimos 9 dígitos)
-        client = Client.objects.filter(phone__icontains=normalized_phone[-9:]).first()
+        # Buscar cliente pelo telefone (cache + busca indexada pelos últimos 9 dígitos)
+        client = resolve_client(normalized_phone)
+
+        outcome = plan_event(InboundEvent.Source.WPPCONNECT, InboundEvent.Kind.MESSAGE, phone, message, client)
 
         # Se não encontrou cliente, retornar mensagem genérica
         if not client:
-            return Response(
-                {
-                    "processed": False,
-                    "auto_reply": (
-                        "Olá! Não encontramos seu cadastro em nosso sistema.\n"
-                        "Por favor, entre em contato conosco através dos nossos canais oficiais."
-                    ),
-                },
-                status=status.HTTP_200_OK,
-            )
-
-        # Criar interação
-        normalized_option = message.strip().split()[0] if message.strip() else ""
-        interaction = ClientInteraction.objects.create(
-            client=client,
-            channel=MessageLog.Channel.WHATSAPP,
-            raw_message=message,
-            normalized_option=normalized_option,
-        )
-
-        # Processar ações baseadas em opções numéricas
-        if normalized_option == "1":
-            interaction.notes = "Cliente solicitou falar com atendente."
-            interaction.save(update_fields=["notes"])
-        elif normalized_option == "2":
-            interaction.notes = "Cliente solicitou enviar comprovante."
-            interaction.save(update_fields=["notes"])
-
-        # Gerar resposta automática
-        auto_reply = self._generate_auto_reply(client, message)
+            return Response({"processed": False, "auto_reply": outcome.auto_reply}, status=status.HTTP_200_OK)
 
-        # Criar log da mensagem recebida
-        MessageLog.objects.create(
-            client=client,
-            message_type=MessageLog.Type.INCOMING,
-            channel=MessageLog.Channel.WHATSAPP,
-            status=MessageLog.Status.SUCCESS,
-            payload={"phone": phone, "message": message},
-        )
+        # Criar interação (com observações das opções numéricas) e log da mensagem recebida
+        outcome.interaction.save()
+        outcome.message_log.save()
 
         return Response({
             "processed": True,
             "client_id": client.id,
             "client_name": client.name,
-            "auto_reply": auto_reply,
-            "interaction_id": interaction.id,
+            "auto_reply": outcome.auto_reply,
+            "interaction_id": outcome.interaction.id,
         }, status=status.HTTP_200_OK)
 
     def _process_receipt(self, phone: str, request) -> Response:
@@ -680,67 +600,48 @@ class WPPConnectWebhookView(APIView):
             )
         
         # Buscar cliente pelo telefone
-        client = Client.objects.filter(phone__icontains=normalized_phone[-9:]).first()
+        client = resolve_client(normalized_phone)
         
+        outcome = plan_event(InboundEvent.Source.WPPCONNECT, InboundEvent.Kind.RECEIPT, phone, "", client)
+
         if not client:
-            return Response(
-                {
-                    "processed": False,
-                    "auto_reply": "Não encontramos seu cadastro. Entre em contato conosco.",
-                },
-                status=status.HTTP_200_OK,
-            )
-        
-        # Marcar como quitado e criar interação
-        client.status = Client.Status.SETTLED
-        client.save(update_fields=["status"])
-        
-        interaction = ClientInteraction.objects.create(
-            client=client,
-            channel=MessageLog.Channel.WHATSAPP,
-            raw_message="[COMPROVANTE_ENVIADO]",
-            normalized_option="2",
-            notes="Cliente enviou comprovante de pagamento. Status atualizado automaticamente.",
-        )
-        
-        # Criar log
-        MessageLog.objects.create(
-            client=client,
-            message_type=MessageLog.Type.INCOMING,
-            channel=MessageLog.Channel.WHATSAPP,
-            status=MessageLog.Status.SUCCESS,
-            payload={"phone": phone, "message": "[COMPROVANTE_ENVIADO]", "type": "image"},
-        )
-        
+            return Response({"processed": False, "auto_reply": outcome.auto_reply}, status=status.HTTP_200_OK)
+
+        # Marcar como quitado, criar interação e log
+        _settle_client(client.id)
+        outcome.interaction.save()
+        outcome.message_log.save()
+
         return Response({
             "processed": True,
             "client_id": client.id,
             "client_name": client.name,
-            "auto_reply": "✅ Comprovante recebido! Seu pagamento foi registrado e seu status foi atualizado.",
-            "interaction_id": interaction.id,
+            "auto_reply": outcome.auto_reply,
+            "interaction_id": outcome.interaction.id,
         }, status=status.HTTP_200_OK)
 
-    def _generate_auto_reply(self, client: Client, message: str) -> str | None:
-        """
-        Gera resposta automática baseada na mensagem do cliente.
-        Apenas responde se a mensagem for exatamente "1" ou "2" para evitar flood.
-        """
-        # Remover espaços e verificar se é apenas um número
-        message_clean = message.strip()
-        
-        # Verificar se a mensagem é APENAS "1" ou "2" (sem outros caracteres)
-        if message_clean == "1":
-            return (
-                "👤 Nossa equipe entrará em contato em breve!\n"
-                "Aguarde que um atendente irá te responder."
-            )
-        
-        if message_clean == "2":
-            return (
-                "📄 Para enviar seu comprovante:\n"
-                "Envie a imagem do comprovante aqui mesmo.\n"
-                "Nossa equipe analisará e atualizará seu status em breve!"
+
+class BotStatusWebhookView(APIView):
+    """
+    Webhook em que o bot Node.js publica as mudanças de status, mantendo o cache
+    de ``messaging.bot_status`` atualizado sem consultas ao ``/status``.
+    """
+    authentication_classes: list = []
+    permission_classes = [AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        # O status publicado (inclusive o QR Code) é exibido ao operador e libera os
+        # envios em massa: sem token configurado o webhook fica desativado
+        token = getattr(settings, "BOT_WEBHOOK_TOKEN", "")
+        if not token:
+            return Response(
+                {"error": "Webhook de status desativado. Defina BOT_WEBHOOK_TOKEN."},
+                status=status.HTTP_403_FORBIDDEN,
             )
-        
-        # Se não for "1" ou "2", não retorna resposta automática (evita flood)
-        return None
+        if not hmac.compare_digest(request.headers.get("X-Bot-Token", "").encode(), token.encode()):
+            return Response({"error": "Token inválido"}, status=status.HTTP_403_FORBIDDEN)
+        if not request.data.get("status"):
+            return Response({"error": "status é obrigatório"}, status=status.HTTP_400_BAD_REQUEST)
+
+        bot_status = publish_bot_status(request.data)
+        return Response({"status": bot_status["status"]}, status=status.HTTP_200_OK)
@@ -72,6 +72,13 @@ else
     echo "✅ Bot iniciado e pronto!"
 fi
 
+# Sem worker Celery (CELERY_BROKER_URL não definido), sincronizar os contatos pendentes com o bot em background
+cd /code
+if [ -z "$CELERY_BROKER_URL" ]; then
+    echo "Iniciando sincronização periódica de contatos..."
+    python manage.py sync_pending_contacts --loop --interval 30 >> /tmp/contact_sync.log 2>&1 &
+fi
+
 # Iniciar Django na porta definida pelo Railway (ou 8000 como padrão)
 # IMPORTANTE: Django deve ser o processo principal (não usar &)
 cd /code